@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+asyncio runner for the datagen with a pooled set of async MySQL connections.
+
+The synchronous DataGenerator.run waits for every INSERT round trip before it
+generates the next batch. Here a producer task builds batches at the
+scheduled rate and hands them to writer tasks through a bounded queue. There
+is one writer per connection of the aiomysql pool (--pool-size), so that many
+inserts overlap and FE round-trip latency is hidden. The queue holds up to
+--max-inflight further batches; when the writers fall behind it fills and
+the producer blocks on put(): that is the backpressure, and the reported
+queue depth shows it. New users are inserted over the pool too, so nothing
+blocks the event loop.
+
+With --adaptive each batch carries a label, and a writer whose insert fails
+under pressure or on a lost connection retries that batch with backoff
+(INSERT ... WITH LABEL makes the retry idempotent), up to MAX_ATTEMPTS
+attempts. While it does, it holds its slot, so the queue fills and the
+producer slows down instead of rows being dropped. Batches that fail for
+other reasons are dropped at once.
+
+Used by datagen.py --async; requires aiomysql.
+"""
+
+import asyncio
+import time
+import uuid
+
+import aiomysql
+
+from backpressure import MAX_ATTEMPTS, is_retryable
+from scheduler import MIN_SLEEP, RateScheduler
+from sinks import multi_row_insert
+
+STATUS_INTERVAL = 5.0
+# Retries per batch once shutdown has begun (unbounded while running)
+SHUTDOWN_ATTEMPTS = 3
+
+
+class AsyncRunner:
+    """Generate with a DataGenerator and write through an aiomysql pool."""
+
+    def __init__(self, gen, pool_size: int = 8, max_inflight: int = 16, group_commit: str = 'off_mode'):
+        self.gen = gen
+        self.pool_size = pool_size
+        self.max_inflight = max_inflight
+        self.group_commit = group_commit
+        self.pool = None
+        self.queue: asyncio.Queue = None
+        self.written = {'fact_events': 0, 'fact_conversions': 0}
+        self.errors = 0
+        self.inflight = 0
+        self.producer_stalls = 0
+
+    async def _writer(self):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            table, rows = item
+            self.gen.metrics.set_queue_depth(self.queue.qsize())
+            self.inflight += 1
+            try:
+                await self._insert(table, rows)
+            finally:
+                self.inflight -= 1
+                self.queue.task_done()
+
+    async def _insert(self, table: str, rows: list):
+        """Insert one batch; with a controller, retry pressure and connection failures with backoff."""
+        gen = self.gen
+        metrics = gen.metrics
+        controller = gen.controller
+        # Group commit assigns its own labels and rejects ours
+        label = None
+        if controller and self.group_commit == 'off_mode':
+            label = f"datagen_{table}_{uuid.uuid4().hex}"
+        sql, params = multi_row_insert(table, rows, label)
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                async with self.pool.acquire() as conn:
+                    async with conn.cursor() as cur:
+                        await cur.execute(sql, params)
+                ok, message = True, None
+            except aiomysql.Error as e:
+                # An earlier attempt with this label already committed the rows
+                ok, message = (label is not None and 'already been used' in str(e)), str(e)
+                error = f"mysql_{e.args[0] if e.args else type(e).__name__}"
+                if not ok:
+                    self.errors += 1
+                    metrics.error(error)
+                    print(f"[ERROR] Async insert into {table} failed ({len(rows)} rows): {e}")
+            seconds = time.perf_counter() - start
+            metrics.observe_insert(table, len(rows), seconds)
+            if controller:
+                controller.observe(seconds, ok, message)
+            if ok:
+                metrics.rows_written(table, len(rows))
+                self.written[table] += len(rows)
+                gen.count_written(table, len(rows))
+                return
+            if controller is None or (not gen.running and attempt >= SHUTDOWN_ATTEMPTS):
+                return
+            if not is_retryable(error, message) or attempt >= MAX_ATTEMPTS:
+                print(f"[ERROR] Dropping {len(rows)} {table} rows after {attempt} attempt(s)")
+                return
+            await asyncio.sleep(controller.backoff())
+
+    async def _add_new_user(self):
+        """Insert a new dim_users row over the pool; events only use its ID once it is written."""
+        gen = self.gen
+        row = gen.new_user_row()
+        gen.metrics.rows_generated('dim_users', 1)
+        sql, params = multi_row_insert('dim_users', [row])
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(sql, params)
+            ok = True
+        except aiomysql.Error as e:
+            print(f"[ERROR] Async insert into dim_users failed: {e}")
+            ok = False
+        gen.user_written(row, ok)
+
+    async def _put(self, table: str, rows: list):
+        if self.queue.full():
+            self.producer_stalls += 1
+        self.gen.metrics.rows_generated(table, len(rows))
+        await self.queue.put((table, rows))
+        self.gen.metrics.set_queue_depth(self.queue.qsize())
+
+    async def _produce(self, scheduler: RateScheduler, conversion_interval: float, new_user_interval: float,
+                       batch_size: int, flush_interval: float, block_generator):
+        gen = self.gen
+        last_conversion = last_new_user = last_flush = last_status = time.time()
+        conversions_batch = []
+
+        base_flush_interval = flush_interval
+        while gen.running:
+            if gen.controller is not None:
+                batch_size = gen.controller.batch_size
+                flush_interval = gen.controller.flush_interval(base_flush_interval)
+                scheduler.rate_factor = gen.controller.rate_factor
+            count = max(1, min(batch_size, int(scheduler.target_rate() * flush_interval)))
+            delay = scheduler.reserve(count)
+            if delay >= MIN_SLEEP:
+                await asyncio.sleep(delay)
+
+            if block_generator is None:
+                rows = [gen.event_row(gen.generate_event()) for _ in range(count)]
+            else:
+                rows = block_generator.events(count, gen.reserve_ids('event', count), gen.max_user_id,
+                                              gen.max_feature_id, gen.max_campaign_id).rows()
+            await self._put('fact_events', rows)
+
+            now = time.time()
+            if now - last_conversion >= conversion_interval:
+                conversion = gen.generate_conversion()
+                conversions_batch.append(gen.conversion_row(conversion))
+                last_conversion = now
+                print(f"[CONVERSION] {conversion['conversion_type']} - ${conversion['revenue']:.2f}")
+            if conversions_batch and (len(conversions_batch) >= batch_size or now - last_flush >= flush_interval):
+                await self._put('fact_conversions', conversions_batch)
+                conversions_batch = []
+                last_flush = now
+
+            if now - last_new_user >= new_user_interval:
+                await self._add_new_user()
+                last_new_user = now
+
+            if now - last_status >= STATUS_INTERVAL:
+                achieved, target = scheduler.report()
+                gen.metrics.set_rates(achieved, target)
+                print(f"[STATUS] Events: {self.written['fact_events']}, "
+                      f"Conversions: {self.written['fact_conversions']}, Users: {gen.max_user_id}, "
+                      f"Rate: {achieved:,.1f}/sec (target {target:,.1f}/sec), "
+                      f"Queue: {self.queue.qsize()}/{self.max_inflight}, In-flight: {self.inflight}, "
+                      f"Producer stalls: {self.producer_stalls}, Errors: {self.errors}")
+                last_status = now
+
+        if conversions_batch:
+            await self._put('fact_conversions', conversions_batch)
+
+    async def run(self, scheduler: RateScheduler, conversion_interval: float, new_user_interval: float,
+                  batch_size: int, flush_interval: float, block_generator=None):
+        gen = self.gen
+        init_command = None
+        if self.group_commit != 'off_mode':
+            init_command = f"SET group_commit = '{self.group_commit}'"
+        self.pool = await aiomysql.create_pool(
+            host=gen.host, port=gen.port, user=gen.user, password=gen.password, db=gen.database,
+            autocommit=True, minsize=1, maxsize=self.pool_size, init_command=init_command,
+        )
+        self.queue = asyncio.Queue(maxsize=self.max_inflight)
+        print(f"[INFO] Async pool ready - {self.pool_size} connections and concurrent inserts, "
+              f"up to {self.max_inflight} more batches queued")
+
+        # One writer per connection: more would only wait on pool.acquire()
+        writers = [asyncio.create_task(self._writer()) for _ in range(self.pool_size)]
+        try:
+            await self._produce(scheduler, conversion_interval, new_user_interval,
+                                batch_size, flush_interval, block_generator)
+        finally:
+            # Drain what is queued, then stop the writers
+            for _ in writers:
+                await self.queue.put(None)
+            await asyncio.gather(*writers)
+            self.pool.close()
+            await self.pool.wait_closed()
+
+        achieved, target = scheduler.totals()
+        print(f"[INFO] Final stats - Events: {self.written['fact_events']}, "
+              f"Conversions: {self.written['fact_conversions']}, "
+              f"Rate: {achieved:,.1f}/sec (target {target:,.1f}/sec), Errors: {self.errors}")
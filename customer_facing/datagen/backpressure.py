@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Feedback control for the datagen when VeloDB falls behind.
+
+AdaptiveController watches every write: its latency, whether it failed, and
+whether the error is one of the "cluster is overloaded" codes (too many
+tablet versions or segments, memory limit exceeded). Optionally it also
+polls the FE's max tablet compaction score. Once per adjustment window it
+applies multiplicative decrease / additive increase:
+
+- under pressure: double the batch size (fewer, larger loads create fewer
+  tablet versions) and halve the offered rate
+- calm: raise the rate back by a step per window, and once at full rate
+  shrink the batch size back toward the configured one
+
+Batches that failed because of pressure or a lost connection are kept in a
+RetryBuffer and re-sent with the same label, so pressure costs latency, not
+rows. Other failures (bad data, schema mismatch) would fail again on every
+attempt, so those batches are dropped instead of blocking the ones behind
+them, and so are batches still failing after MAX_ATTEMPTS attempts. Used by
+datagen.py --adaptive.
+"""
+
+import base64
+import http.client
+import time
+from collections import deque
+from typing import Optional
+
+# Error text that means "slow down" rather than "this batch is bad"
+PRESSURE_ERRORS = (
+    'TOO_MANY_VERSION', 'too many versions', '-235',
+    'TOO_MANY_SEGMENTS', '-238',
+    'MEM_LIMIT_EXCEEDED', 'memory limit exceeded',
+)
+
+# Client-side errnos (can't connect, server gone away, lost connection, out of sync,
+# lost during handshake): the connection failed, not the batch
+CONNECTION_ERRNOS = {2003, 2006, 2013, 2014, 2055}
+# Sink error codes (sinks' last_error) worth another attempt besides PRESSURE_ERRORS
+RETRYABLE_ERRORS = {f"mysql_{errno}" for errno in CONNECTION_ERRNOS} | {'stream_load_http'}
+# Attempts per batch, the first one included, before it is dropped
+MAX_ATTEMPTS = 10
+
+ADJUST_INTERVAL = 1.0
+RATE_STEP = 0.05
+MAX_BACKOFF = 30.0
+# Flush intervals grow with the batch size, up to this many times the configured one
+MAX_FLUSH_STRETCH = 10.0
+COMPACTION_METRIC = 'doris_fe_max_tablet_compaction_score'
+
+
+def is_pressure_error(message: Optional[str]) -> bool:
+    """Return True when an error message signals cluster overload."""
+    return bool(message) and any(marker in message for marker in PRESSURE_ERRORS)
+
+
+def is_retryable(error: Optional[str], message: Optional[str]) -> bool:
+    """Return True when a failed write may succeed later: overload or a failed connection."""
+    return is_pressure_error(message) or error in RETRYABLE_ERRORS
+
+
+class CompactionMonitor:
+    """Poll the FE /metrics endpoint for the max tablet compaction score."""
+
+    def __init__(self, host: str, http_port: int, user: str, password: str, interval: float = 10.0):
+        self.host = host
+        self.http_port = http_port
+        token = base64.b64encode(f"{user}:{password}".encode()).decode()
+        self.headers = {'Authorization': f"Basic {token}"}
+        self.interval = interval
+        self.last_poll = 0.0
+        self.score = 0.0
+
+    def poll(self) -> float:
+        """Return the latest score, refreshing it at most once per interval."""
+        now = time.monotonic()
+        if now - self.last_poll < self.interval:
+            return self.score
+        self.last_poll = now
+        conn = http.client.HTTPConnection(self.host, self.http_port, timeout=5)
+        try:
+            conn.request('GET', '/metrics', headers=self.headers)
+            body = conn.getresponse().read().decode('utf-8', 'replace')
+        except (OSError, http.client.HTTPException) as e:
+            print(f"[WARN] Cannot read compaction score from {self.host}:{self.http_port}: {e}")
+            return self.score
+        finally:
+            conn.close()
+        for line in body.splitlines():
+            if line.startswith(COMPACTION_METRIC):
+                try:
+                    self.score = float(line.rsplit(' ', 1)[1])
+                except (IndexError, ValueError):
+                    pass
+                break
+        return self.score
+
+
+class AdaptiveController:
+    """Adjust batch size and offered rate from write latency, errors and compaction."""
+
+    def __init__(self, batch_size: int, max_batch_size: int = 50000, latency_target: float = 0.5,
+                 min_rate_factor: float = 0.1, monitor: Optional[CompactionMonitor] = None,
+                 compaction_limit: float = 0):
+        self.base_batch_size = max(1, batch_size)
+        self.max_batch_size = max(self.base_batch_size, max_batch_size)
+        self.latency_target = latency_target
+        self.min_rate_factor = min_rate_factor
+        self.monitor = monitor
+        self.compaction_limit = compaction_limit
+
+        self.batch_size = self.base_batch_size
+        self.rate_factor = 1.0
+        self.failures = 0  # Consecutive failed writes, drives retry backoff
+        self.window_start = time.monotonic()
+        self.window_slow = 0
+        self.window_pressure_errors = 0
+        self.window_writes = 0
+        self.last_reason = None
+
+    def flush_interval(self, base: float) -> float:
+        """Stretch the flush interval along with the batch size so batches can actually fill."""
+        return base * min(self.batch_size / self.base_batch_size, MAX_FLUSH_STRETCH)
+
+    def observe(self, seconds: float, ok: bool, error_message: Optional[str] = None):
+        """Record one write and adjust once the window has elapsed."""
+        self.window_writes += 1
+        if seconds > self.latency_target:
+            self.window_slow += 1
+        if ok:
+            self.failures = 0
+        else:
+            self.failures += 1
+            if is_pressure_error(error_message):
+                self.window_pressure_errors += 1
+
+        now = time.monotonic()
+        if now - self.window_start >= ADJUST_INTERVAL:
+            self._adjust()
+            self.window_start = now
+            self.window_slow = self.window_pressure_errors = self.window_writes = 0
+
+    def _pressure_reason(self) -> Optional[str]:
+        if self.window_pressure_errors:
+            return f"{self.window_pressure_errors} overload errors"
+        # Half the writes in the window over target, not one slow outlier
+        if self.window_slow * 2 > self.window_writes:
+            return f"{self.window_slow}/{self.window_writes} writes over {self.latency_target * 1000:.0f}ms"
+        if self.monitor and self.compaction_limit:
+            score = self.monitor.poll()
+            if score > self.compaction_limit:
+                return f"compaction score {score:.0f} > {self.compaction_limit:.0f}"
+        return None
+
+    def _adjust(self):
+        reason = self._pressure_reason()
+        if reason:
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+            self.rate_factor = max(self.min_rate_factor, self.rate_factor / 2)
+            print(f"[BACKPRESSURE] {reason} - batch size {self.batch_size}, "
+                  f"rate {self.rate_factor:.0%} of target")
+        elif self.rate_factor < 1.0:
+            self.rate_factor = min(1.0, self.rate_factor + RATE_STEP)
+            if self.rate_factor == 1.0:
+                print(f"[BACKPRESSURE] Pressure cleared - back to full rate, batch size {self.batch_size}")
+        elif self.batch_size > self.base_batch_size:
+            self.batch_size = max(self.base_batch_size, int(self.batch_size * 0.75))
+        self.last_reason = reason
+
+    def backoff(self) -> float:
+        """Seconds to wait before retrying after the current run of failures."""
+        return min(MAX_BACKOFF, 0.5 * 2 ** max(0, self.failures - 1))
+
+    def describe(self) -> str:
+        return f"batch {self.batch_size}, rate {self.rate_factor:.0%}"
+
+
+class RetryBuffer:
+    """Failed batches awaiting another attempt, oldest first, with their attempt counts."""
+
+    def __init__(self, max_rows: int = 1000000, max_attempts: int = MAX_ATTEMPTS):
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self.batches = deque()
+        self.rows = 0
+        self.dropped_rows = 0
+        self.next_attempt = 0.0
+
+    def __len__(self) -> int:
+        return len(self.batches)
+
+    @property
+    def full(self) -> bool:
+        return self.rows >= self.max_rows
+
+    def push(self, table: str, rows, label: str, attempts: int = 1):
+        self.batches.append((table, rows, label, attempts))
+        self.rows += len(rows)
+
+    def push_front(self, table: str, rows, label: str, attempts: int):
+        self.batches.appendleft((table, rows, label, attempts))
+        self.rows += len(rows)
+
+    def pop(self) -> tuple:
+        table, rows, label, attempts = self.batches.popleft()
+        self.rows -= len(rows)
+        return table, rows, label, attempts
+
+    def drop(self, table: str, rows, label: str, reason: str):
+        """Give up on a batch that is not worth (another) retry."""
+        self.dropped_rows += len(rows)
+        print(f"[ERROR] Dropping {len(rows)} {table} rows ({label}): {reason}")
+
+    def due(self) -> bool:
+        return bool(self.batches) and time.monotonic() >= self.next_attempt
+
+    def defer(self, seconds: float):
+        self.next_attempt = time.monotonic() + seconds
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Compare the user_id join dashboards on the default and colocated layouts.
+
+activity_by_plan joins fact_events to dim_users and attribution joins
+fact_conversions to dim_users, both on user_id. In the default layout the
+facts are hashed on their own IDs, so VeloDB either broadcasts dim_users to
+every fact tablet or shuffles both sides by user_id. With setup_schema.py
+--colocate, all three tables are hashed on user_id into the same buckets,
+and the join runs bucket by bucket without moving rows (COLOCATE in EXPLAIN).
+
+The benchmark creates two scratch databases with setup_schema.py, one per
+layout, copies every table from --source-database into both, then runs each
+query --runs times on each and reports the latency, the join strategies
+EXPLAIN chose, and the speedup. The SQL cache is disabled so every run
+really executes.
+
+Small dim_users tables are broadcast anyway, which hides most of the
+difference at demo scale; --no-broadcast disables broadcast joins so the
+default layout shuffles as it would once dim_users is large.
+
+Usage:
+    python bench_colocation.py --host 127.0.0.1 --source-database user_analytics --runs 10
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from setup_schema import DEFAULT_COLOCATE_BUCKETS, SCHEMA_PROFILES, setup_schema
+from sinks import TABLE_COLUMNS
+
+QUERIES = ['activity_by_plan', 'attribution']
+DEFAULT_QUERIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'evidence', 'sources', 'velodb')
+LAYOUTS = ['shuffle', 'colocate']
+JOIN_RE = re.compile(r'JOIN\((\w+)', re.IGNORECASE)
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def load_query(queries_dir: str, name: str) -> str:
+    with open(os.path.join(queries_dir, f"{name}.sql")) as f:
+        lines = [line for line in f if not line.lstrip().startswith('--')]
+    return ''.join(lines).strip().rstrip(';')
+
+
+def create_layout(args, database: str, colocate: bool) -> bool:
+    """Create database with the layout and copy every table from the source database."""
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        ok = setup_schema(args.host, args.port, args.user, args.password, database, profile=args.profile,
+                          colocate=colocate, colocate_buckets=args.buckets)
+    if not ok:
+        print(out.getvalue())
+        return False
+    conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password,
+                                   database=database, autocommit=True)
+    try:
+        cursor = conn.cursor()
+        for table, columns in TABLE_COLUMNS.items():
+            column_list = ', '.join(columns)
+            # setup_schema seeds the dimensions; replace them with the source's rows
+            cursor.execute(f"TRUNCATE TABLE {table}")
+            cursor.execute(f"INSERT INTO {table} ({column_list}) "
+                           f"SELECT {column_list} FROM {args.source_database}.{table}")
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            print(f"  {database}.{table}: {cursor.fetchone()[0]:,} rows")
+        cursor.close()
+        return True
+    except Error as e:
+        print(f"[ERROR] Copying into {database} failed: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def join_types(cursor, sql: str) -> list:
+    """Join distribution strategies in the query plan, e.g. ['COLOCATE', 'BROADCAST']."""
+    cursor.execute(f"EXPLAIN {sql}")
+    plan = '\n'.join(str(row[0]) for row in cursor.fetchall())
+    return [kind.upper() for kind in JOIN_RE.findall(plan)]
+
+
+def run_query(args, database: str, sql: str) -> dict:
+    conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password,
+                                   database=database, autocommit=True)
+    try:
+        cursor = conn.cursor()
+        for setting in ["enable_sql_cache = false", "enable_query_cache = false"]:
+            try:
+                cursor.execute(f"SET {setting}")
+            except Error:
+                pass  # Not every version has every cache
+        if args.no_broadcast:
+            cursor.execute("SET auto_broadcast_join_threshold = -1")
+        joins = join_types(cursor, sql)
+        for _ in range(args.warmup):
+            cursor.execute(sql)
+            cursor.fetchall()
+        latencies = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+            latencies.append(time.perf_counter() - start)
+        cursor.close()
+    finally:
+        conn.close()
+    return {'joins': joins, 'rows': len(rows), 'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the user_id joins on default vs colocated layouts')
+    parser.add_argument('--host', default='localhost', help='Database host')
+    parser.add_argument('--port', type=int, default=9030, help='Database port')
+    parser.add_argument('--user', default='root', help='Database user')
+    parser.add_argument('--password', default='', help='Database password')
+    parser.add_argument('--source-database', default='user_analytics', help='Seeded database to copy from')
+    parser.add_argument('--profile', choices=SCHEMA_PROFILES, default='default',
+                        help='Schema profile of both scratch databases')
+    parser.add_argument('--buckets', type=int, default=DEFAULT_COLOCATE_BUCKETS,
+                        help='Buckets of the colocated tables')
+    parser.add_argument('--queries-dir', default=DEFAULT_QUERIES_DIR, help='Directory with the dashboard SQL')
+    parser.add_argument('--runs', type=int, default=10, help='Timed runs per query and layout')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed runs before timing')
+    parser.add_argument('--no-broadcast', action='store_true',
+                        help='Disable broadcast joins, as for a dim_users too large to broadcast')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch databases afterwards')
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    queries = {}
+    for name in QUERIES:
+        try:
+            queries[name] = load_query(args.queries_dir, name)
+        except OSError as e:
+            print(f"[ERROR] Cannot read {name}.sql: {e}")
+            sys.exit(1)
+
+    databases = {layout: f"{args.source_database}_bench_{layout}" for layout in LAYOUTS}
+    results = {}
+    try:
+        for layout, database in databases.items():
+            print(f"[INFO] Creating {database} ({layout} layout, profile {args.profile})...")
+            if not create_layout(args, database, layout == 'colocate'):
+                sys.exit(1)
+        for name, sql in queries.items():
+            for layout, database in databases.items():
+                print(f"[BENCH] {name} on {layout} layout, {args.runs} runs...")
+                results[name, layout] = run_query(args, database, sql)
+    except Error as e:
+        print(f"[ERROR] Benchmark failed: {e}")
+        sys.exit(1)
+    finally:
+        if not args.keep:
+            conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user,
+                                           password=args.password, autocommit=True)
+            cursor = conn.cursor()
+            for database in databases.values():
+                cursor.execute(f"DROP DATABASE IF EXISTS {database} FORCE")
+            conn.close()
+
+    print()
+    print(f"{'query':<18} {'layout':<9} {'rows':>5} {'p50 ms':>9} {'p95 ms':>9} {'speedup':>8}  joins")
+    for name in queries:
+        baseline = results[name, 'shuffle']['p50']
+        for layout in LAYOUTS:
+            r = results[name, layout]
+            speedup = baseline / r['p50'] if r['p50'] else 0.0
+            print(f"{name:<18} {layout:<9} {r['rows']:>5} {r['p50'] * 1000:>9.1f} {r['p95'] * 1000:>9.1f} "
+                  f"{speedup:>7.2f}x  {', '.join(r['joins']) or '-'}")
+    print("\nCOLOCATE joins run without moving fact rows; PARTITIONED joins shuffle both sides "
+          "and BROADCAST joins copy dim_users to every fact instance.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Compare per-row, client-batched and group-commit inserts at several rates.
+
+Each case runs DataGenerator for --duration seconds at a fixed event rate and
+records per-insert latency, the rate actually achieved, and how long after the
+run the last rows became visible to queries. The visibility delay matters for
+async_mode: inserts return as soon as the rows are in the WAL, and they become
+readable once the table's group commit interval has passed (see
+setup_schema.py --group-commit-interval-ms).
+
+Cases:
+- per-row:             one INSERT per event (the datagen default)
+- batched:             client-side multi-row INSERTs of --batch-size rows
+- group-commit-sync:   one INSERT per event, group_commit = sync_mode
+- group-commit-async:  one INSERT per event, group_commit = async_mode
+
+Rows are really written, so point --database at a scratch copy of the schema.
+
+Usage:
+    python bench_group_commit.py --host 127.0.0.1 --database analytics_bench --rates 10,100,1000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import threading
+import time
+
+from datagen import DataGenerator
+from idalloc import make_store
+from metrics import InstrumentedSink, NullMetrics
+from sinks import make_sink
+
+# case -> (use --batch-size, group_commit mode)
+CASES = {
+    'per-row': (False, 'off_mode'),
+    'batched': (True, 'off_mode'),
+    'group-commit-sync': (False, 'sync_mode'),
+    'group-commit-async': (False, 'async_mode'),
+}
+VISIBILITY_TIMEOUT = 60
+
+
+class LatencyRecorder(NullMetrics):
+    """Collect insert latencies and row counts for one case."""
+
+    def __init__(self):
+        self.latencies = []
+        self.rows = 0
+        self.errors = 0
+
+    def observe_insert(self, table: str, rows: int, seconds: float):
+        self.latencies.append(seconds)
+
+    def rows_written(self, table: str, count: int):
+        self.rows += count
+
+    def error(self, error_type: str):
+        self.errors += 1
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def wait_visible(gen: DataGenerator, first_id: int, last_id: int, expected: int) -> float:
+    """Return seconds until expected rows in [first_id, last_id] are readable (-1 on timeout)."""
+    start = time.time()
+    while time.time() - start < VISIBILITY_TIMEOUT:
+        result = gen.query_one(f"SELECT COUNT(*) FROM fact_events WHERE event_id BETWEEN {first_id} AND {last_id}")
+        if result and result[0] >= expected:
+            return time.time() - start
+        time.sleep(0.2)
+    return -1.0
+
+
+def run_case(args, case: str, rate: float) -> dict:
+    """Generate at rate for args.duration seconds with the case's insert mode."""
+    batched, group_commit = CASES[case]
+    batch_size = args.batch_size if batched else 1
+
+    gen = DataGenerator(args.host, args.port, args.user, args.password, args.database)
+    if not gen.connect():
+        sys.exit(1)
+    gen.id_store = make_store('table', gen.conn, None)
+    if not gen.get_max_ids():
+        sys.exit(1)
+    first_id = gen.max_event_id + 1
+
+    recorder = LatencyRecorder()
+    gen.metrics = recorder
+    sink = make_sink('mysql', gen.open_connection(), args.host, args.http_port, args.user, args.password,
+                     args.database, group_commit=group_commit, owns_conn=True)
+    gen.sink = InstrumentedSink(sink, recorder)
+
+    timer = threading.Timer(args.duration, lambda: setattr(gen, 'running', False))
+    start = time.time()
+    timer.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gen.run(rate, float('inf'), float('inf'), batch_size, args.flush_interval_ms)
+    elapsed = time.time() - start
+
+    last_id = gen.id_allocator.used['event'] if gen.id_allocator else gen.max_event_id
+    visible_after = wait_visible(gen, first_id, last_id, recorder.rows)
+    gen.disconnect()
+
+    return {
+        'case': case,
+        'rate': rate,
+        'achieved': recorder.rows / elapsed,
+        'inserts': len(recorder.latencies),
+        'p50_ms': percentile(recorder.latencies, 0.50) * 1000,
+        'p99_ms': percentile(recorder.latencies, 0.99) * 1000,
+        'errors': recorder.errors,
+        'visible_after': visible_after,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-row, batched and group-commit inserts')
+    parser.add_argument('--host', default='localhost', help='Database host')
+    parser.add_argument('--port', type=int, default=9030, help='Database port')
+    parser.add_argument('--user', default='root', help='Database user')
+    parser.add_argument('--password', default='', help='Database password')
+    parser.add_argument('--database', default='user_analytics', help='Database name (use a scratch copy)')
+    parser.add_argument('--http-port', type=int, default=8030, help='FE HTTP port')
+    parser.add_argument('--rates', default='10,100,1000', help='Comma-separated events per second to test')
+    parser.add_argument('--cases', default=','.join(CASES), help='Comma-separated cases to run')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per case')
+    parser.add_argument('--batch-size', type=int, default=100, help='Rows per insert for the batched case')
+    parser.add_argument('--flush-interval-ms', type=float, default=1000, help='Flush interval for the batched case')
+    args = parser.parse_args()
+
+    rates = [float(r) for r in args.rates.split(',')]
+    cases = args.cases.split(',')
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        print(f"[ERROR] Unknown cases: {', '.join(sorted(unknown))}")
+        sys.exit(1)
+
+    results = []
+    for rate in rates:
+        for case in cases:
+            print(f"[BENCH] {case} at {rate:,.0f} events/sec for {args.duration:.0f}s...")
+            results.append(run_case(args, case, rate))
+
+    print()
+    print(f"{'case':<20} {'target/s':>9} {'achieved/s':>11} {'inserts':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'visible s':>10}")
+    for r in results:
+        visible = f"{r['visible_after']:.1f}" if r['visible_after'] >= 0 else 'timeout'
+        print(f"{r['case']:<20} {r['rate']:>9,.0f} {r['achieved']:>11,.1f} {r['inserts']:>8} "
+              f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7} {visible:>10}")
+
+
+if __name__ == '__main__':
+    main()
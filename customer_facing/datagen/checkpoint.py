@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Checkpoints for resumable seeding.
+
+A seed_history.py run is fully determined by its parameters: seed, end date,
+scale, the leased fact ID ranges and the dimension sizes used for foreign
+keys. The checkpoint file stores those once, as the first JSON line, and
+then one line per load that landed. Every load carries a deterministic label
+derived from its (day, hour, table) chunk, so a rerun regenerates exactly
+the same rows for the loads still missing and skips the rest. If a load
+landed but the process died before recording it, the label makes the
+server reject the duplicate (MySQL "already been used" / Stream Load "Label
+Already Exists"), which the sinks treat as success.
+
+Lines are appended with a single O_APPEND write each, so shard processes
+and writer threads can share one file.
+"""
+
+import json
+import os
+import threading
+
+
+class SeedCheckpoint:
+    """Run parameters and completed load labels of one seeding run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.run = None
+        self.done = set()
+        self.lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Read the checkpoint; return False when there is none yet."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A torn last line from a crash
+                if 'run' in entry:
+                    self.run = entry['run']
+                elif 'done' in entry:
+                    self.done.add(entry['done'])
+        return self.run is not None
+
+    def start(self, run: dict):
+        """Begin a new checkpoint with the run's parameters."""
+        self.run = run
+        self.done = set()
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({'run': run}) + '\n')
+
+    def is_done(self, label: str) -> bool:
+        return label in self.done
+
+    def mark(self, label: str):
+        """Record a landed load."""
+        line = (json.dumps({'done': label}) + '\n').encode()
+        with self.lock:
+            self.done.add(label)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+
+class CheckpointSink:
+    """Sink wrapper that records every successfully written label in a checkpoint."""
+
+    def __init__(self, sink, checkpoint: SeedCheckpoint):
+        self.sink = sink
+        self.checkpoint = checkpoint
+
+    def write(self, table: str, rows, label=None) -> bool:
+        ok = self.sink.write(table, rows, label)
+        if ok and label:
+            self.checkpoint.mark(label)
+        return ok
+
+    def close(self):
+        self.sink.close()
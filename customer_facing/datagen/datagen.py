@@ -11,18 +11,73 @@ Tables:
 
 Usage:
     python datagen.py --host HOST --port PORT --user USER --password PASS --database DB
+
+    # Micro-batched mode: flush every 5000 rows or 200 ms, whichever comes first
+    python datagen.py ... --events-per-second 50000 --batch-size 5000 --flush-interval-ms 200
+
+    # Write fact rows through Stream Load instead of INSERT
+    python datagen.py ... --batch-size 5000 --sink stream-load --http-port 8030
+
+    # Spread the target rate over 8 worker processes with disjoint ID blocks
+    python datagen.py ... --events-per-second 200000 --batch-size 5000 --workers 8
+
+    # Shape the offered load: a compressed day every 10 minutes, or 10x bursts
+    python datagen.py ... --profile diurnal --profile-period 600
+    python datagen.py ... --profile burst --profile-period 60 --burst-factor 10 --burst-duration 5
+
+    # Generate events as NumPy column blocks (requires numpy)
+    python datagen.py ... --events-per-second 500000 --batch-size 50000 --columnar --sink stream-load
+
+    # Overlap 8 inserts over a pool of async connections, 16 more batches queued (requires aiomysql)
+    python datagen.py ... --batch-size 2000 --async --pool-size 8 --max-inflight 16
+
+    # Expose Prometheus metrics on :9100/metrics (requires prometheus_client)
+    python datagen.py ... --metrics-port 9100
+
+    # Keep the ID watermark in a local file instead of the datagen_id_watermark table
+    python datagen.py ... --id-store file --id-state-file /var/lib/datagen/ids.json
+
+    # Let VeloDB group commit merge per-row inserts server-side (async or sync)
+    python datagen.py ... --group-commit async_mode
+
+    # Back off (bigger batches, lower rate) when VeloDB is overloaded; retry failed batches
+    python datagen.py ... --adaptive --latency-target-ms 500 --compaction-score-limit 100
 """
 
 import argparse
+import asyncio
+import multiprocessing
 import random
 import time
 import signal
 import sys
+import uuid
 from datetime import datetime
 from typing import Optional
 import mysql.connector
 from mysql.connector import Error
 
+from backpressure import AdaptiveController, CompactionMonitor, RetryBuffer, is_retryable
+from idalloc import (DEFAULT_LEASE_SIZE, ID_COLUMNS, ID_STORES, LeasedIdAllocator, TableWatermarkStore,
+                     load_watermarks, make_store)
+from metrics import InstrumentedSink, NullMetrics, make_metrics
+from scheduler import MIN_SLEEP, PROFILES, RateScheduler, TrafficProfile
+from sinks import GROUP_COMMIT_MODES, SINK_TYPES, STREAM_LOAD_FORMATS, MySQLSink, make_sink
+
+# Optional NumPy-backed block generation
+try:
+    from columnar import BlockGenerator
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Optional asyncio runner over an aiomysql connection pool
+try:
+    from async_runner import AsyncRunner
+    AIOMYSQL_AVAILABLE = True
+except ImportError:
+    AIOMYSQL_AVAILABLE = False
+
 # Configuration
 FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Quinn', 'Avery', 'Blake']
 LAST_NAMES = ['Chen', 'Smith', 'Garcia', 'Kim', 'Patel', 'Mueller', 'Santos', 'Nguyen', 'Johnson', 'Lee']
@@ -43,15 +98,73 @@ SEARCH_QUERIES = [
 
 CONVERSION_TYPES = ['signup', 'upgrade', 'purchase', 'churn']
 
+# IDs handed to a worker per lease in --workers mode
+ID_BLOCK_SIZE = 10000
+COORDINATOR_REPORT_INTERVAL = 5
+STATUS_INTERVAL = 1.0
+# How long shutdown keeps retrying failed batches before giving up on them
+SHUTDOWN_RETRY_SECONDS = 30
+
+
+class IdBlockAllocator:
+    """Hand out disjoint ID blocks to worker processes from shared counters.
+
+    When limits are set, leases never pass the per-kind limit; the coordinator
+    raises it after persisting a new watermark (see extend_limits), by enough
+    for the largest waiting lease even when that is more than the reserve.
+    """
+
+    def __init__(self, start_ids: dict, block_size: int = ID_BLOCK_SIZE, limited: bool = False):
+        self.block_size = block_size
+        self.lock = multiprocessing.Lock()
+        self.counters = {kind: multiprocessing.Value('q', start, lock=False) for kind, start in start_ids.items()}
+        self.limits = None
+        if limited:
+            self.limits = {kind: multiprocessing.Value('q', start, lock=False) for kind, start in start_ids.items()}
+            # Largest lease blocked on the limit, per kind
+            self.waiting = {kind: multiprocessing.Value('q', 0, lock=False) for kind in start_ids}
+
+    def lease(self, kind: str, size: Optional[int] = None) -> tuple:
+        """Reserve the next block for kind and return its (first, last) IDs."""
+        size = size or self.block_size
+        while True:
+            with self.lock:
+                counter = self.counters[kind]
+                if self.limits is None or counter.value + size <= self.limits[kind].value:
+                    first = counter.value + 1
+                    counter.value += size
+                    if self.limits is not None and self.waiting[kind].value == size:
+                        self.waiting[kind].value = 0
+                    return first, first + size - 1
+                self.waiting[kind].value = max(self.waiting[kind].value, size)
+            time.sleep(0.01)  # Wait for the coordinator to persist a higher watermark
+
+    def extend_limits(self, store, reserve: int):
+        """Persist and publish new limits once less than half of reserve is left."""
+        for kind, limit in self.limits.items():
+            with self.lock:
+                used = self.counters[kind].value
+                # A columnar batch may need more IDs than the reserve holds
+                needed = max(reserve, 2 * self.waiting[kind].value)
+            if limit.value - used < needed // 2:
+                # Lease above our limit and above anything another process took from the store
+                base = store.reserve(kind, needed, limit.value)
+                with self.lock:
+                    if base > limit.value:
+                        self.counters[kind].value = base  # Skip the IDs someone else leased
+                    limit.value = base + needed
+
 
 class DataGenerator:
-    def __init__(self, host: str, port: int, user: str, password: str, database: str):
+    def __init__(self, host: str, port: int, user: str, password: str, database: str, sink=None):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
         self.conn: Optional[mysql.connector.MySQLConnection] = None
+        self.sink = sink  # Defaults to MySQLSink over self.conn
+        self.metrics = NullMetrics()
         self.running = True
 
         # Track generated IDs
@@ -61,6 +174,19 @@ class DataGenerator:
         self.max_event_id = 0
         self.max_conversion_id = 0
 
+        # Set in --workers mode: IDs come from leased blocks instead of the local counters
+        self.id_allocator: Optional[IdBlockAllocator] = None
+        self.id_blocks = {}
+
+        # Persistent ID watermark (see idalloc.py); None means MAX() on every start
+        self.id_store = None
+        self.id_lease_size = DEFAULT_LEASE_SIZE
+        self.shared_counters = None
+
+        # Backpressure controller and retry buffer (--adaptive); None drops failed batches
+        self.controller: Optional[AdaptiveController] = None
+        self.retries: Optional[RetryBuffer] = None
+
         # Setup signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -69,18 +195,24 @@ class DataGenerator:
         print("\n[INFO] Shutting down gracefully...")
         self.running = False
 
+    def open_connection(self):
+        """Open an autocommit connection with the generator's settings."""
+        return mysql.connector.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            autocommit=True
+        )
+
     def connect(self) -> bool:
         """Establish database connection."""
         try:
-            self.conn = mysql.connector.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                autocommit=True
-            )
+            self.conn = self.open_connection()
             print(f"[INFO] Connected to {self.host}:{self.port}/{self.database}")
+            if self.sink is None:
+                self.sink = MySQLSink(self.conn)
             return True
         except Error as e:
             print(f"[ERROR] Failed to connect: {e}")
@@ -88,6 +220,8 @@ class DataGenerator:
 
     def disconnect(self):
         """Close database connection."""
+        if self.sink:
+            self.sink.close()
         if self.conn and self.conn.is_connected():
             self.conn.close()
             print("[INFO] Disconnected from database")
@@ -115,22 +249,26 @@ class DataGenerator:
             print(f"[ERROR] Query failed: {e}")
             return None
 
-    def get_max_ids(self):
-        """Get current max IDs from tables."""
-        result = self.query_one("SELECT COALESCE(MAX(user_id), 0) FROM dim_users")
-        self.max_user_id = result[0] if result else 0
-
-        result = self.query_one("SELECT COALESCE(MAX(feature_id), 0) FROM dim_features")
-        self.max_feature_id = result[0] if result else 0
+    def get_max_ids(self, recover: bool = False):
+        """Get current max IDs from the ID watermark, or from the tables on first start.
 
-        result = self.query_one("SELECT COALESCE(MAX(campaign_id), 0) FROM dim_campaigns")
-        self.max_campaign_id = result[0] if result else 0
-
-        result = self.query_one("SELECT COALESCE(MAX(event_id), 0) FROM fact_events")
-        self.max_event_id = result[0] if result else 0
-
-        result = self.query_one("SELECT COALESCE(MAX(conversion_id), 0) FROM fact_conversions")
-        self.max_conversion_id = result[0] if result else 0
+        With an id_store, fact IDs are then leased from the watermark in blocks
+        of id_lease_size, so later restarts skip the MAX() scans.
+        """
+        try:
+            ids = load_watermarks(self.id_store, self.conn, ID_COLUMNS, recover)
+        except Error as e:
+            print(f"[ERROR] Failed to load max IDs: {e}")
+            return False
+        self.max_user_id = ids['user']
+        self.max_feature_id = ids['feature']
+        self.max_campaign_id = ids['campaign']
+        self.max_event_id = ids['event']
+        self.max_conversion_id = ids['conversion']
+        if self.id_store is not None and self.id_allocator is None:
+            self.id_allocator = LeasedIdAllocator(
+                self.id_store, {'event': self.max_event_id, 'conversion': self.max_conversion_id},
+                self.id_lease_size)
 
         print(f"[INFO] Current max IDs - users:{self.max_user_id}, features:{self.max_feature_id}, "
               f"campaigns:{self.max_campaign_id}, events:{self.max_event_id}, conversions:{self.max_conversion_id}")
@@ -141,12 +279,34 @@ class DataGenerator:
             return False
         return True
 
+    def next_id(self, kind: str) -> int:
+        """Return the next event or conversion ID."""
+        attr = f"max_{kind}_id"
+        if self.id_allocator is None:
+            setattr(self, attr, getattr(self, attr) + 1)
+            return getattr(self, attr)
+
+        next_id, last_id = self.id_blocks.get(kind, (1, 0))
+        if next_id > last_id:
+            next_id, last_id = self.id_allocator.lease(kind)
+        self.id_blocks[kind] = (next_id + 1, last_id)
+        setattr(self, attr, next_id)
+        return next_id
+
+    def reserve_ids(self, kind: str, count: int) -> int:
+        """Reserve count contiguous event or conversion IDs and return the first."""
+        attr = f"max_{kind}_id"
+        if self.id_allocator is None:
+            first = getattr(self, attr) + 1
+        else:
+            first, _ = self.id_allocator.lease(kind, count)
+        setattr(self, attr, first + count - 1)
+        return first
+
     def generate_event(self) -> dict:
         """Generate a single event."""
-        self.max_event_id += 1
-
         event = {
-            'event_id': self.max_event_id,
+            'event_id': self.next_id('event'),
             'user_id': random.randint(1, self.max_user_id),
             'feature_id': random.randint(1, self.max_feature_id),
             'campaign_id': random.randint(1, self.max_campaign_id),
@@ -161,15 +321,13 @@ class DataGenerator:
 
     def generate_conversion(self) -> dict:
         """Generate a single conversion."""
-        self.max_conversion_id += 1
-
         conv_type = random.choice(CONVERSION_TYPES)
         plan_from = random.choice([None, 'Free', 'Pro']) if conv_type != 'signup' else None
         plan_to = random.choice(['Pro', 'Enterprise']) if conv_type in ['signup', 'upgrade'] else None
         revenue = round(random.uniform(10, 500) if random.random() < 0.7 else random.uniform(500, 2000), 2)
 
         conversion = {
-            'conversion_id': self.max_conversion_id,
+            'conversion_id': self.next_id('conversion'),
             'user_id': random.randint(1, self.max_user_id),
             'feature_id': random.randint(1, self.max_feature_id),
             'campaign_id': random.randint(1, self.max_campaign_id),
@@ -182,31 +340,31 @@ class DataGenerator:
         }
         return conversion
 
+    @staticmethod
+    def event_row(event: dict) -> tuple:
+        """Convert an event dict to a fact_events row tuple."""
+        return (event['event_id'], event['user_id'], event['feature_id'], event['campaign_id'],
+                event['session_id'], event['event_type'], event['event_time'], event['page_url'],
+                event['search_query'], event['properties'])
+
+    @staticmethod
+    def conversion_row(conversion: dict) -> tuple:
+        """Convert a conversion dict to a fact_conversions row tuple."""
+        return (conversion['conversion_id'], conversion['user_id'], conversion['feature_id'],
+                conversion['campaign_id'], conversion['conversion_type'], conversion['conversion_time'],
+                conversion['plan_from'], conversion['plan_to'], conversion['revenue'], conversion['properties'])
+
     def insert_event(self, event: dict):
         """Insert event into database."""
-        self.execute(
-            """INSERT INTO fact_events VALUES
-               (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (event['event_id'], event['user_id'], event['feature_id'], event['campaign_id'],
-             event['session_id'], event['event_type'], event['event_time'], event['page_url'],
-             event['search_query'], event['properties'])
-        )
+        self.sink.write('fact_events', [self.event_row(event)])
 
     def insert_conversion(self, conversion: dict):
         """Insert conversion into database."""
-        self.execute(
-            """INSERT INTO fact_conversions VALUES
-               (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-            (conversion['conversion_id'], conversion['user_id'], conversion['feature_id'],
-             conversion['campaign_id'], conversion['conversion_type'], conversion['conversion_time'],
-             conversion['plan_from'], conversion['plan_to'], conversion['revenue'], conversion['properties'])
-        )
-
-    def add_new_user(self):
-        """Add a new user to simulate organic growth."""
-        self.max_user_id += 1
-        i = self.max_user_id
+        self.sink.write('fact_conversions', [self.conversion_row(conversion)])
 
+    def new_user_row(self) -> tuple:
+        """Draw a dim_users row for the next user ID; max_user_id moves once it is written."""
+        i = self.max_user_id + 1
         name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
         email = f"user{i}@{random.choice(EMAIL_DOMAINS)}"
         signup_date = datetime.now().strftime('%Y-%m-%d')
@@ -214,51 +372,368 @@ class DataGenerator:
         country = random.choice(COUNTRIES)
         industry = random.choice(INDUSTRIES)
         props = f'{{"device":"{random.choice(DEVICES)}","browser":"{random.choice(BROWSERS)}"}}'
+        return (i, email, name, signup_date, plan, country, industry, props)
+
+    def user_written(self, row: tuple, ok: bool):
+        """Record the outcome of inserting a new_user_row()."""
+        if not ok:
+            # Facts never reference a user that was not written
+            self.metrics.error('dim_users_insert')
+            return
+        self.max_user_id = row[0]
+        self.metrics.rows_written('dim_users', 1)
+        print(f"[NEW USER] {row[2]} ({row[1]}) joined with {row[4]} plan")
 
-        self.execute(
-            "INSERT INTO dim_users VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-            (i, email, name, signup_date, plan, country, industry, props)
-        )
-        print(f"[NEW USER] {name} ({email}) joined with {plan} plan")
+    def add_new_user(self):
+        """Add a new user to simulate organic growth."""
+        row = self.new_user_row()
+        self.metrics.rows_generated('dim_users', 1)
+        self.user_written(row, self.execute("INSERT INTO dim_users VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", row))
+
+    def write(self, table: str, rows) -> bool:
+        """Write one fact batch.
+
+        With a controller the batch is labelled and its outcome is fed back. A
+        batch that failed under pressure or on a lost connection is kept for
+        retry_failed() instead of being dropped; other failures are dropped.
+        """
+        if self.controller is None:
+            ok = self.sink.write(table, rows)
+        else:
+            label = f"datagen_{table}_{uuid.uuid4().hex}"
+            ok = self._attempt(table, rows, label)
+            if not ok:
+                self._retry_later(table, rows, label, 1)
+        if ok:
+            self.count_written(table, len(rows))
+        return ok
+
+    def _attempt(self, table: str, rows, label: str) -> bool:
+        start = time.perf_counter()
+        ok = self.sink.write(table, rows, label)
+        self.controller.observe(time.perf_counter() - start, ok, getattr(self.sink, 'last_error_message', None))
+        return ok
+
+    def _retry_later(self, table: str, rows, label: str, attempts: int, front: bool = False) -> bool:
+        """Buffer a failed batch for another attempt; return False when it is dropped instead."""
+        error = getattr(self.sink, 'last_error', None)
+        if not is_retryable(error, getattr(self.sink, 'last_error_message', None)):
+            self.retries.drop(table, rows, label, f"{error or 'error'} is not retryable")
+            return False
+        if attempts >= self.retries.max_attempts:
+            self.retries.drop(table, rows, label, f"still failing after {attempts} attempts")
+            return False
+        if front:
+            self.retries.push_front(table, rows, label, attempts)
+        else:
+            self.retries.push(table, rows, label, attempts)
+        self.retries.defer(self.controller.backoff())
+        return True
 
-    def run(self, events_per_second: float = 10, conversion_interval: float = 5, new_user_interval: float = 30):
-        """Run continuous data generation."""
-        print(f"[INFO] Starting data generation - {events_per_second} events/sec, "
+    def retry_failed(self):
+        """Re-send failed batches oldest first once their backoff has elapsed."""
+        retried = 0
+        while self.retries and self.retries.due():
+            table, rows, label, attempts = self.retries.pop()
+            if not self._attempt(table, rows, label):
+                if self._retry_later(table, rows, label, attempts + 1, front=True):
+                    return
+                continue
+            self.count_written(table, len(rows))
+            retried += len(rows)
+        if retried and not self.retries:
+            print(f"[INFO] Retry buffer drained - last {retried} rows written")
+
+    def drain_retries(self, timeout: float = SHUTDOWN_RETRY_SECONDS):
+        """Keep retrying until the buffer is empty or timeout expires, then report what is lost."""
+        if self.retries:
+            print(f"[INFO] Retrying {self.retries.rows} buffered rows before exit")
+        deadline = time.monotonic() + timeout
+        while self.retries and time.monotonic() < deadline:
+            self.retry_failed()
+            if self.retries:
+                time.sleep(max(0.0, min(self.retries.next_attempt, deadline) - time.monotonic()))
+        if self.retries:
+            print(f"[ERROR] Giving up on {self.retries.rows} rows in {len(self.retries)} batches")
+        if self.retries.dropped_rows:
+            print(f"[ERROR] {self.retries.dropped_rows} rows were dropped after failing")
+
+    def flush(self, events_batch: list, conversions_batch: list):
+        """Write buffered events and conversions as multi-row inserts."""
+        if events_batch:
+            self.metrics.rows_generated('fact_events', len(events_batch))
+            self.write('fact_events', list(events_batch))
+            events_batch.clear()
+        if conversions_batch:
+            self.metrics.rows_generated('fact_conversions', len(conversions_batch))
+            self.write('fact_conversions', list(conversions_batch))
+            conversions_batch.clear()
+
+    def count_written(self, table: str, count: int):
+        """Add rows that were written to the coordinator's counters in --workers mode."""
+        if self.shared_counters:
+            counter = 'events' if table == 'fact_events' else 'conversions'
+            with self.shared_counters['lock']:
+                self.shared_counters[counter].value += count
+
+    def run(self, events_per_second: float = 10, conversion_interval: float = 5, new_user_interval: float = 30,
+            batch_size: int = 1, flush_interval_ms: float = 1000, profile: Optional[TrafficProfile] = None,
+            columnar: bool = False):
+        """Run continuous data generation.
+
+        Events and conversions are buffered and flushed as multi-row inserts once
+        batch_size rows are pending or flush_interval_ms has elapsed, whichever
+        comes first. batch_size=1 keeps the original one-insert-per-event behavior.
+
+        Events are paced by a RateScheduler following profile (constant at
+        events_per_second when not given), so insert latency does not lower the
+        offered rate.
+
+        With columnar=True events are drawn as NumPy blocks of up to batch_size
+        rows (one flush interval's worth at the current rate) and each block is
+        written as one batch.
+
+        With a controller, batch size, flush interval and pacing follow its
+        feedback, and generation pauses while the retry buffer is full.
+        """
+        profile = profile or TrafficProfile('constant', events_per_second)
+        scheduler = RateScheduler(profile)
+        print(f"[INFO] Starting data generation - {profile.describe()}, "
               f"conversion every {conversion_interval}s, new user every {new_user_interval}s")
-
-        event_interval = 1.0 / events_per_second
+        if batch_size > 1:
+            print(f"[INFO] Batching enabled - flush every {batch_size} rows or {flush_interval_ms:.0f}ms")
+        block_generator = None
+        if columnar:
+            block_generator = BlockGenerator(EVENT_TYPES, PAGES, SEARCH_QUERIES, CONVERSION_TYPES)
+            print("[INFO] Columnar block generation enabled")
+
+        flush_interval = flush_interval_ms / 1000.0
         last_conversion = time.time()
         last_new_user = time.time()
+        last_flush = time.time()
+        last_status = time.time()
+        last_status_events = 0
         events_generated = 0
         conversions_generated = 0
+        events_batch = []
+        conversions_batch = []
 
+        base_flush_interval = flush_interval
         while self.running:
+            if self.controller is not None:
+                self.retry_failed()
+                if self.retries.full:
+                    # Stop offering load until the cluster catches up; the scheduler drops the backlog
+                    time.sleep(min(1.0, max(MIN_SLEEP, self.retries.next_attempt - time.monotonic())))
+                    continue
+                batch_size = self.controller.batch_size
+                flush_interval = self.controller.flush_interval(base_flush_interval)
+                scheduler.rate_factor = self.controller.rate_factor
+
             # Generate events
-            event = self.generate_event()
-            self.insert_event(event)
-            events_generated += 1
+            if block_generator is None:
+                scheduler.acquire()
+                event = self.generate_event()
+                events_batch.append(self.event_row(event))
+                events_generated += 1
+            else:
+                count = max(1, min(batch_size, int(scheduler.target_rate() * flush_interval)))
+                scheduler.acquire(count)
+                block = block_generator.events(count, self.reserve_ids('event', count), self.max_user_id,
+                                               self.max_feature_id, self.max_campaign_id)
+                self.metrics.rows_generated('fact_events', count)
+                self.write('fact_events', block)
+                events_generated += count
 
             # Generate conversion periodically
             if time.time() - last_conversion >= conversion_interval:
                 conversion = self.generate_conversion()
-                self.insert_conversion(conversion)
+                conversions_batch.append(self.conversion_row(conversion))
                 conversions_generated += 1
                 last_conversion = time.time()
                 print(f"[CONVERSION] {conversion['conversion_type']} - ${conversion['revenue']:.2f}")
 
+            # Flush on size or age, whichever comes first
+            pending = len(events_batch) + len(conversions_batch)
+            if pending >= batch_size or time.time() - last_flush >= flush_interval:
+                self.flush(events_batch, conversions_batch)
+                last_flush = time.time()
+
             # Add new user periodically
             if time.time() - last_new_user >= new_user_interval:
                 self.add_new_user()
                 last_new_user = time.time()
 
-            # Status update every 100 events
-            if events_generated % 100 == 0:
+            # Status update every 100 events, at most once per STATUS_INTERVAL
+            if events_generated - last_status_events >= 100 and time.time() - last_status >= STATUS_INTERVAL:
+                achieved, target = scheduler.report()
+                self.metrics.set_rates(achieved, target)
+                adaptive = ""
+                if self.controller is not None:
+                    adaptive = f", Adaptive: {self.controller.describe()}, Retry rows: {self.retries.rows}"
                 print(f"[STATUS] Events: {events_generated}, Conversions: {conversions_generated}, "
-                      f"Users: {self.max_user_id}")
+                      f"Users: {self.max_user_id}, Rate: {achieved:,.1f}/sec (target {target:,.1f}/sec){adaptive}")
+                last_status = time.time()
+                last_status_events = events_generated
+
+        self.flush(events_batch, conversions_batch)
+        if self.controller is not None:
+            self.drain_retries()
+        achieved, target = scheduler.totals()
+        print(f"[INFO] Final stats - Events: {events_generated}, Conversions: {conversions_generated}, "
+              f"Rate: {achieved:,.1f}/sec (target {target:,.1f}/sec)")
+
+    def run_async(self, conversion_interval: float = 5, new_user_interval: float = 30, batch_size: int = 1000,
+                  flush_interval_ms: float = 1000, profile: Optional[TrafficProfile] = None,
+                  columnar: bool = False, pool_size: int = 8, max_inflight: int = 16,
+                  group_commit: str = 'off_mode'):
+        """Run continuous data generation with inserts overlapped over an async connection pool."""
+        profile = profile or TrafficProfile('constant', 10)
+        print(f"[INFO] Starting async data generation - {profile.describe()}, "
+              f"conversion every {conversion_interval}s, new user every {new_user_interval}s")
+        block_generator = BlockGenerator(EVENT_TYPES, PAGES, SEARCH_QUERIES, CONVERSION_TYPES) if columnar else None
+        runner = AsyncRunner(self, pool_size, max_inflight, group_commit)
+        asyncio.run(runner.run(RateScheduler(profile), conversion_interval, new_user_interval,
+                               batch_size, flush_interval_ms / 1000.0, block_generator))
 
-            time.sleep(event_interval)
 
-        print(f"[INFO] Final stats - Events: {events_generated}, Conversions: {conversions_generated}")
+def _worker_main(worker_id: int, args, max_ids: dict, id_allocator: IdBlockAllocator, shared_counters: dict):
+    """Worker process entry point for --workers mode."""
+    gen = DataGenerator(args.host, args.port, args.user, args.password, args.database)
+    if not gen.connect():
+        sys.exit(1)
+    attach_sink(gen, args, worker_id)
+    profile = build_profile(args).scaled(1 / args.workers)
+    gen.max_user_id = max_ids['user']
+    gen.max_feature_id = max_ids['feature']
+    gen.max_campaign_id = max_ids['campaign']
+    gen.id_allocator = id_allocator
+    gen.shared_counters = shared_counters
+
+    # Split the offered load evenly; only worker 0 grows dim_users so user IDs stay unique
+    workers = args.workers
+    new_user_interval = args.new_user_interval if worker_id == 0 else float('inf')
+    try:
+        generate(gen, args, profile, args.conversion_interval * workers, new_user_interval)
+    finally:
+        gen.disconnect()
+
+
+def run_workers(gen: DataGenerator, args):
+    """Coordinate --workers processes and report their aggregated throughput."""
+    max_ids = {'user': gen.max_user_id, 'feature': gen.max_feature_id, 'campaign': gen.max_campaign_id}
+    start_ids = {'event': gen.max_event_id, 'conversion': gen.max_conversion_id}
+    id_store = gen.id_store
+    id_allocator = IdBlockAllocator(start_ids, limited=id_store is not None)
+    # Keep a few leases per worker ahead of the persisted watermark
+    id_reserve = max(gen.id_lease_size, ID_BLOCK_SIZE) * args.workers * 4
+    if id_store is not None:
+        id_allocator.extend_limits(id_store, id_reserve)
+    shared_counters = {
+        'lock': multiprocessing.Lock(),
+        'events': multiprocessing.Value('q', 0, lock=False),
+        'conversions': multiprocessing.Value('q', 0, lock=False),
+    }
+
+    # Workers open their own connections; don't let forked children inherit ours.
+    gen.disconnect()
+
+    profile = build_profile(args)
+    print(f"[INFO] Starting {args.workers} workers - {profile.describe()} in total")
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(i, args, max_ids, id_allocator, shared_counters),
+                                name=f"datagen-worker-{i}")
+        for i in range(args.workers)
+    ]
+    for p in workers:
+        p.start()
+
+    # A table store reconnects only once every worker is forked, to keep extending the watermark
+    if isinstance(id_store, TableWatermarkStore):
+        if not gen.connect():
+            print("[WARN] Cannot persist the ID watermark; workers block once the current reserve is used up")
+        id_store.conn = gen.conn
+
+    start = last_report = time.time()
+    last_events = 0
+    while gen.running and any(p.is_alive() for p in workers):
+        time.sleep(0.5)
+        if id_store is not None:
+            try:
+                id_allocator.extend_limits(id_store, id_reserve)
+            except (Error, RuntimeError) as e:
+                print(f"[ERROR] Failed to persist ID watermark: {e}")
+        now = time.time()
+        if now - last_report >= COORDINATOR_REPORT_INTERVAL:
+            events = shared_counters['events'].value
+            conversions = shared_counters['conversions'].value
+            rate = (events - last_events) / (now - last_report)
+            target = profile.rate_at(now - start)
+            print(f"[COORDINATOR] Events: {events}, Conversions: {conversions}, "
+                  f"Rate: {rate:,.0f} events/sec (target {target:,.0f}), "
+                  f"Workers alive: {sum(p.is_alive() for p in workers)}/{args.workers}")
+            last_report, last_events = now, events
+
+    for p in workers:
+        if p.is_alive():
+            p.terminate()  # SIGTERM: workers flush their buffers and exit
+    for p in workers:
+        p.join()
+
+    elapsed = time.time() - start
+    events = shared_counters['events'].value
+    print(f"[INFO] Final stats - Events: {events}, Conversions: {shared_counters['conversions'].value}, "
+          f"Average rate: {events / elapsed:,.0f} events/sec over {elapsed:.0f}s")
+
+
+def attach_sink(gen: DataGenerator, args, worker_id: Optional[int] = None):
+    """Give gen the sink selected on the command line, instrumented when metrics are on.
+
+    In --async mode only the metrics are set up.
+    """
+    label_prefix = 'datagen' if worker_id is None else f'datagen_w{worker_id}'
+    gen.metrics = make_metrics(args.metrics_port, worker_id or 0)
+    if args.use_async:
+        return  # The async runner writes through its own pool
+    conn, owns_conn = gen.conn, False
+    if args.group_commit != 'off_mode' and args.sink == 'mysql':
+        # Own session for group-committed facts; dimension and watermark writes stay synchronous
+        conn, owns_conn = gen.open_connection(), True
+        print(f"[INFO] Fact inserts use group commit ({args.group_commit})")
+    sink = make_sink(args.sink, conn, args.host, args.http_port, args.user, args.password,
+                     args.database, args.stream_load_format, label_prefix=label_prefix,
+                     group_commit=args.group_commit, owns_conn=owns_conn)
+    gen.sink = InstrumentedSink(sink, gen.metrics)
+
+
+def attach_controller(gen: DataGenerator, args):
+    """Give gen a backpressure controller and retry buffer when --adaptive is set."""
+    if not args.adaptive:
+        return
+    monitor = None
+    if args.compaction_score_limit:
+        monitor = CompactionMonitor(args.host, args.http_port, args.user, args.password)
+    gen.controller = AdaptiveController(args.batch_size, args.max_batch_size, args.latency_target_ms / 1000.0,
+                                        args.min_rate_factor, monitor, args.compaction_score_limit)
+    gen.retries = RetryBuffer(args.max_retry_rows)
+
+
+def generate(gen: DataGenerator, args, profile: TrafficProfile, conversion_interval: float,
+             new_user_interval: float):
+    """Run gen with the synchronous or async runner selected on the command line."""
+    attach_controller(gen, args)
+    if args.use_async:
+        gen.run_async(conversion_interval, new_user_interval, args.batch_size, args.flush_interval_ms,
+                      profile, args.columnar, args.pool_size, args.max_inflight, args.group_commit)
+    else:
+        gen.run(profile.base_rate, conversion_interval, new_user_interval,
+                args.batch_size, args.flush_interval_ms, profile, args.columnar)
+
+
+def build_profile(args) -> TrafficProfile:
+    """Build the traffic profile selected on the command line."""
+    return TrafficProfile(args.profile, args.events_per_second, args.profile_period,
+                          args.burst_factor, args.burst_duration)
 
 
 def main():
@@ -271,18 +746,82 @@ def main():
     parser.add_argument('--events-per-second', type=float, default=10, help='Events to generate per second')
     parser.add_argument('--conversion-interval', type=float, default=5, help='Seconds between conversions')
     parser.add_argument('--new-user-interval', type=float, default=30, help='Seconds between new users')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Rows to buffer before a multi-row insert (1 = insert every event)')
+    parser.add_argument('--flush-interval-ms', type=float, default=1000,
+                        help='Maximum milliseconds a row may wait in the buffer before flushing')
+    parser.add_argument('--sink', choices=SINK_TYPES, default='mysql',
+                        help='How fact rows are written (dimension rows always use MySQL)')
+    parser.add_argument('--http-port', type=int, default=8030, help='FE HTTP port for Stream Load')
+    parser.add_argument('--stream-load-format', choices=STREAM_LOAD_FORMATS, default='csv',
+                        help='Payload format for Stream Load batches')
+    parser.add_argument('--group-commit', choices=GROUP_COMMIT_MODES, default='off_mode',
+                        help='Write fact rows through VeloDB group commit (see bench_group_commit.py)')
+    parser.add_argument('--profile', choices=PROFILES, default='constant',
+                        help='Traffic shape applied to --events-per-second')
+    parser.add_argument('--profile-period', type=float, default=86400,
+                        help='Seconds per simulated day (diurnal), per step (step) or between bursts (burst)')
+    parser.add_argument('--burst-factor', type=float, default=5.0, help='Rate multiplier during bursts')
+    parser.add_argument('--burst-duration', type=float, default=10.0, help='Seconds each burst lasts')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Generate events as NumPy column blocks (requires numpy)')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Overlap MySQL inserts over a pool of async connections (requires aiomysql)')
+    parser.add_argument('--pool-size', type=int, default=8,
+                        help='Async connections in the pool, one writer each: the number of concurrent inserts')
+    parser.add_argument('--max-inflight', type=int, default=16,
+                        help='Batches queued for the async writers before generation blocks')
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help='Serve Prometheus metrics on this port (workers use port + worker number)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes, each writing its own disjoint ID blocks')
+    parser.add_argument('--id-store', choices=ID_STORES, default='table',
+                        help='Where the ID watermark is persisted (none = MAX() scans on every start)')
+    parser.add_argument('--id-state-file', default='datagen_ids.json', help='State file for --id-store file')
+    parser.add_argument('--id-lease-size', type=int, default=DEFAULT_LEASE_SIZE,
+                        help='Fact IDs reserved per watermark update')
+    parser.add_argument('--recover-ids', action='store_true',
+                        help='Raise the fact ID watermark to MAX() of the fact tables (e.g. after external loads)')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Grow batches and lower the rate under cluster pressure; retry failed batches')
+    parser.add_argument('--latency-target-ms', type=float, default=500,
+                        help='Insert latency above which the cluster counts as under pressure')
+    parser.add_argument('--max-batch-size', type=int, default=50000, help='Largest batch --adaptive may use')
+    parser.add_argument('--min-rate-factor', type=float, default=0.1,
+                        help='Lowest fraction of the target rate --adaptive may throttle to')
+    parser.add_argument('--max-retry-rows', type=int, default=1000000,
+                        help='Buffered failed rows at which generation pauses until retries succeed')
+    parser.add_argument('--compaction-score-limit', type=float, default=0,
+                        help='Treat an FE max tablet compaction score above this as pressure (0 = off)')
 
     args = parser.parse_args()
 
+    if args.columnar and not NUMPY_AVAILABLE:
+        print("[ERROR] --columnar requires numpy (pip install numpy)")
+        sys.exit(1)
+    if args.use_async and not AIOMYSQL_AVAILABLE:
+        print("[ERROR] --async requires aiomysql (pip install aiomysql)")
+        sys.exit(1)
+    if args.use_async and args.sink != 'mysql':
+        print("[ERROR] --async writes through the MySQL protocol; use --sink mysql")
+        sys.exit(1)
+
     gen = DataGenerator(args.host, args.port, args.user, args.password, args.database)
 
     if not gen.connect():
         sys.exit(1)
+    if args.workers == 1:
+        attach_sink(gen, args)
+    gen.id_store = make_store(args.id_store, gen.conn, args.id_state_file)
+    gen.id_lease_size = args.id_lease_size
 
     try:
-        if not gen.get_max_ids():
+        if not gen.get_max_ids(args.recover_ids):
             sys.exit(1)
-        gen.run(args.events_per_second, args.conversion_interval, args.new_user_interval)
+        if args.workers > 1:
+            run_workers(gen, args)
+        else:
+            generate(gen, args, build_profile(args), args.conversion_interval, args.new_user_interval)
     finally:
         gen.disconnect()
 
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+File export for the historical seeder: generate once, load many clusters.
+
+FileSink has the same write(table, rows, label) interface as the sinks in
+sinks.py, but appends rows to local shard files instead of loading them:
+
+- csv.gz:  the \\x01-separated CSV Stream Load already uses, gzip-compressed
+- parquet: one row group per ROW_GROUP_ROWS rows (requires pyarrow)
+
+A shard is closed and a new one started once it reaches max_bytes on disk.
+Every finished shard is appended to manifest.jsonl in the output directory,
+and a line describing the run (seed, dates, ID ranges) is appended once the
+whole export succeeded. Lines are appended with a single O_APPEND write, so
+shard processes and writer threads can share the manifest. load_shards.py
+reads it and Stream Loads the shards.
+
+Usage:
+    python seed_history.py --sink file --output-dir export/sf10 --scale-factor 10 --parallel 8
+    python load_shards.py --input-dir export/sf10 --host fe-host --parallel 8
+"""
+
+import gzip
+import json
+import os
+from typing import Optional
+
+from sinks import FILE_FORMATS, TABLE_COLUMNS, csv_payload
+
+# Optional Parquet output (--file-format parquet)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MANIFEST_NAME = 'manifest.jsonl'
+DEFAULT_SHARD_MB = 128
+ROW_GROUP_ROWS = 65536
+
+# Columns not stored as strings in Parquet shards; VeloDB casts strings for the rest
+INT_COLUMNS = {'user_id', 'feature_id', 'campaign_id', 'event_id', 'conversion_id'}
+FLOAT_COLUMNS = {'revenue'}
+
+
+def manifest_path(output_dir: str) -> str:
+    return os.path.join(output_dir, MANIFEST_NAME)
+
+
+def start_manifest(output_dir: str):
+    """Create output_dir with an empty manifest."""
+    os.makedirs(output_dir, exist_ok=True)
+    open(manifest_path(output_dir), 'w').close()
+
+
+def append_manifest(output_dir: str, entry: dict):
+    fd = os.open(manifest_path(output_dir), os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, (json.dumps(entry) + '\n').encode())
+    finally:
+        os.close(fd)
+
+
+def read_manifest(output_dir: str) -> tuple:
+    """Return (run, shard entries) from output_dir's manifest."""
+    run, shards = None, []
+    with open(manifest_path(output_dir)) as f:
+        for line in f:
+            entry = json.loads(line)
+            if 'run' in entry:
+                run = entry['run']
+            else:
+                shards.append(entry)
+    return run, shards
+
+
+def parquet_schema(table: str):
+    fields = []
+    for column in TABLE_COLUMNS[table]:
+        if column in INT_COLUMNS:
+            fields.append(pa.field(column, pa.int64()))
+        elif column in FLOAT_COLUMNS:
+            fields.append(pa.field(column, pa.float64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+class ShardFile:
+    """One open shard of one table."""
+
+    def __init__(self, path: str, table: str, fmt: str):
+        self.path = path
+        self.table = table
+        self.fmt = fmt
+        self.rows = 0
+        self.first_id = None
+        self.last_id = None
+        self.file = open(path, 'wb')
+        self.pending = []
+        if fmt == 'csv.gz':
+            self.writer = gzip.GzipFile(fileobj=self.file, mode='wb', compresslevel=6)
+        else:
+            self.schema = parquet_schema(table)
+            self.writer = pq.ParquetWriter(self.file, self.schema, compression='zstd')
+
+    def write(self, rows):
+        if hasattr(rows, 'csv_lines'):
+            # ColumnBlock: the ID column is a contiguous NumPy range
+            first, last = int(rows.columns[0][0]), int(rows.columns[0][-1])
+        else:
+            first, last = rows[0][0], rows[-1][0]
+        if self.fmt == 'csv.gz':
+            self.writer.write(csv_payload(rows))
+        else:
+            self.pending.extend(rows.rows() if hasattr(rows, 'csv_lines') else rows)
+            if len(self.pending) >= ROW_GROUP_ROWS:
+                self._flush_row_group()
+        self.rows += len(rows)
+        self.first_id = first if self.first_id is None else min(self.first_id, first)
+        self.last_id = last if self.last_id is None else max(self.last_id, last)
+
+    def _flush_row_group(self):
+        if not self.pending:
+            return
+        columns = list(zip(*self.pending))
+        arrays = [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.pending = []
+
+    def size(self) -> int:
+        """Bytes on disk so far (Parquet row groups still buffered are not counted)."""
+        return self.file.tell()
+
+    def close(self) -> dict:
+        if self.fmt == 'parquet':
+            self._flush_row_group()
+        self.writer.close()
+        self.file.close()
+        return {'table': self.table, 'file': os.path.basename(self.path), 'format': self.fmt,
+                'rows': self.rows, 'bytes': os.path.getsize(self.path),
+                'first_id': self.first_id, 'last_id': self.last_id}
+
+
+class FileSink:
+    """Write batches to size-rotated shard files and record them in the manifest."""
+
+    def __init__(self, output_dir: str, fmt: str = 'csv.gz', max_bytes: int = DEFAULT_SHARD_MB * 1024 * 1024,
+                 prefix: str = 'part'):
+        if fmt not in FILE_FORMATS:
+            raise ValueError(f"Unsupported file format: {fmt}")
+        if fmt == 'parquet' and not PYARROW_AVAILABLE:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.open_shards = {}
+        self.counts = {}
+        self.last_error = None
+        self.last_error_message = None
+
+    def write(self, table: str, rows, label: Optional[str] = None) -> bool:
+        """Append rows to the table's current shard; labels are not needed for files."""
+        if not len(rows):
+            return True
+        shard = self.open_shards.get(table)
+        if shard is None:
+            number = self.counts.get(table, 0)
+            self.counts[table] = number + 1
+            path = os.path.join(self.output_dir, f"{table}-{self.prefix}-{number:05d}.{self.fmt}")
+            shard = self.open_shards[table] = ShardFile(path, table, self.fmt)
+        try:
+            shard.write(rows)
+        except OSError as e:
+            self.last_error = 'file_write'
+            self.last_error_message = str(e)
+            print(f"[ERROR] Writing {shard.path} failed: {e}")
+            return False
+        if shard.size() >= self.max_bytes:
+            self._finish(table)
+        return True
+
+    def _finish(self, table: str):
+        entry = self.open_shards.pop(table).close()
+        append_manifest(self.output_dir, entry)
+
+    def close(self):
+        for table in list(self.open_shards):
+            self._finish(table)
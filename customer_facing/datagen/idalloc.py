@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Persistent ID watermarks so generator restarts don't scan the fact tables.
+
+The highest fact ID handed out for each kind (event, conversion) is kept in a
+watermark store: a one-row-per-kind table in VeloDB (datagen_id_watermark) or
+a local JSON state file. Generators lease ID ranges by moving the watermark
+forward *before* using them, so a crash can leave gaps but never reuses an
+ID. MAX() over the fact tables only runs when no watermark exists yet (first
+start), or with --recover-ids after rows were loaded by other means.
+
+Watermarks only ever move forward. A lease starts above both the process's
+own high mark and the stored one, so datagen and seed_history can share a
+store. The file store reserves under an flock. The table store raises the
+stored value with a single GREATEST() statement and re-reads it to detect a
+concurrent writer.
+
+Dimension IDs are not persisted: their MAX() is cheap on the small dimension
+tables, and a stored value would go stale when the tables are dropped and
+recreated (e.g. to switch setup_schema.py profiles).
+"""
+
+import fcntl
+import json
+import os
+from typing import Optional
+
+from mysql.connector import Error
+
+ID_STORES = ['table', 'file', 'none']
+DEFAULT_LEASE_SIZE = 100000
+
+WATERMARK_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS datagen_id_watermark (
+    id_kind VARCHAR(32),
+    high_id BIGINT,
+    updated_at DATETIME
+)
+UNIQUE KEY(id_kind)
+DISTRIBUTED BY HASH(id_kind) BUCKETS 1
+PROPERTIES("replication_num" = "1", "enable_unique_key_merge_on_write" = "true")
+"""
+
+# kind -> (table, column) for MAX() recovery; dimensions always use it
+ID_COLUMNS = {
+    'user': ('dim_users', 'user_id'),
+    'feature': ('dim_features', 'feature_id'),
+    'campaign': ('dim_campaigns', 'campaign_id'),
+    'event': ('fact_events', 'event_id'),
+    'conversion': ('fact_conversions', 'conversion_id'),
+}
+# Kinds whose watermark is persisted
+LEASED_KINDS = ('event', 'conversion')
+# Attempts at a table-store lease before giving up on a racing writer
+MAX_LEASE_ATTEMPTS = 10
+
+
+class TableWatermarkStore:
+    """Watermarks in a small unique-key table next to the data."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        cursor = conn.cursor()
+        cursor.execute(WATERMARK_TABLE_SQL)
+        cursor.close()
+
+    def load(self) -> dict:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id_kind, high_id FROM datagen_id_watermark")
+        rows = cursor.fetchall()
+        cursor.close()
+        return {kind: int(high) for kind, high in rows}
+
+    def save(self, watermarks: dict):
+        """Raise the stored watermarks to at least the given values; never lower them."""
+        cursor = self.conn.cursor()
+        for kind, high in watermarks.items():
+            cursor.execute("INSERT INTO datagen_id_watermark "
+                           "SELECT %s, GREATEST(%s, COALESCE(MAX(high_id), 0)), NOW() "
+                           "FROM datagen_id_watermark WHERE id_kind = %s", (kind, high, kind))
+        cursor.close()
+        if not self.conn.autocommit:
+            self.conn.commit()
+
+    def reserve(self, kind: str, count: int, floor: int) -> int:
+        """Move the watermark past count IDs above max(stored, floor); return the last ID below them."""
+        for _ in range(MAX_LEASE_ATTEMPTS):
+            base = max(self.load().get(kind, 0), floor)
+            self.save({kind: base + count})
+            # Another writer raised it past our lease in the meantime: lease above theirs
+            if self.load().get(kind, 0) == base + count:
+                return base
+        raise RuntimeError(f"Could not lease {kind} IDs: datagen_id_watermark keeps moving")
+
+    def describe(self) -> str:
+        return "table datagen_id_watermark"
+
+
+class FileWatermarkStore:
+    """Watermarks in a local JSON file, replaced atomically on every save.
+
+    Saves from several processes (coordinator and worker 0) are serialized
+    with an flock on a sidecar lock file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return {kind: int(high) for kind, high in json.load(f).items()}
+
+    def save(self, watermarks: dict):
+        """Raise the stored watermarks to at least the given values; never lower them."""
+        with open(self.lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._raise(watermarks)
+
+    def reserve(self, kind: str, count: int, floor: int) -> int:
+        """Move the watermark past count IDs above max(stored, floor); return the last ID below them."""
+        with open(self.lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            base = max(self.load().get(kind, 0), floor)
+            self._raise({kind: base + count})
+            return base
+
+    def _raise(self, watermarks: dict):
+        # Callers hold the lock
+        state = self.load()
+        for kind, high in watermarks.items():
+            state[kind] = max(state.get(kind, 0), high)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def describe(self) -> str:
+        return f"file {self.path}"
+
+
+def make_store(kind: str, conn, state_file: str):
+    """Build the watermark store selected on the command line (None for 'none')."""
+    if kind == 'file':
+        return FileWatermarkStore(state_file)
+    if kind == 'table':
+        try:
+            return TableWatermarkStore(conn)
+        except Error as e:
+            print(f"[WARN] Cannot use datagen_id_watermark table ({e}), falling back to MAX() scans")
+    return None
+
+
+def recover_max_ids(conn, kinds) -> dict:
+    """Full-table MAX() scans: the recovery path when no watermark exists."""
+    result = {}
+    cursor = conn.cursor()
+    for kind in kinds:
+        table, column = ID_COLUMNS[kind]
+        cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+        result[kind] = int(cursor.fetchone()[0] or 0)
+    cursor.close()
+    return result
+
+
+def load_watermarks(store, conn, kinds, recover: bool = False) -> dict:
+    """Return the current high ID per kind.
+
+    Fact kinds come from the watermark in constant time once it exists;
+    dimension kinds are always read with MAX().
+    """
+    watermarks = {}
+    if store is not None and not recover:
+        watermarks = {kind: high for kind, high in store.load().items() if kind in LEASED_KINDS}
+    missing = [kind for kind in kinds if kind in LEASED_KINDS and kind not in watermarks]
+    if missing:
+        print(f"[INFO] No ID watermark for {', '.join(missing)}, recovering with MAX() scans")
+    watermarks.update(recover_max_ids(conn, [kind for kind in kinds if kind not in watermarks]))
+    if missing and store is not None:
+        store.save({kind: watermarks[kind] for kind in missing})
+    return {kind: watermarks[kind] for kind in kinds}
+
+
+class LeasedIdAllocator:
+    """Hand out ID ranges below a persisted watermark.
+
+    Implements the same lease() as datagen.IdBlockAllocator, so a DataGenerator
+    can use either. Ranges come from the current lease; only when it runs out is
+    the watermark moved forward by at least lease_size and saved, before any ID
+    from the new lease is returned. A new lease starts above the stored
+    watermark too, so processes sharing the store never hand out the same IDs.
+    """
+
+    def __init__(self, store, high_ids: dict, lease_size: int = DEFAULT_LEASE_SIZE):
+        self.store = store
+        self.used = dict(high_ids)
+        self.high = dict(high_ids)
+        self.lease_size = lease_size
+
+    def lease(self, kind: str, size: Optional[int] = None) -> tuple:
+        size = size or self.lease_size
+        if self.used[kind] + size > self.high[kind]:
+            count = max(size, self.lease_size)
+            self.used[kind] = self.store.reserve(kind, count, self.used[kind])
+            self.high[kind] = self.used[kind] + count
+        first = self.used[kind] + 1
+        self.used[kind] += size
+        return first, self.used[kind]
+
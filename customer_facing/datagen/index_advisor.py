@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Workload-driven index and key advisor for the analytics schema.
+
+Reads the dashboard workload, that is the Evidence source queries and the
+Superset VIRTUAL_DATASETS in superset/setup_via_orm.py (plus any --extra-sql
+files, e.g. drill-down queries), and finds how each fact column is used:
+- equality / IN filters: a bloom filter for high-cardinality columns such
+  as session_id, an inverted index for low-cardinality ones such as
+  event_type (inverted indexes supersede BITMAP indexes in VeloDB 2.x)
+- LIKE '%...%' filters, e.g. on page_url: an NGRAM_BF index
+- range filters and ORDER BY on a time column: a sort key leading with it
+- table size per bucket far from TARGET_TABLET_BYTES: a bucket count
+
+Columns the workload never filters on get no index; an index on them would
+only cost load time. Every candidate is measured before it is suggested:
+the tables are copied into a scratch database, each candidate is built as a
+copy of its table and swapped in, and the queries that use the column are
+timed before and after (EXPLAIN partition/tablet pruning is reported too).
+Candidates that do not speed their queries up by --min-gain are dropped.
+
+The suggested DDL for --database is written to --output with the timings
+as comments. Indexes and bloom filters are added in place; sort keys and
+bucket counts need a rebuild of the table, so pause datagen.py while
+running those statements. Rerun the advisor whenever dashboards change.
+
+Usage:
+    python index_advisor.py --host 127.0.0.1 --database user_analytics --runs 5
+"""
+
+import argparse
+import ast
+import glob
+import math
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+import mysql.connector
+from mysql.connector import Error
+
+from bench_colocation import DEFAULT_QUERIES_DIR, load_query, percentile
+from setup_schema import MAX_PARTITION_BUCKETS, TARGET_TABLET_BYTES
+from sinks import TABLE_COLUMNS
+
+DEFAULT_SUPERSET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'superset',
+                                     'setup_via_orm.py')
+FACT_TABLES = ['fact_events', 'fact_conversions']
+TIME_COLUMNS = {'event_time', 'conversion_time'}
+# Distinct values per row above which equality filters get a bloom filter instead of an inverted index
+BLOOM_NDV_RATIO = 0.01
+# Only suggest a bucket count this many times off the current one
+BUCKET_CHANGE_FACTOR = 2
+CANDIDATE_SUFFIX = '__candidate'
+
+SQL_KEYWORDS = {'where', 'on', 'join', 'left', 'right', 'inner', 'outer', 'cross', 'group', 'order', 'limit',
+                'union', 'having', 'as', 'using'}
+TABLE_RE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+PREDICATE_RE = r"(?:\b(\w+)\.)?\b{column}\b\s*(>=|<=|<>|!=|=|>|<|\bBETWEEN\b|\bNOT\s+IN\s*\(|\bIN\s*\(|\bLIKE\b)\s*(\S*)"
+ORDER_RE = r"\bORDER\s+BY\s+(?:(\w+)\.)?{column}\b"
+SCAN_RE = re.compile(r'TABLE:\s*\S*?(\w+)\(.*?partitions=(\d+/\d+).*?tablets=(\d+/\d+)', re.DOTALL)
+
+
+# --- Workload -------------------------------------------------------------
+
+def load_evidence(queries_dir: str) -> dict:
+    return {f"evidence:{os.path.basename(path)[:-4]}": load_query(queries_dir, os.path.basename(path)[:-4])
+            for path in sorted(glob.glob(os.path.join(queries_dir, '*.sql')))}
+
+
+def load_superset(path: str) -> dict:
+    """VIRTUAL_DATASETS from setup_via_orm.py, read without importing Superset."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'VIRTUAL_DATASETS' for t in node.targets):
+            datasets = ast.literal_eval(node.value)
+            return {f"superset:{name}": config['sql'] for name, config in datasets.items()}
+    return {}
+
+
+def load_workload(args) -> dict:
+    workload = load_evidence(args.evidence_dir)
+    try:
+        workload.update(load_superset(args.superset_file))
+    except (OSError, SyntaxError, ValueError) as e:
+        print(f"[WARN] Skipping Superset datasets ({args.superset_file}): {e}")
+    for directory in args.extra_sql or []:
+        workload.update({name.replace('evidence:', 'extra:'): sql for name, sql in load_evidence(directory).items()})
+    return workload
+
+
+def column_usage(workload: dict) -> dict:
+    """Return {(table, column): {kind: set of query names}} for fact table filters and sorts."""
+    usage = defaultdict(lambda: defaultdict(set))
+    for name, sql in workload.items():
+        aliases, tables = {}, set()
+        for table, alias in TABLE_RE.findall(sql):
+            if table in TABLE_COLUMNS:
+                tables.add(table)
+                aliases[table] = table
+                if alias and alias.lower() not in SQL_KEYWORDS:
+                    aliases[alias] = table
+
+        def resolve(alias, column):
+            if alias:
+                return aliases.get(alias)
+            owners = [t for t in tables if column in TABLE_COLUMNS[t]]
+            return owners[0] if len(owners) == 1 else None
+
+        for table in FACT_TABLES:
+            for column in TABLE_COLUMNS[table]:
+                for alias, op, rhs in re.findall(PREDICATE_RE.format(column=column), sql, re.IGNORECASE):
+                    if resolve(alias, column) != table or re.match(r'\w+\.\w+', rhs):
+                        continue  # Another table's column, or a join condition
+                    op = op.upper()
+                    if 'LIKE' in op:
+                        kind = 'like_infix' if rhs.startswith("'%") else 'like'
+                    elif op in ('=', 'IN (', 'IN(') or op.startswith('IN'):
+                        kind = 'eq'
+                    elif op.startswith('NOT') or op in ('<>', '!='):
+                        continue
+                    else:
+                        kind = 'range'
+                    usage[table, column][kind].add(name)
+                if column not in TIME_COLUMNS:
+                    continue
+                for alias in re.findall(ORDER_RE.format(column=column), sql, re.IGNORECASE):
+                    if resolve(alias, column) == table:
+                        usage[table, column]['order'].add(name)
+    return usage
+
+
+# --- Current physical design ------------------------------------------------
+
+class TableInfo:
+    """What SHOW CREATE TABLE and a few statistics tell about one table."""
+
+    def __init__(self, cursor, database: str, table: str):
+        cursor.execute(f"SHOW CREATE TABLE {database}.{table}")
+        self.ddl = cursor.fetchone()[1]
+        self.table = table
+        keys = re.search(r'DUPLICATE KEY\((.*?)\)', self.ddl)
+        if not keys:
+            raise ValueError(f"{table} is not a DUPLICATE KEY table; the advisor only handles the duplicate model")
+        self.keys = re.findall(r'`?(\w+)`?', keys.group(1))
+        self.indexed = set(re.findall(r'INDEX\s+`?\w+`?\s*\(`?(\w+)`?\)', self.ddl))
+        bloom = re.search(r'"bloom_filter_columns"\s*=\s*"([^"]*)"', self.ddl)
+        self.bloom = [c.strip() for c in bloom.group(1).split(',') if c.strip()] if bloom else []
+        self.buckets = int(re.search(r'BUCKETS\s+(\d+)', self.ddl).group(1))
+        self.partitioned = 'PARTITION BY RANGE' in self.ddl.upper()
+        self.colocated = 'colocate_with' in self.ddl
+        cursor.execute(f"SELECT COUNT(*) FROM {database}.{table}")
+        self.rows = cursor.fetchone()[0]
+        self.partitions = 1
+        if self.partitioned:
+            cursor.execute(f"SHOW PARTITIONS FROM {database}.{table}")
+            self.partitions = max(1, self._loaded_partitions(cursor))
+        self.bytes = self._data_bytes(cursor, database)
+
+    @staticmethod
+    def _loaded_partitions(cursor) -> int:
+        """Count partitions holding data; dynamic_partition.end pre-creates empty future ones."""
+        columns = [d[0] for d in cursor.description]
+        loaded = 0
+        for row in cursor.fetchall():
+            values = dict(zip(columns, row))
+            size = re.match(r'\s*([\d.]+)', str(values.get('DataSize', '')))
+            if (size and float(size.group(1)) > 0) or int(values.get('RowCount') or 0) > 0:
+                loaded += 1
+        return loaded
+
+    def _data_bytes(self, cursor, database: str) -> int:
+        cursor.execute(f"SHOW DATA FROM {database}.{self.table}")
+        units = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+        for row in cursor.fetchall():
+            for value in row:
+                match = re.match(r'([\d.]+)\s*(B|KB|MB|GB|TB)$', str(value).strip())
+                if match:
+                    return int(float(match.group(1)) * units[match.group(2)])
+        return 0
+
+    def ndv_ratio(self, cursor, database: str, column: str) -> float:
+        cursor.execute(f"SELECT APPROX_COUNT_DISTINCT({column}) FROM {database}.{self.table}")
+        return cursor.fetchone()[0] / max(self.rows, 1)
+
+
+# --- Candidates -------------------------------------------------------------
+
+class Candidate:
+    """One physical design change: how to build it for measurement and the DDL to apply it."""
+
+    def __init__(self, table: str, kind: str, column: str, reason: str, queries: set):
+        self.table = table
+        self.kind = kind
+        self.column = column
+        self.reason = reason
+        self.queries = sorted(queries)
+        self.value = None
+        self.timings = {}
+
+    def describe(self) -> str:
+        if self.kind == 'buckets':
+            return f"{self.table}: {self.value} buckets"
+        if self.kind == 'sort_key':
+            return f"{self.table}: sort key ({self.column})"
+        return f"{self.table}.{self.column}: {self.kind.replace('_', ' ')}"
+
+    def index_name(self) -> str:
+        return f"idx_{self.column}"
+
+    def index_clause(self) -> str:
+        if self.kind == 'ngram_bf':
+            return f'INDEX {self.index_name()} (`{self.column}`) USING NGRAM_BF PROPERTIES("gram_size" = "3", "bf_size" = "256")'
+        return f"INDEX {self.index_name()} (`{self.column}`) USING INVERTED"
+
+    def apply_to_ddl(self, ddl: str, info: TableInfo) -> str:
+        """Rewrite SHOW CREATE TABLE output into the DDL of the table with this change."""
+        if self.kind == 'bloom_filter':
+            columns = ', '.join(info.bloom + [self.column])
+            if info.bloom:
+                return re.sub(r'"bloom_filter_columns"\s*=\s*"[^"]*"', f'"bloom_filter_columns" = "{columns}"', ddl)
+            return re.sub(r'PROPERTIES\s*\(', f'PROPERTIES (\n"bloom_filter_columns" = "{columns}",', ddl, count=1)
+        if self.kind in ('inverted', 'ngram_bf'):
+            return re.sub(r'\n\)\s*ENGINE', f',\n  {self.index_clause()}\n) ENGINE', ddl, count=1)
+        if self.kind == 'sort_key':
+            return reorder_key(ddl, [self.column])
+        ddl = re.sub(r'BUCKETS\s+\d+', f'BUCKETS {self.value}', ddl)
+        return re.sub(r'"dynamic_partition.buckets"\s*=\s*"\d+"', f'"dynamic_partition.buckets" = "{self.value}"', ddl)
+
+    def statements(self, database: str, info: TableInfo) -> list:
+        """DDL that applies the change to the table in database."""
+        target = f"{database}.{self.table}"
+        if self.kind == 'bloom_filter':
+            return [f'ALTER TABLE {target} SET ("bloom_filter_columns" = "{", ".join(info.bloom + [self.column])}");']
+        if self.kind == 'inverted':
+            return [f"CREATE INDEX IF NOT EXISTS {self.index_name()} ON {target} (`{self.column}`) USING INVERTED;",
+                    f"BUILD INDEX {self.index_name()} ON {target};"]
+        if self.kind == 'ngram_bf':
+            return [f"ALTER TABLE {target} ADD {self.index_clause()};"]
+        # Sort keys and bucket counts cannot be altered in place: rebuild and swap
+        rebuild = f"{self.table}__rebuild"
+        columns = ', '.join(TABLE_COLUMNS[self.table])
+        return [f"USE {database};",
+                rename_ddl(self.apply_to_ddl(info.ddl, info), self.table, rebuild).rstrip().rstrip(';') + ';',
+                f"INSERT INTO {rebuild} ({columns}) SELECT {columns} FROM {self.table};",
+                f"ALTER TABLE {self.table} REPLACE WITH TABLE {rebuild} PROPERTIES ('swap' = 'false');"]
+
+
+def rename_ddl(ddl: str, table: str, new_name: str) -> str:
+    return re.sub(rf'CREATE TABLE\s+`?(?:\w+`?\.`?)?{table}`?', f'CREATE TABLE `{new_name}`', ddl, count=1)
+
+
+def reorder_key(ddl: str, keys: list) -> str:
+    """Make keys the DUPLICATE KEY, moving their column definitions to the front as VeloDB requires."""
+    head, rest = ddl.split('(\n', 1)
+    body, tail = rest.split('\n) ENGINE', 1)
+    items = [line.rstrip().rstrip(',') for line in body.split('\n') if line.strip()]
+    columns = [item for item in items if item.strip().startswith('`')]
+    others = [item for item in items if not item.strip().startswith('`')]
+
+    def name(item):
+        return item.strip().split('`')[1]
+
+    ordered = sorted(columns, key=lambda item: keys.index(name(item)) if name(item) in keys else len(keys))
+    tail = re.sub(r'DUPLICATE KEY\(.*?\)', f"DUPLICATE KEY({', '.join(f'`{k}`' for k in keys)})", tail, count=1)
+    return head + '(\n' + ',\n'.join(ordered + others) + '\n) ENGINE' + tail
+
+
+def ideal_buckets(info: TableInfo) -> int:
+    per_partition = info.bytes / info.partitions
+    return max(1, min(MAX_PARTITION_BUCKETS, math.ceil(per_partition / TARGET_TABLET_BYTES)))
+
+
+def propose(cursor, database: str, usage: dict, infos: dict) -> tuple:
+    """Return (candidates, notes about columns and tables left alone)."""
+    candidates, notes = [], []
+    for (table, column), kinds in sorted(usage.items()):
+        info = infos[table]
+        eq = kinds.get('eq', set())
+        if eq and column not in info.indexed and column not in info.bloom and column not in info.keys[:1]:
+            if info.ndv_ratio(cursor, database, column) >= BLOOM_NDV_RATIO:
+                candidates.append(Candidate(table, 'bloom_filter', column, 'high-cardinality equality filter', eq))
+            else:
+                candidates.append(Candidate(table, 'inverted', column, 'low-cardinality equality filter', eq))
+        if kinds.get('like_infix') and column not in info.indexed:
+            candidates.append(Candidate(table, 'ngram_bf', column, "LIKE '%...%' filter", kinds['like_infix']))
+        elif kinds.get('like') and column not in info.indexed:
+            candidates.append(Candidate(table, 'inverted', column, 'LIKE prefix filter', kinds['like']))
+        sorted_by = kinds.get('range', set()) | kinds.get('order', set())
+        if column in TIME_COLUMNS and sorted_by and info.keys[:1] != [column]:
+            candidates.append(Candidate(table, 'sort_key', column, 'time range filters and ORDER BY', sorted_by))
+
+    for table, info in infos.items():
+        for column in ['session_id', 'event_type', 'page_url']:
+            if column in TABLE_COLUMNS[table] and (table, column) not in usage:
+                notes.append(f"{table}.{column}: not filtered by any workload query, no index suggested")
+        buckets = ideal_buckets(info)
+        if info.colocated:
+            notes.append(f"{table}: colocated, bucket count left to setup_schema.py --colocate-buckets")
+        elif max(buckets, info.buckets) >= BUCKET_CHANGE_FACTOR * min(buckets, info.buckets):
+            queries = set().union(*[set().union(*kinds.values()) for (t, _), kinds in usage.items() if t == table])
+            candidate = Candidate(table, 'buckets', None, f"{info.bytes / info.partitions / 1024 ** 2:,.0f} MB per "
+                                  f"{'partition' if info.partitioned else 'table'} in {info.buckets} buckets", queries)
+            candidate.value = buckets
+            candidates.append(candidate)
+    return [c for c in candidates if c.queries], notes
+
+
+# --- Measurement --------------------------------------------------------------
+
+class Advisor:
+    """Time workload queries in a scratch copy of the database, with and without each candidate."""
+
+    def __init__(self, args, workload: dict):
+        self.args = args
+        self.workload = workload
+        self.scratch = f"{args.database}_advisor"
+        self.conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password,
+                                            autocommit=True)
+        self.cursor = self.conn.cursor()
+        for setting in ["enable_sql_cache = false", "enable_query_cache = false"]:
+            try:
+                self.cursor.execute(f"SET {setting}")
+            except Error:
+                pass  # Not every version has every cache
+        self.baseline = {}
+
+    def copy_table(self, ddl: str, source: str, target: str):
+        columns = ', '.join(TABLE_COLUMNS[target.split(CANDIDATE_SUFFIX)[0]])
+        self.cursor.execute(rename_ddl(ddl, source, target))
+        self.cursor.execute(f"INSERT INTO {target} ({columns}) SELECT {columns} FROM {self.args.database}.{source}")
+
+    def create_scratch(self):
+        self.cursor.execute(f"DROP DATABASE IF EXISTS {self.scratch} FORCE")
+        self.cursor.execute(f"CREATE DATABASE {self.scratch}")
+        self.cursor.execute(f"USE {self.scratch}")
+        for table in TABLE_COLUMNS:
+            self.cursor.execute(f"SHOW CREATE TABLE {self.args.database}.{table}")
+            self.copy_table(self.cursor.fetchone()[1], table, table)
+
+    def drop_scratch(self):
+        self.cursor.execute(f"DROP DATABASE IF EXISTS {self.scratch} FORCE")
+
+    def scans(self, sql: str) -> str:
+        """Partition and tablet pruning of the fact scans, from EXPLAIN."""
+        self.cursor.execute(f"EXPLAIN {sql}")
+        plan = '\n'.join(str(row[0]) for row in self.cursor.fetchall())
+        return ', '.join(f"{table} p={partitions} t={tablets}" for table, partitions, tablets in SCAN_RE.findall(plan)
+                         if table in FACT_TABLES)
+
+    def time_query(self, name: str) -> dict:
+        sql = self.workload[name]
+        scans = self.scans(sql)
+        for _ in range(self.args.warmup):
+            self.cursor.execute(sql)
+            self.cursor.fetchall()
+        latencies = []
+        for _ in range(self.args.runs):
+            start = time.perf_counter()
+            self.cursor.execute(sql)
+            self.cursor.fetchall()
+            latencies.append(time.perf_counter() - start)
+        return {'p50': percentile(latencies, 0.50), 'scans': scans}
+
+    def measure(self, candidate: Candidate, info: TableInfo):
+        for name in candidate.queries:
+            if name not in self.baseline:
+                self.baseline[name] = self.time_query(name)
+        table, shadow = candidate.table, candidate.table + CANDIDATE_SUFFIX
+        self.copy_table(candidate.apply_to_ddl(info.ddl, info), table, shadow)
+        self.cursor.execute(f"ALTER TABLE {table} REPLACE WITH TABLE {shadow} PROPERTIES ('swap' = 'true')")
+        try:
+            for name in candidate.queries:
+                candidate.timings[name] = (self.baseline[name], self.time_query(name))
+        finally:
+            self.cursor.execute(f"ALTER TABLE {table} REPLACE WITH TABLE {shadow} PROPERTIES ('swap' = 'true')")
+            self.cursor.execute(f"DROP TABLE IF EXISTS {shadow} FORCE")
+
+    def close(self):
+        self.cursor.close()
+        self.conn.close()
+
+
+def gain(candidate: Candidate) -> float:
+    """Fraction of query time saved over the candidate's queries."""
+    before = sum(b['p50'] for b, _ in candidate.timings.values())
+    after = sum(a['p50'] for _, a in candidate.timings.values())
+    return 1 - after / before if before else 0.0
+
+
+def write_advice(path: str, database: str, adopted: list, infos: dict):
+    with open(path, 'w') as f:
+        f.write(f"-- Physical design suggestions for {database} (index_advisor.py)\n")
+        for candidate in adopted:
+            f.write(f"\n-- {candidate.describe()}: {candidate.reason}, {gain(candidate):.0%} faster\n")
+            for name, (before, after) in candidate.timings.items():
+                f.write(f"--   {name}: {before['p50'] * 1000:.1f} ms -> {after['p50'] * 1000:.1f} ms\n")
+            if candidate.kind in ('sort_key', 'buckets'):
+                f.write("--   Rebuilds the table: pause datagen.py while this runs\n")
+            f.write('\n'.join(candidate.statements(database, infos[candidate.table])) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suggest indexes, sort keys and buckets from the dashboard workload')
+    parser.add_argument('--host', default='localhost', help='Database host')
+    parser.add_argument('--port', type=int, default=9030, help='Database port')
+    parser.add_argument('--user', default='root', help='Database user')
+    parser.add_argument('--password', default='', help='Database password')
+    parser.add_argument('--database', default='user_analytics', help='Seeded database to advise on')
+    parser.add_argument('--evidence-dir', default=DEFAULT_QUERIES_DIR, help='Evidence source queries')
+    parser.add_argument('--superset-file', default=DEFAULT_SUPERSET_FILE, help='File defining VIRTUAL_DATASETS')
+    parser.add_argument('--extra-sql', action='append', help='Directory of additional workload .sql files')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per query and design')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before timing')
+    parser.add_argument('--min-gain', type=float, default=0.1, help='Minimum fraction of query time saved')
+    parser.add_argument('--output', default='index_advice.sql', help='File for the suggested DDL')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch database afterwards')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VeloDB Analytics - Index Advisor")
+    print("=" * 60)
+
+    workload = load_workload(args)
+    usage = column_usage(workload)
+    print(f"[INFO] Workload: {len(workload)} queries")
+    for (table, column), kinds in sorted(usage.items()):
+        print(f"  {table}.{column}: " + ", ".join(f"{kind} x{len(names)}" for kind, names in sorted(kinds.items())))
+
+    try:
+        advisor = Advisor(args, workload)
+    except Error as e:
+        print(f"[ERROR] Connection failed: {e}")
+        sys.exit(1)
+    try:
+        infos = {table: TableInfo(advisor.cursor, args.database, table) for table in FACT_TABLES}
+        candidates, notes = propose(advisor.cursor, args.database, usage, infos)
+        for note in notes:
+            print(f"[INFO] {note}")
+        if not candidates:
+            print("[INFO] The current design already covers the workload")
+            return
+        print(f"[INFO] Copying {args.database} into {advisor.scratch} to measure {len(candidates)} candidates...")
+        advisor.create_scratch()
+        for candidate in candidates:
+            print(f"[BENCH] {candidate.describe()} ({len(candidate.queries)} queries)...")
+            advisor.measure(candidate, infos[candidate.table])
+    except (Error, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    finally:
+        if not args.keep:
+            advisor.drop_scratch()
+        advisor.close()
+
+    print()
+    print(f"{'candidate':<42} {'query':<34} {'before ms':>10} {'after ms':>9}  scans after")
+    adopted = []
+    for candidate in candidates:
+        for name, (before, after) in candidate.timings.items():
+            print(f"{candidate.describe():<42} {name:<34} {before['p50'] * 1000:>10.1f} {after['p50'] * 1000:>9.1f}"
+                  f"  {after['scans'] or '-'}")
+        verdict = 'suggested' if gain(candidate) >= args.min_gain else 'dropped'
+        print(f"{'':<42} {'-> ' + verdict + f' ({gain(candidate):.0%} faster)'}")
+        if verdict == 'suggested':
+            adopted.append(candidate)
+
+    if adopted:
+        write_advice(args.output, args.database, adopted, infos)
+        print(f"\n[INFO] {len(adopted)} suggestions written to {args.output}")
+    else:
+        print(f"\n[INFO] No candidate saved {args.min_gain:.0%} of its queries' time")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Load shard files exported by seed_history.py --sink file into VeloDB.
+
+Reads manifest.jsonl from --input-dir and Stream Loads every shard, with
+--parallel shards in flight at once. Dimension shards are loaded before
+fact shards. Each shard's label is derived from the export run and the file
+name, so rerunning the loader after a partial failure skips the shards that
+already landed ("Label Already Exists") and loads only the rest.
+
+The export assumes a freshly created schema (setup_schema.py), so load into
+a new database. Afterwards the datagen ID watermark is raised to the
+exported ID ranges, so datagen.py continues above the loaded rows.
+
+Usage:
+    python load_shards.py --input-dir export/sf10 --host fe-host --database analytics_sf10 --parallel 8
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector import Error
+
+from export import read_manifest
+from idalloc import ID_STORES, load_watermarks, make_store
+from sinks import StreamLoadSink
+
+DIMENSION_TABLES = ['dim_users', 'dim_features', 'dim_campaigns']
+
+
+def shard_label(run_id: str, file_name: str) -> str:
+    """Stream Load label for one shard; labels allow letters, digits, '-' and '_'."""
+    return re.sub(r'[^A-Za-z0-9_-]', '_', f"{run_id}_{file_name}")
+
+
+class ShardLoader:
+    """Stream Load shard files from a pool of threads, one keep-alive sink per thread."""
+
+    def __init__(self, args, input_dir: str, run_id: str):
+        self.args = args
+        self.input_dir = input_dir
+        self.run_id = run_id
+        self.local = threading.local()
+        self.sinks = []
+        self.lock = threading.Lock()
+        self.loaded_rows = 0
+        self.loaded_bytes = 0
+        self.failed = []
+
+    def _sink(self, fmt: str) -> StreamLoadSink:
+        sinks = getattr(self.local, 'sinks', None)
+        if sinks is None:
+            sinks = self.local.sinks = {}
+        if fmt not in sinks:
+            a = self.args
+            sinks[fmt] = StreamLoadSink(a.host, a.http_port, a.user, a.password, a.database, fmt=fmt,
+                                        timeout=a.timeout)
+            with self.lock:
+                self.sinks.append(sinks[fmt])
+        return sinks[fmt]
+
+    def load(self, entry: dict) -> bool:
+        path = os.path.join(self.input_dir, entry['file'])
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError as e:
+            print(f"[ERROR] Cannot read {path}: {e}")
+            ok = False
+        else:
+            start = time.time()
+            ok = self._sink(entry['format']).send(entry['table'], body, shard_label(self.run_id, entry['file']))
+            if ok:
+                print(f"  {entry['file']}: {entry['rows']:,} rows, {len(body) / 1024 / 1024:.1f} MB "
+                      f"in {time.time() - start:.1f}s")
+        with self.lock:
+            if ok:
+                self.loaded_rows += entry['rows']
+                self.loaded_bytes += entry['bytes']
+            else:
+                self.failed.append(entry['file'])
+        return ok
+
+    def load_all(self, entries: list):
+        with ThreadPoolExecutor(max_workers=self.args.parallel) as pool:
+            list(pool.map(self.load, entries))
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def raise_watermarks(args, run: dict) -> bool:
+    """Raise the datagen ID watermark to at least the loaded ID ranges."""
+    if args.id_store == 'none':
+        return True
+    try:
+        conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password,
+                                       database=args.database, autocommit=True)
+    except Error as e:
+        print(f"[ERROR] Connection failed: {e}")
+        return False
+    try:
+        store = make_store(args.id_store, conn, args.id_state_file)
+        if store is None:
+            return False
+        loaded = dict(run['dims'], event=run['events'][1], conversion=run['conversions'][1])
+        current = load_watermarks(store, conn, list(loaded))
+        raised = {kind: high for kind, high in loaded.items() if high > current[kind]}
+        if raised:
+            store.save(raised)
+            print(f"[INFO] Raised ID watermark ({store.describe()}): "
+                  + ", ".join(f"{kind}={high:,}" for kind, high in raised.items()))
+        return True
+    except Error as e:
+        print(f"[ERROR] Failed to update the ID watermark: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream Load exported seed shards into VeloDB')
+    parser.add_argument('--input-dir', required=True, help='Export directory containing manifest.jsonl')
+    parser.add_argument('--host', default='localhost', help='VeloDB FE host')
+    parser.add_argument('--port', type=int, default=9030, help='VeloDB MySQL port (for the ID watermark)')
+    parser.add_argument('--http-port', type=int, default=8030, help='FE HTTP port for Stream Load')
+    parser.add_argument('--user', default='root', help='Database user')
+    parser.add_argument('--password', default='', help='Database password')
+    parser.add_argument('--database', default='user_analytics', help='Database name')
+    parser.add_argument('--parallel', type=int, default=4, help='Shards loaded concurrently')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds to wait for one shard load')
+    parser.add_argument('--id-store', choices=ID_STORES, default='table',
+                        help='ID watermark to raise after loading (none = leave it alone)')
+    parser.add_argument('--id-state-file', default='datagen_ids.json', help='State file for --id-store file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("VeloDB Analytics - Shard Loader")
+    print("=" * 60)
+
+    try:
+        run, shards = read_manifest(args.input_dir)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Cannot read manifest in {args.input_dir}: {e}")
+        sys.exit(1)
+    if run is None:
+        print(f"[ERROR] {args.input_dir} holds an incomplete export (no run line in the manifest); export it again")
+        sys.exit(1)
+
+    dims = [entry for entry in shards if entry['table'] in DIMENSION_TABLES]
+    facts = [entry for entry in shards if entry['table'] not in DIMENSION_TABLES]
+    print(f"[INFO] Export {run['run_id']}: {len(dims)} dimension and {len(facts)} fact shards, "
+          f"{sum(entry['rows'] for entry in shards):,} rows, "
+          f"{sum(entry['bytes'] for entry in shards) / 1024 / 1024:,.1f} MB")
+    print(f"[INFO] Loading into {args.host}:{args.http_port}/{args.database}, {args.parallel} at a time")
+
+    loader = ShardLoader(args, args.input_dir, run['run_id'])
+    start = time.time()
+    # Facts reference the dimension rows, so dimensions go first
+    loader.load_all(dims)
+    loader.load_all(facts)
+    loader.close()
+    elapsed = time.time() - start
+
+    ok = not loader.failed and raise_watermarks(args, run)
+
+    print("\n" + "=" * 60)
+    print("Shard Load Complete!" if not loader.failed else "Shard Load Incomplete")
+    print("=" * 60)
+    print(f"  Rows loaded:    {loader.loaded_rows:,}")
+    print(f"  Elapsed:        {elapsed:.1f}s ({loader.loaded_bytes / 1024 / 1024 / max(elapsed, 1e-9):,.1f} MB/s)")
+    if loader.failed:
+        print(f"  Failed shards:  {len(loader.failed)} ({', '.join(loader.failed[:5])}"
+              f"{', ...' if len(loader.failed) > 5 else ''})")
+        print("  Rerun the same command to load only the missing shards")
+    print("=" * 60)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
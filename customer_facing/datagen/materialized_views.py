@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Async materialized views for the dashboard rollups.
+
+Every dashboard panel aggregates raw fact rows on each refresh, so its cost
+grows with the fact tables. These MVs pre-aggregate by day (and by hour for
+the 24-hour panel), and the dashboard query variants read the MVs instead:
+- Evidence: evidence/mv_sources/*.sql, copied over sources/velodb by
+  start.sh when VELODB_USE_MVS=true
+- Superset: MV_DATASET_SQL in superset/setup_via_orm.py, also enabled by
+  VELODB_USE_MVS=true
+
+A panel then scans at most a few rows per day instead of every event.
+Distinct users over a window are kept as bitmaps, which merge exactly
+across days. Distinct sessions use HLL, because session_id is a string,
+so the 30-day session KPI is approximate.
+
+MV definitions cannot use NOW(), so the variants filter on whole days (or
+whole hours) rather than a rolling instant. They also see data as of the
+last refresh (every refresh_minutes).
+
+How much a refresh costs depends on the schema profile:
+- partitioned: the MVs are partitioned by day on their date column, which
+  tracks the daily partitions of the fact tables, so a refresh only
+  recomputes the days whose fact partitions changed (usually just today).
+  The dimension tables are excluded from refresh triggers; datagen.py keeps
+  adding users, and every such insert would otherwise force a full rebuild.
+- default: the fact tables are not partitioned, so every refresh is a full
+  rebuild over all fact rows. The default interval is therefore much
+  longer (FULL_REFRESH_MINUTES); use the partitioned profile for frequent
+  refreshes at scale. The rollups keep the inner joins to
+the dimension tables that most panels have; every generated fact row has
+matching dimension rows, so the results are the same.
+
+These are async MVs (VeloDB 2.1+), not sync rollups: sync MVs are limited to
+a single table and cannot hold the joins or distinct counts these panels
+need.
+
+Used by setup_schema.py --materialized-views.
+"""
+
+from mysql.connector import Error
+
+# Partitioned MVs only recompute changed days; unpartitioned ones rebuild everything
+INCREMENTAL_REFRESH_MINUTES = 1
+FULL_REFRESH_MINUTES = 60
+DIMENSION_TABLES = ['dim_users', 'dim_features', 'dim_campaigns']
+
+# Day-level date columns are DATE_TRUNC of the fact partition column, so the
+# MV partitions can be traced back to the fact table partitions
+
+MATERIALIZED_VIEWS = {
+    # Daily trend and the 30-day event/user/session KPIs
+    'mv_daily_activity': """
+SELECT
+    DATE_TRUNC(e.event_time, 'day') AS activity_date,
+    COUNT(*) AS events,
+    COUNT(DISTINCT e.user_id) AS users,
+    COUNT(DISTINCT e.session_id) AS sessions,
+    BITMAP_UNION(TO_BITMAP(e.user_id)) AS user_bitmap,
+    HLL_UNION(HLL_HASH(e.session_id)) AS session_hll
+FROM fact_events e
+JOIN dim_users u ON e.user_id = u.user_id
+JOIN dim_campaigns c ON e.campaign_id = c.campaign_id
+GROUP BY DATE_TRUNC(e.event_time, 'day')""",
+    # Live 24-hour panel
+    'mv_hourly_activity': """
+SELECT
+    DATE_TRUNC(event_time, 'hour') AS hour,
+    COUNT(*) AS events,
+    COUNT(DISTINCT user_id) AS users,
+    COUNT(DISTINCT session_id) AS sessions
+FROM fact_events
+GROUP BY DATE_TRUNC(event_time, 'hour')""",
+    # Daily active users per plan
+    'mv_activity_by_plan': """
+SELECT
+    DATE_TRUNC(e.event_time, 'day') AS activity_date,
+    u.plan,
+    COUNT(DISTINCT e.user_id) AS users
+FROM fact_events e
+JOIN dim_users u ON e.user_id = u.user_id
+GROUP BY DATE_TRUNC(e.event_time, 'day'), u.plan""",
+    # Top features, feature adoption by plan, and the feature heatmap
+    'mv_feature_usage': """
+SELECT
+    DATE_TRUNC(e.event_time, 'day') AS activity_date,
+    u.plan,
+    f.feature_id,
+    f.feature_name,
+    e.event_type,
+    COUNT(*) AS uses,
+    BITMAP_UNION(TO_BITMAP(e.user_id)) AS user_bitmap
+FROM fact_events e
+JOIN dim_users u ON e.user_id = u.user_id
+JOIN dim_features f ON e.feature_id = f.feature_id
+GROUP BY DATE_TRUNC(e.event_time, 'day'), u.plan, f.feature_id, f.feature_name, e.event_type""",
+    # Attribution, sankey and the conversion/revenue KPIs
+    'mv_daily_conversions': """
+SELECT
+    DATE_TRUNC(c.conversion_time, 'day') AS conversion_date,
+    camp.channel,
+    camp.source,
+    f.feature_name,
+    c.conversion_type,
+    COUNT(*) AS conversions,
+    SUM(c.revenue) AS revenue
+FROM fact_conversions c
+JOIN dim_users u ON c.user_id = u.user_id
+JOIN dim_campaigns camp ON c.campaign_id = camp.campaign_id
+JOIN dim_features f ON c.feature_id = f.feature_id
+GROUP BY DATE_TRUNC(c.conversion_time, 'day'), camp.channel, camp.source, f.feature_name, c.conversion_type""",
+}
+
+# Daily MV partitions, by the column that tracks the fact table partitions
+MV_PARTITIONS = {
+    'mv_daily_activity': 'activity_date',
+    'mv_hourly_activity': "DATE_TRUNC(hour, 'day')",
+    'mv_activity_by_plan': 'activity_date',
+    'mv_feature_usage': 'activity_date',
+    'mv_daily_conversions': 'conversion_date',
+}
+
+CREATE_MV_SQL = """CREATE MATERIALIZED VIEW IF NOT EXISTS {database}.{name}
+BUILD IMMEDIATE REFRESH AUTO ON SCHEDULE EVERY {minutes} MINUTE
+{partition}DISTRIBUTED BY RANDOM BUCKETS 1
+PROPERTIES ("replication_num" = "1"{properties})
+AS {query}"""
+
+
+def default_refresh_minutes(partitioned: bool) -> int:
+    return INCREMENTAL_REFRESH_MINUTES if partitioned else FULL_REFRESH_MINUTES
+
+
+def create_materialized_views(cursor, database: str, refresh_minutes: int = None, partitioned: bool = False) -> bool:
+    """Create the dashboard MVs (or update the refresh schedule of existing ones).
+
+    partitioned must match the fact tables: only partitioned facts allow
+    partitioned MVs that refresh incrementally.
+    """
+    if refresh_minutes is None:
+        refresh_minutes = default_refresh_minutes(partitioned)
+    if not partitioned:
+        print(f"[INFO] Fact tables are not partitioned: every MV refresh is a full rebuild "
+              f"(every {refresh_minutes} minutes)")
+    ok = True
+    for name, query in MATERIALIZED_VIEWS.items():
+        partition, properties = '', ''
+        if partitioned:
+            partition = f"PARTITION BY ({MV_PARTITIONS[name]})\n"
+            properties = f', "excluded_trigger_tables" = "{",".join(DIMENSION_TABLES)}"'
+        try:
+            cursor.execute(CREATE_MV_SQL.format(database=database, name=name, minutes=refresh_minutes,
+                                                partition=partition, properties=properties,
+                                                query=query.strip()))
+            # IF NOT EXISTS keeps an older schedule; apply the requested one either way
+            cursor.execute(f"ALTER MATERIALIZED VIEW {database}.{name} "
+                           f"REFRESH AUTO ON SCHEDULE EVERY {refresh_minutes} MINUTE")
+            print(f"[INFO] {name}: refreshed every {refresh_minutes} minute(s)"
+                  f"{' (changed days only)' if partitioned else ' (full rebuild)'}")
+        except Error as e:
+            print(f"[ERROR] Failed to create {name}: {e}")
+            ok = False
+    return ok
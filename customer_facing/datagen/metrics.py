@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics for the datagen.
+
+GeneratorMetrics owns the metric objects and the /metrics HTTP endpoint;
+InstrumentedSink wraps any sink from sinks.py to time writes and count rows,
+batch sizes and errors. When prometheus_client is not installed, or no
+--metrics-port is given, NullMetrics stands in and every call is a no-op.
+
+In --workers mode each worker serves its own endpoint on --metrics-port plus
+its worker number; scrape them all and sum across instances.
+"""
+
+import time
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BATCH_BUCKETS = (1, 10, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+
+class NullMetrics:
+    """Metrics sink used when metrics are disabled."""
+
+    def rows_generated(self, table: str, count: int):
+        pass
+
+    def rows_written(self, table: str, count: int):
+        pass
+
+    def observe_insert(self, table: str, rows: int, seconds: float):
+        pass
+
+    def error(self, error_type: str):
+        pass
+
+    def set_rates(self, achieved: float, target: float):
+        pass
+
+    def set_queue_depth(self, depth: int):
+        pass
+
+
+class GeneratorMetrics(NullMetrics):
+    """Prometheus metrics for one generator process."""
+
+    def __init__(self, port: int, worker: str = '0'):
+        self.registry = CollectorRegistry()
+        self.generated = Counter('datagen_rows_generated_total', 'Rows generated',
+                                 ['table'], registry=self.registry).labels
+        self.written = Counter('datagen_rows_written_total', 'Rows written successfully',
+                               ['table'], registry=self.registry).labels
+        self.latency = Histogram('datagen_insert_latency_seconds', 'Latency of one insert or load batch',
+                                 ['table'], buckets=LATENCY_BUCKETS, registry=self.registry).labels
+        self.batch_size = Histogram('datagen_batch_size_rows', 'Rows per insert or load batch',
+                                    ['table'], buckets=BATCH_BUCKETS, registry=self.registry).labels
+        self.errors = Counter('datagen_errors_total', 'Failed writes by error type',
+                              ['type'], registry=self.registry).labels
+        self.achieved_rate = Gauge('datagen_achieved_rate', 'Events per second actually offered',
+                                   registry=self.registry)
+        self.target_rate = Gauge('datagen_target_rate', 'Events per second requested by the profile',
+                                 registry=self.registry)
+        self.queue_depth = Gauge('datagen_queue_depth', 'Batches waiting for a writer',
+                                 registry=self.registry)
+        start_http_server(port, registry=self.registry)
+        print(f"[INFO] Serving Prometheus metrics on :{port}/metrics (worker {worker})")
+
+    def rows_generated(self, table: str, count: int):
+        self.generated(table).inc(count)
+
+    def rows_written(self, table: str, count: int):
+        self.written(table).inc(count)
+
+    def observe_insert(self, table: str, rows: int, seconds: float):
+        self.latency(table).observe(seconds)
+        self.batch_size(table).observe(rows)
+
+    def error(self, error_type: str):
+        self.errors(error_type).inc()
+
+    def set_rates(self, achieved: float, target: float):
+        self.achieved_rate.set(achieved)
+        self.target_rate.set(target)
+
+    def set_queue_depth(self, depth: int):
+        self.queue_depth.set(depth)
+
+
+def make_metrics(port: int, worker: int = 0):
+    """Return GeneratorMetrics serving on port + worker, or NullMetrics when disabled."""
+    if not port:
+        return NullMetrics()
+    if not PROMETHEUS_AVAILABLE:
+        print("[WARN] prometheus_client not installed, metrics endpoint disabled")
+        return NullMetrics()
+    return GeneratorMetrics(port + worker, str(worker))
+
+
+class InstrumentedSink:
+    """Wrap a sink to record latency, batch size, rows written and errors."""
+
+    def __init__(self, sink, metrics):
+        self.sink = sink
+        self.metrics = metrics
+
+    def write(self, table: str, rows, label=None) -> bool:
+        if not rows:
+            return True
+        start = time.perf_counter()
+        ok = self.sink.write(table, rows, label)
+        self.metrics.observe_insert(table, len(rows), time.perf_counter() - start)
+        if ok:
+            self.metrics.rows_written(table, len(rows))
+        else:
+            self.metrics.error(getattr(self.sink, 'last_error', None) or 'unknown')
+        return ok
+
+    @property
+    def last_error(self):
+        return getattr(self.sink, 'last_error', None)
+
+    @property
+    def last_error_message(self):
+        return getattr(self.sink, 'last_error_message', None)
+
+    def close(self):
+        self.sink.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Producer/consumer pipelining for sink writes.
+
+PipelinedSink looks like any sink from sinks.py, but write() only enqueues
+the batch on a bounded queue. Writer threads, each with a sink and
+connection of its own from sink_factory, drain the queue, so generation
+overlaps with network round trips and commits instead of taking turns
+with them. The queue holds at most `depth` batches, which bounds memory.
+Since write() returns before the load happens, outcomes are tallied by the
+writers: failed_batches, and rows_written per table for successful loads.
+
+Which side is the bottleneck shows up in the reported stats:
+- producer stalls: write() found the queue full, so writers are behind
+- writer idle: writers waited on an empty queue, so generation is behind
+
+Used by seed_history.py --writers N.
+"""
+
+import queue
+import threading
+import time
+
+REPORT_INTERVAL = 5.0
+
+
+class PipelinedSink:
+    """Sink adapter that hands batches to writer threads through a bounded queue."""
+
+    def __init__(self, sink_factory, writers: int = 2, depth: int = 8, name: str = 'pipeline'):
+        self.name = name
+        self.queue = queue.Queue(maxsize=depth)
+        self.depth = depth
+        self.lock = threading.Lock()
+        self.failed_batches = 0
+        self.rows_written = {}  # table -> rows of successful loads
+        self.batches = 0
+        self.producer_stalls = 0
+        self.producer_stall_seconds = 0.0
+        self.writer_idle_seconds = 0.0
+        self.max_queue_depth = 0
+        self.start = self.last_report = time.monotonic()
+        # Open every writer's sink up front so connection errors surface in the caller
+        self.sinks = [sink_factory() for _ in range(writers)]
+        self.threads = [threading.Thread(target=self._writer, args=(sink,), name=f"{name}-writer-{i}", daemon=True)
+                        for i, sink in enumerate(self.sinks)]
+        for thread in self.threads:
+            thread.start()
+
+    def _writer(self, sink):
+        while True:
+            waited = time.monotonic()
+            item = self.queue.get()
+            idle = time.monotonic() - waited
+            if item is None:
+                self.queue.task_done()
+                return
+            table, rows, label = item
+            ok = sink.write(table, rows, label)
+            with self.lock:
+                self.writer_idle_seconds += idle
+                self.batches += 1
+                if ok:
+                    self.rows_written[table] = self.rows_written.get(table, 0) + len(rows)
+                else:
+                    self.failed_batches += 1
+            self.queue.task_done()
+
+    def write(self, table: str, rows, label=None) -> bool:
+        """Enqueue rows for a writer; blocks while the queue is full.
+
+        Always returns True: outcomes land in failed_batches and rows_written.
+        """
+        if not rows:
+            return True
+        if self.queue.full():
+            stalled = time.monotonic()
+            self.queue.put((table, rows, label))
+            self.producer_stalls += 1
+            self.producer_stall_seconds += time.monotonic() - stalled
+        else:
+            self.queue.put((table, rows, label))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+        now = time.monotonic()
+        if now - self.last_report >= REPORT_INTERVAL:
+            print(f"  [{self.name}] {self.describe()}")
+            self.last_report = now
+        return True
+
+    def describe(self) -> str:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        writers = len(self.threads)
+        return (f"queue {self.queue.qsize()}/{self.depth} (max {self.max_queue_depth}), "
+                f"{self.batches} batches written, "
+                f"producer stalled {self.producer_stalls}x for {self.producer_stall_seconds:.1f}s, "
+                f"writers idle {self.writer_idle_seconds / writers / elapsed:.0%}")
+
+    def close(self):
+        """Drain the queue, stop the writers and close their sinks."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        for sink in self.sinks:
+            sink.close()
+        print(f"  [{self.name}] Done - {self.describe()}")
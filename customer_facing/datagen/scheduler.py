@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Drift-free rate scheduling and traffic-shape profiles for the datagen.
+
+RateScheduler is a deadline-based token bucket: every acquired token pushes a
+deadline forward by 1/rate, and the caller only sleeps while it is ahead of
+that deadline. Time spent in inserts is therefore absorbed instead of added
+on top of the pacing, so the offered load holds the target rate until the
+sink genuinely cannot keep up. rate_factor scales the pacing down when the
+backpressure controller asks for it; reported targets stay the profile's.
+
+Profiles (rate multiplier over time):
+- constant: the base rate
+- diurnal:  get_hourly_multiplier * get_weekday_multiplier (the shape
+            seed_history.py also seeds), over a simulated day of
+            --profile-period seconds (86400 = real time)
+- step:     base, 2x base, 3x base, ... one step every --profile-period seconds
+- burst:    base rate with --burst-factor x bursts of --burst-duration seconds
+            at the start of every --profile-period seconds
+"""
+
+import time
+from datetime import datetime, timedelta
+
+PROFILES = ['constant', 'diurnal', 'step', 'burst']
+
+# Never sleep for less than this; deadlines are caught up on the next call
+MIN_SLEEP = 0.001
+# How far behind schedule the bucket may fall before the backlog is dropped
+MAX_BACKLOG_SECONDS = 1.0
+
+
+def get_hourly_multiplier(hour: int) -> float:
+    """Return activity multiplier based on hour (business hours = higher)."""
+    if 9 <= hour <= 17:  # Business hours
+        return 1.5
+    elif 6 <= hour <= 21:  # Active hours
+        return 1.0
+    else:  # Night
+        return 0.3
+
+
+def get_weekday_multiplier(weekday: int) -> float:
+    """Return activity multiplier (Mon=0, Sun=6)."""
+    if weekday < 5:  # Weekday
+        return 1.0
+    else:  # Weekend
+        return 0.5
+
+
+class TrafficProfile:
+    """Target rate as a function of elapsed time."""
+
+    def __init__(self, name: str, base_rate: float, period: float = 86400,
+                 burst_factor: float = 5.0, burst_duration: float = 10.0):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown profile: {name}")
+        self.name = name
+        self.base_rate = base_rate
+        self.period = period
+        self.burst_factor = burst_factor
+        self.burst_duration = burst_duration
+        self.start_wall = datetime.now()
+
+    def scaled(self, factor: float) -> 'TrafficProfile':
+        """Return the same shape at factor x the base rate (used to split load across workers)."""
+        profile = TrafficProfile(self.name, self.base_rate * factor, self.period,
+                                 self.burst_factor, self.burst_duration)
+        profile.start_wall = self.start_wall
+        return profile
+
+    def multiplier(self, elapsed: float) -> float:
+        if self.name == 'diurnal':
+            simulated = self.start_wall + timedelta(seconds=elapsed * 86400 / self.period)
+            return get_hourly_multiplier(simulated.hour) * get_weekday_multiplier(simulated.weekday())
+        if self.name == 'step':
+            return 1 + int(elapsed // self.period)
+        if self.name == 'burst':
+            return self.burst_factor if elapsed % self.period < self.burst_duration else 1.0
+        return 1.0
+
+    def rate_at(self, elapsed: float) -> float:
+        return self.base_rate * self.multiplier(elapsed)
+
+    def describe(self) -> str:
+        if self.name == 'diurnal':
+            return f"diurnal around {self.base_rate:,.0f}/sec, {self.period:.0f}s per simulated day"
+        if self.name == 'step':
+            return f"step +{self.base_rate:,.0f}/sec every {self.period:.0f}s"
+        if self.name == 'burst':
+            return (f"{self.base_rate:,.0f}/sec with {self.burst_factor:g}x bursts of "
+                    f"{self.burst_duration:.0f}s every {self.period:.0f}s")
+        return f"constant {self.base_rate:,.0f}/sec"
+
+
+class RateScheduler:
+    """Deadline-based token bucket that follows a TrafficProfile."""
+
+    def __init__(self, profile: TrafficProfile):
+        self.profile = profile
+        self.rate_factor = 1.0
+        self.start = time.monotonic()
+        self.deadline = self.start
+        self.acquired = 0
+        self.offered = 0.0  # Integral of the target rate, i.e. tokens we should have issued
+        self.last_check = self.start
+        self.window_start = self.start
+        self.window_acquired = 0
+        self.window_offered = 0.0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def target_rate(self) -> float:
+        return self.profile.rate_at(self.elapsed()) * self.rate_factor
+
+    def acquire(self, tokens: int = 1):
+        """Block until tokens may be issued without exceeding the target rate."""
+        delay = self.reserve(tokens)
+        if delay >= MIN_SLEEP:
+            time.sleep(delay)
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Take tokens and return how long the caller should wait before using them.
+
+        Non-blocking form of acquire() for callers with their own sleep, e.g. asyncio.
+        """
+        now = time.monotonic()
+        rate = self.profile.rate_at(now - self.start)
+
+        self.offered += rate * (now - self.last_check)
+        self.window_offered += rate * (now - self.last_check)
+        self.last_check = now
+
+        # A stalled sink must not turn into an unbounded catch-up burst
+        if now - self.deadline > MAX_BACKLOG_SECONDS:
+            self.deadline = now - MAX_BACKLOG_SECONDS
+
+        paced = rate * self.rate_factor
+        self.deadline += tokens / paced if paced > 0 else MAX_BACKLOG_SECONDS
+        self.acquired += tokens
+        self.window_acquired += tokens
+
+        return self.deadline - now
+
+    def report(self) -> tuple:
+        """Return (achieved_rate, target_rate) since the previous report and reset the window."""
+        now = time.monotonic()
+        window = max(now - self.window_start, 1e-9)
+        achieved = self.window_acquired / window
+        target = self.window_offered / window
+        self.window_start = now
+        self.window_acquired = 0
+        self.window_offered = 0.0
+        return achieved, target
+
+    def totals(self) -> tuple:
+        """Return (achieved_rate, target_rate) over the whole run."""
+        elapsed = max(self.elapsed(), 1e-9)
+        return self.acquired / elapsed, self.offered / elapsed
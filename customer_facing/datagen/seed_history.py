@@ -7,188 +7,591 @@ Creates realistic patterns:
 - Weekday vs weekend variation (higher on weekdays)
 - Hourly variation (peak during business hours)
 - Growth trend (gradual increase over 30 days)
+
+Fact rows are written through a sink (see sinks.py): multi-row INSERT over
+the MySQL protocol by default, or Stream Load with --sink stream-load.
+
+Fact IDs are leased from the same persisted watermark as datagen.py (see
+idalloc.py), so neither tool needs MAX() scans once the watermark exists.
+
+With --parallel N the day range is split into N contiguous shards seeded by
+worker processes, each with its own connection and sink. Per-hour row counts
+are planned up front, so the whole run leases one ID range and each shard
+gets an exact sub-range of it. The weekday/hourly/growth shape is the same
+as a sequential run.
+
+--scale-factor SF (or --target-rows / --target-bytes) sizes the dataset:
+SF1 is about 10M fact_events with 100k users, 100 features and 50
+campaigns, and every count scales linearly. Dimensions are topped up to
+their target cardinality first, then fact rates are scaled to hit the row
+target with the same shape. Rows are generated and written batch by
+batch, so memory stays flat at any scale. With --seed and --end-date a run
+is reproducible: every (day, hour, table) chunk draws from its own RNG,
+independent of --parallel.
+
+Rows are loaded with deterministic load labels. Without --checkpoint a load
+spans consecutive chunks of a table until it holds at least --batch-size
+rows, so a run makes about rows / batch size loads rather than at least one
+per hour and table. With --checkpoint FILE every chunk is loaded on its own,
+in batches of at most --batch-size rows, and the run's parameters and
+completed loads are recorded (see checkpoint.py); rerunning an interrupted
+run with the same file regenerates only the missing chunks, and the labels
+keep a load that landed just before the crash from being applied twice.
+
+With --writers N each shard pipelines its writes (see pipeline.py):
+generation fills batches into a bounded queue of --queue-depth batches
+while N writer threads, each on its own connection, drain it. Queue depth,
+producer stalls and writer idle time are reported so you can see which
+side to scale.
+
+Usage:
+    python seed_history.py --days 30                          # demo-sized history
+    python seed_history.py --days 365 --scale-factor 10 --parallel 8 \\
+        --seed 1 --end-date 2025-01-01                        # reproducible SF10
+    python seed_history.py --days 365 --scale-factor 10 --vectorized   # NumPy column blocks
+    python seed_history.py --days 365 --scale-factor 10 --writers 4    # overlap generation and writes
+    python seed_history.py --days 365 --scale-factor 10 --checkpoint sf10.ckpt   # rerun to resume
 """
 
 import argparse
+import itertools
+import multiprocessing
 import random
 import sys
+import uuid
 from datetime import datetime, timedelta
+from typing import Optional
 import mysql.connector
 from mysql.connector import Error
 
+from checkpoint import CheckpointSink, SeedCheckpoint
+from export import DEFAULT_SHARD_MB, PYARROW_AVAILABLE, FileSink, append_manifest, read_manifest, start_manifest
+from idalloc import ID_COLUMNS, ID_STORES, LeasedIdAllocator, load_watermarks, make_store
+from pipeline import PipelinedSink
+from scheduler import get_hourly_multiplier, get_weekday_multiplier
+from sinks import FILE_FORMATS, SINK_TYPES, STREAM_LOAD_FORMATS, make_sink
+
+# Optional NumPy-backed block generation (--vectorized)
+try:
+    import numpy as np
+    from columnar import BlockGenerator
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # Configuration
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Quinn', 'Avery', 'Blake']
+LAST_NAMES = ['Chen', 'Smith', 'Garcia', 'Kim', 'Patel', 'Mueller', 'Santos', 'Nguyen', 'Johnson', 'Lee']
+EMAIL_DOMAINS = ['gmail.com', 'company.com', 'outlook.com', 'startup.io', 'tech.co']
 PLANS = ['Free', 'Pro', 'Enterprise']
 COUNTRIES = ['USA', 'UK', 'Germany', 'Japan', 'Brazil', 'India', 'Canada', 'Australia']
 INDUSTRIES = ['Technology', 'Finance', 'Healthcare', 'Retail', 'Education', 'Manufacturing']
+DEVICES = ['desktop', 'mobile', 'tablet']
+BROWSERS = ['Chrome', 'Safari', 'Firefox', 'Edge']
+
+FEATURE_AREAS = ['Analytics', 'Report', 'Export', 'Integration', 'Dashboard', 'Alert', 'Segment', 'Funnel']
+FEATURE_KINDS = ['Builder', 'Viewer', 'Manager', 'Console', 'Editor', 'Scheduler']
+FEATURE_CATEGORIES = ['Core', 'Advanced', 'Beta']
+CAMPAIGN_THEMES = ['Summer', 'Launch', 'Growth', 'Retarget', 'Brand', 'Holiday', 'Webinar', 'Partner']
+CAMPAIGN_CHANNELS = [('Organic', 'Google', 'organic'), ('Paid', 'Facebook', 'cpc'),
+                     ('Social', 'LinkedIn', 'referral'), ('Email', 'Newsletter', 'email'),
+                     ('Direct', 'ProductHunt', 'referral')]
+CAMPAIGN_TARGETS = ['acquisition', 'engagement', 'retention', 'awareness']
 
 EVENT_TYPES = ['page_view', 'feature_use', 'search', 'click', 'scroll', 'form_start', 'form_submit', 'error']
 PAGES = ['/app/dashboard', '/app/analytics', '/app/settings', '/app/reports', '/app/integrations']
 SEARCH_QUERIES = ['how to dashboard', 'create report', 'export data', 'analyze users', 'integrate api', 'build chart']
 CONVERSION_TYPES = ['signup', 'upgrade', 'purchase', 'churn']
 
+FACT_TABLES = ('fact_events', 'fact_conversions')
 
-def get_hourly_multiplier(hour: int) -> float:
-    """Return activity multiplier based on hour (business hours = higher)."""
-    if 9 <= hour <= 17:  # Business hours
-        return 1.5
-    elif 6 <= hour <= 21:  # Active hours
-        return 1.0
-    else:  # Night
-        return 0.3
+# Base rates (per hour)
+BASE_EVENTS_PER_HOUR = 50
+BASE_CONVERSIONS_PER_HOUR = 3
 
+# Scale factor 1: fact_events rows and dimension cardinalities
+SF1_EVENTS = 10000000
+SF1_DIMENSIONS = {'user': 100000, 'feature': 100, 'campaign': 50}
+# Approximate encoded size of one fact_events row, for --target-bytes
+EVENT_ROW_BYTES = 200
+# Dimension rows setup_schema.py inserts; file exports assume a fresh schema and continue above them
+SCHEMA_DIMENSIONS = {'user': 10, 'feature': 10, 'campaign': 5}
 
-def get_weekday_multiplier(weekday: int) -> float:
-    """Return activity multiplier (Mon=0, Sun=6)."""
-    if weekday < 5:  # Weekday
-        return 1.0
-    else:  # Weekend
-        return 0.5
 
-
-def get_growth_multiplier(days_ago: int) -> float:
+def get_growth_multiplier(days_ago: int, days: int = 30) -> float:
     """Return growth multiplier (older = less activity, showing growth trend)."""
-    # 30 days ago = 0.6x, today = 1.0x (40% growth over month)
-    return 0.6 + (0.4 * (30 - days_ago) / 30)
+    # Start of the seeded range = 0.6x, today = 1.0x (40% growth, over a month by default)
+    return 0.6 + (0.4 * (days - days_ago) / days)
+
 
+def hour_multipliers(days: int, now: datetime):
+    """Yield (days_ago, hour, combined multiplier) for every hour to seed, oldest first."""
+    for days_ago in range(days, 0, -1):
+        day = now - timedelta(days=days_ago)
+        weekday_mult = get_weekday_multiplier(day.weekday())
+        growth_mult = get_growth_multiplier(days_ago, max(days, 30))
+        for hour in range(24):
+            yield days_ago, hour, get_hourly_multiplier(hour) * weekday_mult * growth_mult
+
+
+def plan_hours(days: int, now: datetime, rng: random.Random, scale: float = 1.0) -> list:
+    """Return (days_ago, hour, events, conversions) for every hour to seed, oldest first.
+
+    scale multiplies the base hourly rates and their noise.
+    """
+    plan = []
+    for days_ago, hour, mult in hour_multipliers(days, now):
+        # Calculate events for this hour
+        events_this_hour = int(BASE_EVENTS_PER_HOUR * scale * mult)
+        conversions_this_hour = int(BASE_CONVERSIONS_PER_HOUR * scale * mult)
+
+        # Add some randomness
+        events_this_hour = max(1, events_this_hour + round(rng.randint(-5, 5) * scale))
+        conversions_this_hour = max(0, conversions_this_hour + round(rng.randint(-1, 1) * scale))
+        plan.append((days_ago, hour, events_this_hour, conversions_this_hour))
+    return plan
+
+
+def plan_hours_poisson(days: int, now: datetime, seed=None, scale: float = 1.0) -> list:
+    """Like plan_hours, but draw every hour's counts from a Poisson around the expected rate."""
+    hours = list(hour_multipliers(days, now))
+    mult = np.array([m for _, _, m in hours])
+    rng = np.random.default_rng(None if seed is None else [seed, days])
+    events = rng.poisson(BASE_EVENTS_PER_HOUR * scale * mult)
+    conversions = rng.poisson(BASE_CONVERSIONS_PER_HOUR * scale * mult)
+    return [(days_ago, hour, int(e), int(c))
+            for (days_ago, hour, _), e, c in zip(hours, events.tolist(), conversions.tolist())]
+
+
+def scale_targets(scale_factor: float) -> dict:
+    """Return the fact_events row target and dimension cardinalities for a scale factor."""
+    targets = {kind: max(1, int(count * scale_factor)) for kind, count in SF1_DIMENSIONS.items()}
+    targets['events'] = int(SF1_EVENTS * scale_factor)
+    return targets
+
+
+def chunk_rng(seed, days_ago: int, hour: int, table: str) -> random.Random:
+    """RNG for one (day, hour, table) chunk; reproducible when seed is set, whatever the sharding."""
+    return random.Random(f"{seed}:{table}:{days_ago}:{hour}" if seed is not None else None)
+
+
+def dimension_rows(kind: str, first_id: int, last_id: int, rng: random.Random, now: datetime, days: int):
+    """Yield rows for dimension kind with IDs first_id..last_id, one at a time."""
+    for i in range(first_id, last_id + 1):
+        if kind == 'user':
+            signup_date = (now - timedelta(days=rng.randint(days, days + 365))).strftime('%Y-%m-%d')
+            props = f'{{"device":"{rng.choice(DEVICES)}","browser":"{rng.choice(BROWSERS)}"}}'
+            yield (i, f"user{i}@{rng.choice(EMAIL_DOMAINS)}", f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                   signup_date, rng.choice(PLANS), rng.choice(COUNTRIES), rng.choice(INDUSTRIES), props)
+        elif kind == 'feature':
+            name = f"{rng.choice(FEATURE_AREAS)} {rng.choice(FEATURE_KINDS)} {i}"
+            yield (i, name, rng.choice(FEATURE_CATEGORIES), f"{name} for {rng.choice(INDUSTRIES).lower()} teams",
+                   rng.choice(PLANS))
+        else:
+            channel, source, medium = rng.choice(CAMPAIGN_CHANNELS)
+            props = f'{{"budget":{rng.randint(10, 200) * 100},"target":"{rng.choice(CAMPAIGN_TARGETS)}"}}'
+            yield (i, f"{rng.choice(CAMPAIGN_THEMES)} {i} Campaign", channel, source, medium, props)
+
+
+def seed_dimensions(sink, ids: dict, targets: dict, seed, now: datetime, days: int, batch_size: int) -> bool:
+    """Top dimensions up to their target cardinality, streaming rows batch by batch."""
+    for kind in ('user', 'feature', 'campaign'):
+        if targets[kind] <= ids[kind]:
+            continue
+        table = ID_COLUMNS[kind][0]
+        print(f"[INFO] Adding {targets[kind] - ids[kind]:,} rows to {table} ({targets[kind]:,} total)")
+        rng = random.Random(f"{seed}:{kind}" if seed is not None else None)
+        batch = []
+        for row in dimension_rows(kind, ids[kind] + 1, targets[kind], rng, now, days):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                if not sink.write(table, batch):
+                    return False
+                batch = []
+        if batch and not sink.write(table, batch):
+            return False
+        ids[kind] = targets[kind]
+    return True
 
-def seed_historical_data(host, port, user, password, database, days=30):
-    """Seed historical events and conversions."""
 
-    print("=" * 60)
-    print("VeloDB Analytics - Historical Data Seeder")
-    print("=" * 60)
+def shard_plan(plan: list, shards: int) -> list:
+    """Split the plan into up to shards runs of whole days with roughly equal event counts."""
+    total = sum(events for _, _, events, _ in plan)
+    result = [[]]
+    done = 0
+    for entry in plan:
+        hour = entry[1]
+        boundary = total * len(result) / shards
+        if hour == 0 and result[-1] and done >= boundary and len(result) < shards:
+            result.append([])
+        result[-1].append(entry)
+        done += entry[2]
+    return result
+
+
+def seed_shard(shard: int, conn_args: dict, sink_args: dict, dims: dict, plan: list, now: datetime,
+               first_event_id: int, first_conversion_id: int, batch_size: int, seed=None,
+               vectorized: bool = False, writers: int = 0, queue_depth: int = 8, run_id: str = 'seed',
+               checkpoint_path: Optional[str] = None) -> tuple:
+    """Write one shard of the plan over its own connection(s).
+
+    Returns (events, conversions, failed_batches, skipped_loads). With
+    writers > 0, batches go through a PipelinedSink drained by that many
+    writer threads, each with its own connection. With checkpoint_path,
+    loads recorded there are skipped and new ones are recorded as they land.
+    """
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = SeedCheckpoint(checkpoint_path)
+        checkpoint.load()
+
+    sink_numbers = itertools.count()
+
+    def open_sink():
+        if sink_args['sink_type'] == 'file':
+            return FileSink(sink_args['output_dir'], sink_args['file_format'], sink_args['max_bytes'],
+                            prefix=f"s{shard}-{next(sink_numbers)}")
+        # Stream Load writes over HTTP; only the MySQL sink needs (and closes) a connection
+        conn = None
+        if sink_args['sink_type'] == 'mysql':
+            conn = mysql.connector.connect(autocommit=False, **conn_args)
+        sink = make_sink(sink_args['sink_type'], conn, conn_args['host'], sink_args['http_port'],
+                         conn_args['user'], conn_args['password'], conn_args['database'],
+                         sink_args['stream_load_format'], label_prefix=f"seed_s{shard}", owns_conn=True)
+        return CheckpointSink(sink, checkpoint) if checkpoint else sink
 
     try:
-        conn = mysql.connector.connect(
-            host=host, port=port, user=user, password=password, database=database, autocommit=False
-        )
-        cursor = conn.cursor()
-        print(f"[INFO] Connected to {host}:{port}/{database}")
+        if writers > 0:
+            sink = PipelinedSink(open_sink, writers, queue_depth, name=f"shard {shard}")
+        else:
+            sink = open_sink()
     except Error as e:
-        print(f"[ERROR] Connection failed: {e}")
-        return False
+        print(f"[ERROR] Shard {shard} connection failed: {e}")
+        return 0, 0, 1, 0
+    make_chunk = block_chunk if vectorized else row_chunk
+    events, conversions, failed_batches, skipped = write_chunks(
+        shard, sink, make_chunk, dims, plan, now, first_event_id, first_conversion_id, batch_size, seed,
+        run_id, checkpoint)
+    sink.close()
+    if writers > 0:
+        # write_chunks only saw batches being queued; the writers know what landed
+        failed_batches += sink.failed_batches
+        events = sink.rows_written.get('fact_events', 0)
+        conversions = sink.rows_written.get('fact_conversions', 0)
+    return events, conversions, failed_batches, skipped
+
+
+def plan_chunks(plan: list, first_event_id: int, first_conversion_id: int):
+    """Yield (days_ago, hour, table, rows, first_id) for every non-empty chunk of the plan, in order."""
+    next_ids = {'fact_events': first_event_id, 'fact_conversions': first_conversion_id}
+    for days_ago, hour, events, conversions in plan:
+        for table, count in (('fact_events', events), ('fact_conversions', conversions)):
+            if count:
+                yield days_ago, hour, table, count, next_ids[table]
+                next_ids[table] += count
+
+
+def chunk_label(run_id: str, days_ago: int, hour: int, table: str, part: int) -> str:
+    """Load label for one batch of a chunk; the same on every rerun of the run."""
+    return f"{run_id}_{table}_d{days_ago}_h{hour:02d}_p{part}"
+
+
+def merge_batches(batches: list):
+    """One load from consecutive batches of a table (ColumnBlocks or row lists)."""
+    if hasattr(batches[0], 'csv_lines'):
+        return batches[0].concat(batches)
+    return [row for batch in batches for row in batch]
+
+
+def write_chunks(shard: int, sink, make_chunk, dims: dict, plan: list, now: datetime, first_event_id: int,
+                 first_conversion_id: int, batch_size: int, seed, run_id: str, checkpoint=None) -> tuple:
+    """Generate the plan one (day, hour, table) chunk at a time and write it in labelled loads.
+
+    With a checkpoint every batch of a chunk is its own load, and chunks whose
+    batches are all in the checkpoint are not generated at all. Without one,
+    batches are buffered per table until they add up to batch_size rows, so
+    a load can span chunks and hours. Only rows of successful loads count.
+    """
+    totals = {'fact_events': 0, 'fact_conversions': 0}
+    failed_batches = 0
+    skipped = 0
+    last_day = None
+    buffers = {table: [] for table in totals}  # (label, batch) not yet loaded, without a checkpoint
+
+    def load(table: str, batches: list, label: str):
+        nonlocal failed_batches
+        rows = merge_batches(batches)
+        if sink.write(table, rows, label):
+            totals[table] += len(rows)
+        else:
+            failed_batches += 1
+
+    def flush(table: str):
+        buffer = buffers[table]
+        if buffer:
+            # Labelled after its first batch, which no other load contains
+            load(table, [batch for _, batch in buffer], buffer[0][0])
+            buffer.clear()
+
+    for days_ago, hour, table, count, first_id in plan_chunks(plan, first_event_id, first_conversion_id):
+        labels = [chunk_label(run_id, days_ago, hour, table, part)
+                  for part in range((count + batch_size - 1) // batch_size)]
+        pending = [checkpoint is None or not checkpoint.is_done(label) for label in labels]
+        skipped += len(labels) - sum(pending)
+        if any(pending):
+            day = now - timedelta(days=days_ago)
+            # Every part is drawn so the pending ones match the first run row for row
+            for label, is_pending, batch in zip(labels, pending,
+                                                make_chunk(seed, day, days_ago, hour, table, count, first_id,
+                                                           dims, batch_size)):
+                if not is_pending:
+                    continue
+                if checkpoint:
+                    load(table, [batch], label)
+                    continue
+                buffers[table].append((label, batch))
+                if sum(len(b) for _, b in buffers[table]) >= batch_size:
+                    flush(table)
 
-    # Get dimension counts
-    cursor.execute("SELECT MAX(user_id) FROM dim_users")
-    max_user_id = cursor.fetchone()[0] or 0
-    cursor.execute("SELECT MAX(feature_id) FROM dim_features")
-    max_feature_id = cursor.fetchone()[0] or 0
-    cursor.execute("SELECT MAX(campaign_id) FROM dim_campaigns")
-    max_campaign_id = cursor.fetchone()[0] or 0
-
-    if max_user_id == 0 or max_feature_id == 0 or max_campaign_id == 0:
-        print("[ERROR] Dimension tables are empty. Run tutorial SQL to create schema first.")
-        return False
-
-    print(f"[INFO] Found {max_user_id} users, {max_feature_id} features, {max_campaign_id} campaigns")
+        # Progress indicator
+        if days_ago != last_day and last_day is not None and last_day % 5 == 0:
+            print(f"  [shard {shard}] Day -{last_day}: {totals['fact_events']} events, "
+                  f"{totals['fact_conversions']} conversions so far...")
+        last_day = days_ago
+
+    for table in buffers:
+        flush(table)
+    return totals['fact_events'], totals['fact_conversions'], failed_batches, skipped
+
+
+def block_chunk(seed, day: datetime, days_ago: int, hour: int, table: str, count: int, first_id: int,
+                dims: dict, batch_size: int):
+    """Vectorized row_chunk: yield the chunk as NumPy ColumnBlocks of up to batch_size rows."""
+    blocks = BlockGenerator(EVENT_TYPES, PAGES, SEARCH_QUERIES, CONVERSION_TYPES, event_properties='duration',
+                            seed=None if seed is None else [seed, days_ago, hour, FACT_TABLES.index(table)])
+    make_block = blocks.events if table == 'fact_events' else blocks.conversions
+    hour_start = day.replace(hour=hour, minute=0, second=0, microsecond=0)
+    # Seconds after the start of the hour
+    offsets = blocks.rng.integers(0, 3600, count)
+    for start in range(0, count, batch_size):
+        part = offsets[start:start + batch_size]
+        yield make_block(len(part), first_id + start, dims['user'], dims['feature'], dims['campaign'],
+                         hour_start, part)
+
+
+def row_chunk(seed, day: datetime, days_ago: int, hour: int, table: str, count: int, first_id: int,
+              dims: dict, batch_size: int):
+    """Yield the chunk's rows in batches of up to batch_size, drawn from the chunk's own RNG."""
+    rng = chunk_rng(seed, days_ago, hour, table)
+    max_user_id, max_feature_id, max_campaign_id = dims['user'], dims['feature'], dims['campaign']
+    batch = []
+    for row_id in range(first_id, first_id + count):
+        if table == 'fact_events':
+            event_time = day.replace(hour=hour, minute=rng.randint(0, 59), second=rng.randint(0, 59))
+            batch.append((
+                row_id,
+                rng.randint(1, max_user_id),
+                rng.randint(1, max_feature_id),
+                rng.randint(1, max_campaign_id),
+                f"sess_{rng.randint(1, 100000)}",
+                rng.choice(EVENT_TYPES),
+                event_time.strftime('%Y-%m-%d %H:%M:%S'),
+                rng.choice(PAGES),
+                rng.choice(SEARCH_QUERIES) if rng.random() < 0.15 else None,
+                f'{{"duration":{rng.randint(1, 300)}}}'
+            ))
+        else:
+            conv_type = rng.choice(CONVERSION_TYPES)
+            conv_time = day.replace(hour=hour, minute=rng.randint(0, 59), second=rng.randint(0, 59))
+
+            plan_from = rng.choice([None, 'Free', 'Pro']) if conv_type != 'signup' else None
+            plan_to = rng.choice(['Pro', 'Enterprise']) if conv_type in ['signup', 'upgrade'] else None
+            revenue = round(rng.uniform(10, 500) if rng.random() < 0.7 else rng.uniform(500, 2000), 2)
+
+            batch.append((
+                row_id,
+                rng.randint(1, max_user_id),
+                rng.randint(1, max_feature_id),
+                rng.randint(1, max_campaign_id),
+                conv_type,
+                conv_time.strftime('%Y-%m-%d %H:%M:%S'),
+                plan_from,
+                plan_to,
+                revenue,
+                '{"source":"app"}'
+            ))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def make_plan(days: int, now: datetime, seed, scale: float, vectorized: bool) -> list:
+    """Plan every hour's row counts; the same plan on every call with the same arguments and a seed."""
+    if vectorized:
+        return plan_hours_poisson(days, now, seed, scale)
+    return plan_hours(days, now, random.Random(f"{seed}:plan" if seed is not None else None), scale)
+
+
+def seed_historical_data(host, port, user, password, database, days=30, sink_type='mysql',
+                         http_port=8030, stream_load_format='csv', batch_size=1000, id_store='table',
+                         id_state_file='datagen_ids.json', recover_ids=False, parallel=1, scale_factor=None,
+                         seed=None, end_date=None, vectorized=False, writers=0, queue_depth=8,
+                         checkpoint_path=None, output_dir=None, file_format='csv.gz',
+                         shard_size_mb=DEFAULT_SHARD_MB):
+    """Seed historical events and conversions, optionally across parallel day shards.
+
+    With scale_factor, dimensions are first topped up to scale_targets() and
+    fact rates are scaled so fact_events gets about the target row count.
+    end_date (a datetime) anchors the seeded range; it defaults to now.
+    vectorized draws Poisson hourly counts and NumPy column blocks instead of rows.
+    writers > 0 pipelines each shard's writes through that many writer threads.
+    checkpoint_path makes the run resumable: if the file exists, its run is
+    continued (with its own days, seed, dates, scale and IDs) and loads it
+    records as done are skipped.
+    sink_type 'file' exports shard files and a manifest to output_dir instead
+    of loading, without connecting to VeloDB (see export.py).
+    """
 
-    # Get current max IDs for fact tables
-    cursor.execute("SELECT COALESCE(MAX(event_id), 0) FROM fact_events")
-    event_id = cursor.fetchone()[0]
-    cursor.execute("SELECT COALESCE(MAX(conversion_id), 0) FROM fact_conversions")
-    conversion_id = cursor.fetchone()[0]
+    print("=" * 60)
+    print("VeloDB Analytics - Historical Data Seeder")
+    print("=" * 60)
 
-    now = datetime.now()
-    total_events = 0
-    total_conversions = 0
+    conn_args = {'host': host, 'port': port, 'user': user, 'password': password, 'database': database}
+    sink_args = {'sink_type': sink_type, 'http_port': http_port, 'stream_load_format': stream_load_format}
+    export = sink_type == 'file'
+    conn = None
+    if export:
+        if checkpoint_path:
+            print("[ERROR] --checkpoint applies to loads; rerun an interrupted export from scratch")
+            return False
+        sink_args.update(output_dir=output_dir, file_format=file_format, max_bytes=int(shard_size_mb * 1024 * 1024))
+        try:
+            start_manifest(output_dir)
+        except OSError as e:
+            print(f"[ERROR] Cannot create {output_dir}: {e}")
+            return False
+        print(f"[INFO] Exporting {file_format} shards of up to {shard_size_mb:g} MB to {output_dir}")
+    else:
+        try:
+            conn = mysql.connector.connect(autocommit=False, **conn_args)
+            print(f"[INFO] Connected to {host}:{port}/{database}")
+        except Error as e:
+            print(f"[ERROR] Connection failed: {e}")
+            return False
+
+    checkpoint = SeedCheckpoint(checkpoint_path) if checkpoint_path else None
+    if checkpoint and checkpoint.load():
+        # The checkpoint pins everything the generated rows depend on
+        run = checkpoint.run
+        run_id, days, seed, scale = run['run_id'], run['days'], run['seed'], run['scale']
+        vectorized, batch_size = run['vectorized'], run['batch_size']
+        now = datetime.fromisoformat(run['end_date'])
+        ids = run['dims']
+        first_event_id, first_conversion_id = run['first_event_id'], run['first_conversion_id']
+        conn.close()
+        print(f"[INFO] Resuming {run_id} from {checkpoint_path}: {len(checkpoint.done):,} loads already done")
+        print(f"[INFO] Days, seed, end date, scale and batch size come from the checkpoint")
+        if vectorized and not NUMPY_AVAILABLE:
+            print("[ERROR] This run was started with --vectorized, which requires numpy (pip install numpy)")
+            return False
+        plan = make_plan(days, now, seed, scale, vectorized)
+        planned_events = sum(entry[2] for entry in plan)
+        planned_conversions = sum(entry[3] for entry in plan)
+    else:
+        # Get dimension counts and fact ID watermarks
+        if export:
+            # Exports target a fresh schema: only setup_schema.py's rows exist, fact IDs start at 1
+            store = None
+            ids = dict(SCHEMA_DIMENSIONS, event=0, conversion=0)
+        else:
+            store = make_store(id_store, conn, id_state_file)
+            try:
+                ids = load_watermarks(store, conn, ['user', 'feature', 'campaign', 'event', 'conversion'],
+                                      recover_ids)
+            except Error as e:
+                print(f"[ERROR] Failed to load max IDs: {e}")
+                return False
+
+        if ids['user'] == 0 or ids['feature'] == 0 or ids['campaign'] == 0:
+            print("[ERROR] Dimension tables are empty. Run tutorial SQL to create schema first.")
+            return False
+
+        print(f"[INFO] Found {ids['user']} users, {ids['feature']} features, {ids['campaign']} campaigns")
+
+        if checkpoint and seed is None:
+            # A resumable run must regenerate identical rows, so it always has a seed
+            seed = random.SystemRandom().randrange(2 ** 31)
+            print(f"[INFO] Using seed {seed} for the checkpointed run")
+        now = end_date or datetime.now()
+        scale = 1.0
+        if scale_factor:
+            targets = scale_targets(scale_factor)
+            print(f"[INFO] Scale factor {scale_factor:g}: ~{targets['events']:,} events, {targets['user']:,} users, "
+                  f"{targets['feature']:,} features, {targets['campaign']:,} campaigns")
+            if export:
+                dim_sink = FileSink(output_dir, file_format, sink_args['max_bytes'], prefix='dims')
+            else:
+                dim_sink = make_sink(sink_type, conn, host, http_port, user, password, database,
+                                     stream_load_format, label_prefix='seed_dims')
+            ok = seed_dimensions(dim_sink, ids, targets, seed, now, days, batch_size)
+            dim_sink.close()
+            if not ok:
+                print("[ERROR] Failed to seed dimension tables")
+                return False
+            expected = sum(BASE_EVENTS_PER_HOUR * mult for _, _, mult in hour_multipliers(days, now))
+            scale = targets['events'] / expected
+
+        plan = make_plan(days, now, seed, scale, vectorized)
+        planned_events = sum(entry[2] for entry in plan)
+        planned_conversions = sum(entry[3] for entry in plan)
+
+        # Lease exactly the planned fact IDs above the watermark; without a store, count up from MAX()
+        first_event_id, first_conversion_id = ids['event'] + 1, ids['conversion'] + 1
+        if store is not None:
+            allocator = LeasedIdAllocator(store, {'event': ids['event'], 'conversion': ids['conversion']}, 1)
+            first_event_id, _ = allocator.lease('event', max(1, planned_events))
+            first_conversion_id, _ = allocator.lease('conversion', max(1, planned_conversions))
+        if conn:
+            conn.close()
+
+        run_id = f"seed_{uuid.uuid4().hex[:12]}"
+        if checkpoint:
+            checkpoint.start({
+                'run_id': run_id, 'days': days, 'seed': seed, 'scale': scale, 'vectorized': vectorized,
+                'batch_size': batch_size, 'end_date': now.isoformat(),
+                'dims': {kind: ids[kind] for kind in ('user', 'feature', 'campaign')},
+                'first_event_id': first_event_id, 'first_conversion_id': first_conversion_id,
+            })
+            print(f"[INFO] Checkpointing {run_id} to {checkpoint_path}")
 
     print(f"\n[INFO] Generating {days} days of historical data...")
 
-    # Base rates (per hour)
-    BASE_EVENTS_PER_HOUR = 50
-    BASE_CONVERSIONS_PER_HOUR = 3
-
-    events_batch = []
-    conversions_batch = []
-    BATCH_SIZE = 1000
-
-    for days_ago in range(days, 0, -1):
-        day = now - timedelta(days=days_ago)
-        weekday = day.weekday()
-        weekday_mult = get_weekday_multiplier(weekday)
-        growth_mult = get_growth_multiplier(days_ago)
-
-        for hour in range(24):
-            hourly_mult = get_hourly_multiplier(hour)
-
-            # Calculate events for this hour
-            events_this_hour = int(BASE_EVENTS_PER_HOUR * hourly_mult * weekday_mult * growth_mult)
-            conversions_this_hour = int(BASE_CONVERSIONS_PER_HOUR * hourly_mult * weekday_mult * growth_mult)
-
-            # Add some randomness
-            events_this_hour = max(1, events_this_hour + random.randint(-5, 5))
-            conversions_this_hour = max(0, conversions_this_hour + random.randint(-1, 1))
-
-            for _ in range(events_this_hour):
-                event_id += 1
-                event_time = day.replace(hour=hour, minute=random.randint(0, 59), second=random.randint(0, 59))
-
-                events_batch.append((
-                    event_id,
-                    random.randint(1, max_user_id),
-                    random.randint(1, max_feature_id),
-                    random.randint(1, max_campaign_id),
-                    f"sess_{random.randint(1, 100000)}",
-                    random.choice(EVENT_TYPES),
-                    event_time.strftime('%Y-%m-%d %H:%M:%S'),
-                    random.choice(PAGES),
-                    random.choice(SEARCH_QUERIES) if random.random() < 0.15 else None,
-                    f'{{"duration":{random.randint(1, 300)}}}'
-                ))
-                total_events += 1
-
-                if len(events_batch) >= BATCH_SIZE:
-                    cursor.executemany(
-                        "INSERT INTO fact_events VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
-                        events_batch
-                    )
-                    conn.commit()
-                    events_batch = []
-
-            for _ in range(conversions_this_hour):
-                conversion_id += 1
-                conv_type = random.choice(CONVERSION_TYPES)
-                conv_time = day.replace(hour=hour, minute=random.randint(0, 59), second=random.randint(0, 59))
-
-                plan_from = random.choice([None, 'Free', 'Pro']) if conv_type != 'signup' else None
-                plan_to = random.choice(['Pro', 'Enterprise']) if conv_type in ['signup', 'upgrade'] else None
-                revenue = round(random.uniform(10, 500) if random.random() < 0.7 else random.uniform(500, 2000), 2)
-
-                conversions_batch.append((
-                    conversion_id,
-                    random.randint(1, max_user_id),
-                    random.randint(1, max_feature_id),
-                    random.randint(1, max_campaign_id),
-                    conv_type,
-                    conv_time.strftime('%Y-%m-%d %H:%M:%S'),
-                    plan_from,
-                    plan_to,
-                    revenue,
-                    '{"source":"app"}'
-                ))
-                total_conversions += 1
-
-                if len(conversions_batch) >= BATCH_SIZE:
-                    cursor.executemany(
-                        "INSERT INTO fact_conversions VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
-                        conversions_batch
-                    )
-                    conn.commit()
-                    conversions_batch = []
-
-        # Progress indicator
-        if days_ago % 5 == 0:
-            print(f"  Day -{days_ago}: {total_events} events, {total_conversions} conversions so far...")
-
-    # Insert remaining batches
-    if events_batch:
-        cursor.executemany("INSERT INTO fact_events VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", events_batch)
-    if conversions_batch:
-        cursor.executemany("INSERT INTO fact_conversions VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)", conversions_batch)
-    conn.commit()
-
-    cursor.close()
-    conn.close()
+    # Hand every shard its own contiguous slice of the leased IDs
+    tasks = []
+    event_offset, conversion_offset = first_event_id, first_conversion_id
+    for shard, shard_hours in enumerate(shard_plan(plan, max(1, parallel))):
+        tasks.append((shard, conn_args, sink_args, ids, shard_hours, now, event_offset, conversion_offset, batch_size, seed, vectorized,
+                      writers, queue_depth, run_id, checkpoint_path))
+        event_offset += sum(entry[2] for entry in shard_hours)
+        conversion_offset += sum(entry[3] for entry in shard_hours)
+
+    print(f"[INFO] Writing {planned_events:,} events and {planned_conversions:,} conversions via {sink_type} "
+          f"in batches of {batch_size}, {len(tasks)} shard(s)"
+          + (f", {writers} writer(s) per shard" if writers > 0 else ""))
+    start = datetime.now()
+    if len(tasks) == 1:
+        results = [seed_shard(*tasks[0])]
+    else:
+        with multiprocessing.Pool(len(tasks)) as pool:
+            results = pool.starmap(seed_shard, tasks)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    total_events = sum(r[0] for r in results)
+    total_conversions = sum(r[1] for r in results)
+    failed_batches = sum(r[2] for r in results)
+    skipped_loads = sum(r[3] for r in results)
 
     print("\n" + "=" * 60)
     print("Historical Data Seeding Complete!")
@@ -196,9 +599,28 @@ def seed_historical_data(host, port, user, password, database, days=30):
     print(f"  Events generated:      {total_events:,}")
     print(f"  Conversions generated: {total_conversions:,}")
     print(f"  Date range:            {(now - timedelta(days=days)).strftime('%Y-%m-%d')} to {now.strftime('%Y-%m-%d')}")
+    print(f"  Elapsed:               {elapsed:.1f}s ({total_events / max(elapsed, 1e-9):,.0f} events/sec)")
+    if skipped_loads:
+        print(f"  Loads already done:    {skipped_loads:,} (skipped)")
+    if export:
+        # The run line marks the export complete; load_shards.py refuses manifests without it
+        if not failed_batches:
+            append_manifest(output_dir, {'run': {
+                'run_id': run_id, 'days': days, 'seed': seed, 'scale': scale, 'format': file_format,
+                'end_date': now.isoformat(), 'dims': {kind: ids[kind] for kind in ('user', 'feature', 'campaign')},
+                'events': [first_event_id, first_event_id + planned_events - 1],
+                'conversions': [first_conversion_id, first_conversion_id + planned_conversions - 1],
+            }})
+        _, shards = read_manifest(output_dir)
+        print(f"  Shards written:        {len(shards)} files, "
+              f"{sum(entry['bytes'] for entry in shards) / 1024 / 1024:,.1f} MB in {output_dir}")
+    if failed_batches:
+        print(f"  Failed batches:        {failed_batches}")
+        if checkpoint:
+            print(f"  Rerun with --checkpoint {checkpoint_path} to retry only the missing loads")
     print("=" * 60)
 
-    return True
+    return failed_batches == 0
 
 
 if __name__ == "__main__":
@@ -209,10 +631,64 @@ if __name__ == "__main__":
     parser.add_argument('--password', default='', help='Database password')
     parser.add_argument('--database', default='user_analytics', help='Database name')
     parser.add_argument('--days', type=int, default=30, help='Days of history to generate')
+    parser.add_argument('--sink', choices=SINK_TYPES + ['file'], default='mysql',
+                        help='How fact rows are written (file = export shards for load_shards.py)')
+    parser.add_argument('--http-port', type=int, default=8030, help='FE HTTP port for Stream Load')
+    parser.add_argument('--stream-load-format', choices=STREAM_LOAD_FORMATS, default='csv',
+                        help='Payload format for Stream Load batches')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Rows per generated batch; without --checkpoint, loads merge batches up to this size')
+    parser.add_argument('--id-store', choices=ID_STORES, default='table',
+                        help='Where the ID watermark is persisted (none = MAX() scans)')
+    parser.add_argument('--id-state-file', default='datagen_ids.json', help='State file for --id-store file')
+    parser.add_argument('--recover-ids', action='store_true',
+                        help='Raise the fact ID watermark to MAX() of the fact tables (e.g. after external loads)')
+    parser.add_argument('--parallel', type=int, default=1,
+                        help='Worker processes, each seeding a contiguous range of days')
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--scale-factor', type=float,
+                      help=f'Dataset size; SF1 = {SF1_EVENTS:,} events and {SF1_DIMENSIONS["user"]:,} users')
+    size.add_argument('--target-rows', type=int, help='fact_events rows to generate (sets the scale factor)')
+    size.add_argument('--target-bytes', type=float,
+                      help=f'Approximate fact_events bytes to generate (~{EVENT_ROW_BYTES} bytes per row)')
+    parser.add_argument('--seed', type=int, help='RNG seed for a reproducible dataset (use with --end-date)')
+    parser.add_argument('--end-date', type=lambda s: datetime.strptime(s, '%Y-%m-%d'),
+                        help='Last seeded day is the day before this date, YYYY-MM-DD (default: now)')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='Generate each day as NumPy column blocks with Poisson hourly counts (requires numpy)')
+    parser.add_argument('--writers', type=int, default=0,
+                        help='Writer threads per shard draining a queue of generated batches (0 = write inline)')
+    parser.add_argument('--queue-depth', type=int, default=8,
+                        help='Batches buffered between generation and the writers (with --writers)')
+    parser.add_argument('--output-dir', help='Directory for shard files and manifest.jsonl (with --sink file)')
+    parser.add_argument('--file-format', choices=FILE_FORMATS, default='csv.gz',
+                        help='Shard file format (parquet requires pyarrow)')
+    parser.add_argument('--shard-size-mb', type=float, default=DEFAULT_SHARD_MB,
+                        help='Start a new shard file once the current one reaches this size')
+    parser.add_argument('--checkpoint',
+                        help='Checkpoint file; an interrupted run rerun with the same file skips completed loads')
 
     args = parser.parse_args()
+    if args.vectorized and not NUMPY_AVAILABLE:
+        print("[ERROR] --vectorized requires numpy (pip install numpy)")
+        sys.exit(1)
+    if args.sink == 'file' and not args.output_dir:
+        print("[ERROR] --sink file requires --output-dir")
+        sys.exit(1)
+    if args.file_format == 'parquet' and not PYARROW_AVAILABLE:
+        print("[ERROR] --file-format parquet requires pyarrow (pip install pyarrow)")
+        sys.exit(1)
+    scale_factor = args.scale_factor
+    if args.target_rows:
+        scale_factor = args.target_rows / SF1_EVENTS
+    elif args.target_bytes:
+        scale_factor = args.target_bytes / EVENT_ROW_BYTES / SF1_EVENTS
 
     success = seed_historical_data(
-        args.host, args.port, args.user, args.password, args.database, args.days
+        args.host, args.port, args.user, args.password, args.database, args.days,
+        args.sink, args.http_port, args.stream_load_format, args.batch_size,
+        args.id_store, args.id_state_file, args.recover_ids, args.parallel, scale_factor,
+        args.seed, args.end_date, args.vectorized, args.writers, max(1, args.queue_depth),
+        args.checkpoint, args.output_dir, args.file_format, args.shard_size_mb
     )
     sys.exit(0 if success else 1)
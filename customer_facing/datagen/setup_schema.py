@@ -2,12 +2,52 @@
 """
 Create database and schema for VeloDB Customer Analytics Demo.
 Run this FIRST before seeding data.
+
+Schema profiles (--profile) choose the fact table layout:
+- default:     unpartitioned, DUPLICATE KEY on the fact ID, fixed buckets
+- partitioned: daily dynamic RANGE partitions on event_time/conversion_time,
+  a time-leading sort key, and buckets sized from the expected daily volume.
+  Dashboard filters like event_time >= DATE_SUB(NOW(), INTERVAL 30 DAY)
+  prune to the matching partitions, and partitions older than
+  --retention-days are dropped, so the continuous datagen does not grow
+  the scan set forever.
+
+Profiles only apply when the fact tables are created; drop them (or use a
+new --database) to switch an existing database to another profile.
+
+--colocate distributes dim_users, fact_events and fact_conversions by
+user_id with equal bucket counts in one colocation group, so the
+user_id joins most dashboard panels run are done bucket by bucket on each
+BE instead of shuffling the facts (see bench_colocation.py).
+
+--materialized-views also creates async MVs for the dashboard rollups (see
+materialized_views.py).
 """
 
 import argparse
+import math
 import mysql.connector
 from mysql.connector import Error
 
+from materialized_views import create_materialized_views
+
+SCHEMA_PROFILES = ['default', 'partitioned']
+# Distribution of the default layout; --colocate replaces it for the user-keyed tables
+DEFAULT_LAYOUT = {'user_buckets': 4, 'event_key': 'event_id', 'event_buckets': 8,
+                  'conversion_key': 'conversion_id', 'conversion_buckets': 4, 'colocation': ''}
+COLOCATION_GROUP = 'user_key'
+DEFAULT_COLOCATE_BUCKETS = 8
+DEFAULT_RETENTION_DAYS = 90
+# Dynamic partitions created ahead of today, so writes never hit a missing partition
+PARTITIONS_AHEAD = 3
+# Bucket sizing for the partitioned profile: tablets of about 1 GB of raw rows
+FACT_ROW_BYTES = 200
+TARGET_TABLET_BYTES = 1024 ** 3
+MAX_PARTITION_BUCKETS = 32
+# Conversions per event in the datagen's default rates (3 per 50)
+CONVERSIONS_PER_EVENT = 0.06
+
+# Database and dimension tables, shared by every profile
 SCHEMA_SQL = """
 -- Create database if not exists
 CREATE DATABASE IF NOT EXISTS {database};
@@ -26,8 +66,8 @@ CREATE TABLE IF NOT EXISTS dim_users (
     properties VARIANT
 )
 DUPLICATE KEY(user_id)
-DISTRIBUTED BY HASH(user_id) BUCKETS 4
-PROPERTIES("replication_num" = "1");
+DISTRIBUTED BY HASH(user_id) BUCKETS {user_buckets}
+PROPERTIES("replication_num" = "1"{colocation});
 
 -- Dimension: Features
 CREATE TABLE IF NOT EXISTS dim_features (
@@ -54,6 +94,11 @@ CREATE TABLE IF NOT EXISTS dim_campaigns (
 DUPLICATE KEY(campaign_id)
 DISTRIBUTED BY HASH(campaign_id) BUCKETS 4
 PROPERTIES("replication_num" = "1");
+"""
+
+# Fact tables per schema profile
+DEFAULT_FACTS_SQL = """
+USE {database};
 
 -- Fact: Events
 CREATE TABLE IF NOT EXISTS fact_events (
@@ -70,8 +115,8 @@ CREATE TABLE IF NOT EXISTS fact_events (
     INDEX idx_search (search_query) USING INVERTED PROPERTIES("parser" = "english")
 )
 DUPLICATE KEY(event_id)
-DISTRIBUTED BY HASH(event_id) BUCKETS 8
-PROPERTIES("replication_num" = "1");
+DISTRIBUTED BY HASH({event_key}) BUCKETS {event_buckets}
+PROPERTIES("replication_num" = "1"{colocation});
 
 -- Fact: Conversions
 CREATE TABLE IF NOT EXISTS fact_conversions (
@@ -87,10 +132,79 @@ CREATE TABLE IF NOT EXISTS fact_conversions (
     properties VARIANT
 )
 DUPLICATE KEY(conversion_id)
-DISTRIBUTED BY HASH(conversion_id) BUCKETS 4
-PROPERTIES("replication_num" = "1");
+DISTRIBUTED BY HASH({conversion_key}) BUCKETS {conversion_buckets}
+PROPERTIES("replication_num" = "1"{colocation});
+"""
+
+# Key columns lead the column list, so event_time/conversion_time come first
+PARTITIONED_FACTS_SQL = """
+USE {database};
+
+-- Fact: Events, one partition per day
+CREATE TABLE IF NOT EXISTS fact_events (
+    event_time DATETIME,
+    event_id BIGINT,
+    user_id BIGINT,
+    feature_id BIGINT,
+    campaign_id BIGINT,
+    session_id VARCHAR(50),
+    event_type VARCHAR(50),
+    page_url VARCHAR(500),
+    search_query VARCHAR(200),
+    properties VARIANT,
+    INDEX idx_search (search_query) USING INVERTED PROPERTIES("parser" = "english")
+)
+DUPLICATE KEY(event_time)
+PARTITION BY RANGE(event_time) ()
+DISTRIBUTED BY HASH({event_key}) BUCKETS {event_buckets}
+PROPERTIES(
+    "replication_num" = "1"{colocation},
+    "dynamic_partition.enable" = "true",
+    "dynamic_partition.time_unit" = "DAY",
+    "dynamic_partition.start" = "-{retention_days}",
+    "dynamic_partition.end" = "{partitions_ahead}",
+    "dynamic_partition.prefix" = "p",
+    "dynamic_partition.buckets" = "{event_buckets}",
+    "dynamic_partition.create_history_partition" = "true",
+    "dynamic_partition.history_partition_num" = "{retention_days}"
+);
+
+-- Fact: Conversions, one partition per day
+CREATE TABLE IF NOT EXISTS fact_conversions (
+    conversion_time DATETIME,
+    conversion_id BIGINT,
+    user_id BIGINT,
+    feature_id BIGINT,
+    campaign_id BIGINT,
+    conversion_type VARCHAR(50),
+    plan_from VARCHAR(20),
+    plan_to VARCHAR(20),
+    revenue DECIMAL(10,2),
+    properties VARIANT
+)
+DUPLICATE KEY(conversion_time)
+PARTITION BY RANGE(conversion_time) ()
+DISTRIBUTED BY HASH({conversion_key}) BUCKETS {conversion_buckets}
+PROPERTIES(
+    "replication_num" = "1"{colocation},
+    "dynamic_partition.enable" = "true",
+    "dynamic_partition.time_unit" = "DAY",
+    "dynamic_partition.start" = "-{retention_days}",
+    "dynamic_partition.end" = "{partitions_ahead}",
+    "dynamic_partition.prefix" = "p",
+    "dynamic_partition.buckets" = "{conversion_buckets}",
+    "dynamic_partition.create_history_partition" = "true",
+    "dynamic_partition.history_partition_num" = "{retention_days}"
+);
 """
 
+FACTS_SQL = {'default': DEFAULT_FACTS_SQL, 'partitioned': PARTITIONED_FACTS_SQL}
+
+# Fact tables written by the datagen; group commit settings apply to these
+FACT_TABLES = ['fact_events', 'fact_conversions']
+# Daily fact_events volume assumed for bucket sizing when --daily-events is not given
+DEFAULT_DAILY_EVENTS = 1000000
+
 SEED_USERS = """INSERT INTO dim_users VALUES
 (1, 'alex.chen@gmail.com', 'Alex Chen', '2024-01-15', 'Pro', 'USA', 'Technology', '{"device":"desktop","browser":"Chrome"}'),
 (2, 'sam.smith@company.com', 'Sam Smith', '2024-02-01', 'Enterprise', 'UK', 'Finance', '{"device":"desktop","browser":"Safari"}'),
@@ -123,8 +237,64 @@ SEED_CAMPAIGNS = """INSERT INTO dim_campaigns VALUES
 (5, 'Brand 2025 Campaign', 'Direct', 'ProductHunt', 'referral', '{"budget":2000,"target":"awareness"}')"""
 
 
-def setup_schema(host, port, user, password, database):
-    """Create database and tables."""
+def partition_buckets(daily_rows: int) -> int:
+    """Buckets per daily partition, so each tablet holds about TARGET_TABLET_BYTES of rows.
+
+    Fixed table-wide bucket counts multiply by the number of partitions; a
+    small daily volume gets one bucket per day instead of hundreds of tiny
+    tablets across the retention window.
+    """
+    return max(1, min(MAX_PARTITION_BUCKETS, math.ceil(daily_rows * FACT_ROW_BYTES / TARGET_TABLET_BYTES)))
+
+
+def execute_script(cursor, sql: str):
+    """Run ;-separated statements, tolerating objects that already exist."""
+    for statement in sql.split(';'):
+        statement = statement.strip()
+        if statement:
+            try:
+                cursor.execute(statement)
+            except Error as e:
+                if "already exists" not in str(e).lower():
+                    print(f"[WARN] {e}")
+
+
+def check_profile(cursor, database: str, profile: str, colocate: bool = False) -> list:
+    """Warn when existing tables have a different layout than the requested profile.
+
+    Returns the fact tables that are actually range-partitioned.
+    """
+    partitioned_tables = []
+    for table in ['dim_users'] + FACT_TABLES:
+        cursor.execute(f"SHOW CREATE TABLE {database}.{table}")
+        ddl = cursor.fetchone()[1]
+        partitioned = 'PARTITION BY RANGE' in ddl.upper()
+        if partitioned and table != 'dim_users':
+            partitioned_tables.append(table)
+        if (table != 'dim_users' and partitioned != (profile == 'partitioned')) \
+                or ('colocate_with' in ddl) != colocate:
+            print(f"[WARN] {table} already exists with a different layout than profile '{profile}'"
+                  f"{' with --colocate' if colocate else ''}; drop it (or use a new --database) to switch")
+    return partitioned_tables
+
+
+def setup_schema(host, port, user, password, database, group_commit_interval_ms=None, profile='default',
+                 retention_days=DEFAULT_RETENTION_DAYS, daily_events=None, materialized_views=False,
+                 mv_refresh_minutes=None, colocate=False,
+                 colocate_buckets=DEFAULT_COLOCATE_BUCKETS):
+    """Create database and tables.
+
+    group_commit_interval_ms sets how long group commit buffers writes to the
+    fact tables before committing them (VeloDB defaults to 10s).
+    profile selects the fact table layout (SCHEMA_PROFILES). For 'partitioned',
+    retention_days is how many days of partitions are kept and daily_events
+    (expected fact_events rows per day) sizes the buckets of each partition.
+    materialized_views creates the dashboard rollup MVs, refreshed every
+    mv_refresh_minutes (default: every minute for the partitioned profile,
+    whose MVs refresh only changed days, hourly for full rebuilds).
+    colocate puts dim_users and the facts in one colocation group, all hashed
+    on user_id into colocate_buckets buckets (per partition for facts).
+    """
     print("=" * 60)
     print("VeloDB Analytics - Schema Setup")
     print("=" * 60)
@@ -139,16 +309,43 @@ def setup_schema(host, port, user, password, database):
 
         # Execute schema SQL
         print(f"[INFO] Creating database '{database}' and tables...")
-        for statement in SCHEMA_SQL.format(database=database).split(';'):
-            statement = statement.strip()
-            if statement:
-                try:
-                    cursor.execute(statement)
-                except Error as e:
-                    if "already exists" not in str(e).lower():
-                        print(f"[WARN] {e}")
+        layout = dict(DEFAULT_LAYOUT, database=database)
+        if profile == 'partitioned':
+            daily_events = daily_events or DEFAULT_DAILY_EVENTS
+            layout.update(retention_days=retention_days, partitions_ahead=PARTITIONS_AHEAD,
+                          event_buckets=partition_buckets(daily_events),
+                          conversion_buckets=partition_buckets(int(daily_events * CONVERSIONS_PER_EVENT)))
+            print(f"[INFO] Partitioned profile: daily partitions, {retention_days} days retained, "
+                  f"{layout['event_buckets']}/{layout['conversion_buckets']} buckets per partition "
+                  f"for ~{daily_events:,} events/day")
+        if colocate:
+            # Colocated tables must agree on distribution column type and bucket count
+            layout.update(event_key='user_id', conversion_key='user_id', user_buckets=colocate_buckets,
+                          event_buckets=colocate_buckets, conversion_buckets=colocate_buckets,
+                          colocation=f', "colocate_with" = "{COLOCATION_GROUP}"')
+            print(f"[INFO] Colocating dim_users, {', '.join(FACT_TABLES)} in group '{COLOCATION_GROUP}': "
+                  f"HASH(user_id), {colocate_buckets} buckets")
+        execute_script(cursor, SCHEMA_SQL.format(**layout))
+        execute_script(cursor, FACTS_SQL[profile].format(**layout))
+        partitioned_tables = check_profile(cursor, database, profile, colocate)
         print("[INFO] Schema created successfully")
 
+        if profile == 'partitioned':
+            # Applies to tables created earlier too; older partitions are dropped by the FE scheduler
+            for table in FACT_TABLES:
+                if table not in partitioned_tables:
+                    print(f"[WARN] Skipping retention for {table}: it is not range-partitioned; "
+                          f"drop the tables (or use a new --database) to switch to the partitioned profile")
+                    continue
+                cursor.execute(f'ALTER TABLE {database}.{table} '
+                               f'SET ("dynamic_partition.start" = "-{retention_days}")')
+
+        if group_commit_interval_ms:
+            for table in FACT_TABLES:
+                cursor.execute(f'ALTER TABLE {database}.{table} '
+                               f'SET ("group_commit_interval_ms" = "{group_commit_interval_ms}")')
+            print(f"[INFO] Group commit interval set to {group_commit_interval_ms}ms on {', '.join(FACT_TABLES)}")
+
         # Check if dimensions need seeding
         cursor.execute(f"SELECT COUNT(*) FROM {database}.dim_users")
         user_count = cursor.fetchone()[0]
@@ -172,9 +369,16 @@ def setup_schema(host, port, user, password, database):
         else:
             print(f"[INFO] Dimension tables already have data ({user_count} users)")
 
+        ok = True
+        if materialized_views:
+            print("[INFO] Creating materialized views for the dashboard rollups...")
+            # Partitioned MVs need partitioned fact tables, whatever the requested profile
+            ok = create_materialized_views(cursor, database, mv_refresh_minutes,
+                                           len(partitioned_tables) == len(FACT_TABLES))
+
         cursor.close()
         conn.close()
-        return True
+        return ok
 
     except Error as e:
         print(f"[ERROR] Setup failed: {e}")
@@ -188,7 +392,29 @@ if __name__ == "__main__":
     parser.add_argument("--user", required=True)
     parser.add_argument("--password", default="")
     parser.add_argument("--database", default="user_analytics")
+    parser.add_argument("--group-commit-interval-ms", type=int,
+                        help="Group commit interval for the fact tables (used with datagen.py --group-commit)")
+    parser.add_argument("--profile", choices=SCHEMA_PROFILES, default="default",
+                        help="Fact table layout: default, or partitioned (daily partitions with retention)")
+    parser.add_argument("--retention-days", type=int, default=DEFAULT_RETENTION_DAYS,
+                        help="Days of fact partitions to keep (partitioned profile); must cover seeded history")
+    parser.add_argument("--daily-events", type=int,
+                        help=f"Expected fact_events rows per day, for bucket sizing "
+                             f"(partitioned profile, default {DEFAULT_DAILY_EVENTS:,})")
+
+    parser.add_argument("--materialized-views", action="store_true",
+                        help="Create async MVs for the dashboard rollups (use with VELODB_USE_MVS=true)")
+    parser.add_argument("--mv-refresh-minutes", type=int,
+                        help="How often the materialized views refresh (default: 1 for the partitioned "
+                             "profile, 60 for full rebuilds on the default profile)")
+
+    parser.add_argument("--colocate", action="store_true",
+                        help="Distribute dim_users and the fact tables by user_id in one colocation group")
+    parser.add_argument("--colocate-buckets", type=int, default=DEFAULT_COLOCATE_BUCKETS,
+                        help="Buckets of every colocated table (per partition for partitioned facts)")
 
     args = parser.parse_args()
-    success = setup_schema(args.host, args.port, args.user, args.password, args.database)
+    success = setup_schema(args.host, args.port, args.user, args.password, args.database,
+                           args.group_commit_interval_ms, args.profile, args.retention_days, args.daily_events,
+                           args.materialized_views, args.mv_refresh_minutes, args.colocate, args.colocate_buckets)
     exit(0 if success else 1)
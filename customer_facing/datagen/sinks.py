@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Pluggable row sinks for the datagen and historical seeder.
+
+Two ways of getting fact rows into VeloDB:
+- MySQLSink: multi-row INSERT over the MySQL protocol (the original path)
+- StreamLoadSink: CSV or JSON-lines batches PUT to the Stream Load HTTP API
+
+Stream Load batches carry a unique label. Retries reuse the same label, so a
+batch that landed before a dropped response is reported as "Label Already
+Exists" instead of being loaded twice. MySQLSink does the same with
+INSERT ... WITH LABEL when the caller passes a label.
+
+Both can also write through VeloDB group commit (GROUP_COMMIT_MODES): the
+server merges many small writes into one load, so per-row and small-batch
+inserts stop creating a tablet version each. Group commit assigns its own
+labels, so caller labels are not sent in that mode.
+
+Both accept either a list of row tuples or a columnar.ColumnBlock, which is
+decoded here rather than by the generator.
+
+Usage:
+    sink = StreamLoadSink('fe-host', 8030, 'root', '', 'user_analytics', fmt='csv')
+    sink.write('fact_events', rows)
+"""
+
+import base64
+import http.client
+import itertools
+import json
+import time
+import uuid
+from typing import Optional
+from urllib.parse import urlsplit
+
+from mysql.connector import Error
+
+# Columns of the tables written through sinks, in the default profile's order (setup_schema.py).
+# Inserts and Stream Loads name them explicitly, so other profiles may order columns differently.
+TABLE_COLUMNS = {
+    'dim_users': ['user_id', 'email', 'name', 'signup_date', 'plan', 'country', 'industry', 'properties'],
+    'dim_features': ['feature_id', 'feature_name', 'category', 'description', 'tier_required'],
+    'dim_campaigns': ['campaign_id', 'campaign_name', 'channel', 'source', 'medium', 'properties'],
+    'fact_events': ['event_id', 'user_id', 'feature_id', 'campaign_id', 'session_id',
+                    'event_type', 'event_time', 'page_url', 'search_query', 'properties'],
+    'fact_conversions': ['conversion_id', 'user_id', 'feature_id', 'campaign_id', 'conversion_type',
+                         'conversion_time', 'plan_from', 'plan_to', 'revenue', 'properties'],
+}
+
+# VARIANT columns hold raw JSON text and are embedded as objects in JSON-lines batches
+VARIANT_COLUMNS = {'properties'}
+
+SINK_TYPES = ['mysql', 'stream-load']
+STREAM_LOAD_FORMATS = ['csv', 'json']
+# Shard file formats written by export.FileSink; StreamLoadSink.send() loads them as-is
+FILE_FORMATS = ['csv.gz', 'parquet']
+GROUP_COMMIT_MODES = ['off_mode', 'sync_mode', 'async_mode']
+
+# \x01 never appears in generated values, unlike commas and tabs in JSON properties
+CSV_COLUMN_SEPARATOR = '\x01'
+CSV_NULL = '\\N'
+
+
+def csv_payload(rows) -> bytes:
+    """Encode rows (or a ColumnBlock) as \\x01-separated CSV with \\N for NULL."""
+    if hasattr(rows, 'csv_lines'):
+        lines = rows.csv_lines(CSV_COLUMN_SEPARATOR, CSV_NULL)
+    else:
+        lines = [CSV_COLUMN_SEPARATOR.join(CSV_NULL if v is None else str(v) for v in row) for row in rows]
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+def multi_row_insert(table: str, rows: list, label: Optional[str] = None) -> tuple:
+    """Build a single INSERT statement and its flattened parameters for rows."""
+    placeholders = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+    with_label = f" WITH LABEL {label}" if label else ""
+    columns = f" ({', '.join(TABLE_COLUMNS[table])})" if table in TABLE_COLUMNS else ""
+    sql = f"INSERT INTO {table}{with_label}{columns} VALUES " + ", ".join([placeholders] * len(rows))
+    params = tuple(itertools.chain.from_iterable(rows))
+    return sql, params
+
+
+def enable_group_commit(conn, mode: str):
+    """Set the group_commit session variable on a MySQL connection."""
+    if mode not in GROUP_COMMIT_MODES:
+        raise ValueError(f"Unsupported group commit mode: {mode}")
+    cursor = conn.cursor()
+    cursor.execute(f"SET group_commit = '{mode}'")
+    cursor.close()
+
+
+class MySQLSink:
+    """Write rows through the MySQL protocol as multi-row INSERT statements.
+
+    With group_commit the session variable is set on conn, so give the sink a
+    connection of its own (owns_conn=True) unless every insert on it should be
+    group committed.
+    """
+
+    def __init__(self, conn, group_commit: str = 'off_mode', owns_conn: bool = False):
+        self.conn = conn
+        self.group_commit = group_commit
+        self.owns_conn = owns_conn
+        self.last_error = None
+        self.last_error_message = None
+        if group_commit != 'off_mode':
+            enable_group_commit(conn, group_commit)
+
+    def write(self, table: str, rows: list, label: Optional[str] = None) -> bool:
+        """Insert rows into table with a single statement, labelled when label is given."""
+        if not rows:
+            return True
+        if hasattr(rows, 'rows'):
+            rows = rows.rows()
+        if self.group_commit != 'off_mode':
+            label = None
+        sql, params = multi_row_insert(table, rows, label)
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            cursor.close()
+            if not self.conn.autocommit:
+                self.conn.commit()
+            return True
+        except Error as e:
+            if label and 'already been used' in str(e):
+                return True  # An earlier attempt with this label was committed
+            self.last_error = f"mysql_{getattr(e, 'errno', None) or type(e).__name__}"
+            self.last_error_message = str(e)
+            print(f"[ERROR] Insert into {table} failed ({len(rows)} rows): {e}")
+            return False
+
+    def close(self):
+        """Close the connection if the sink owns it; otherwise the caller does."""
+        if self.owns_conn and self.conn.is_connected():
+            self.conn.close()
+
+
+class StreamLoadError(Exception):
+    """Raised when a Stream Load request fails in a way that may be retried."""
+
+
+class StreamLoadSink:
+    """Write rows through the Stream Load HTTP endpoint.
+
+    Connections are kept alive per host so the FE -> BE redirect and every
+    following batch reuse the same sockets.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 fmt: str = 'csv', label_prefix: str = 'datagen', max_retries: int = 3,
+                 timeout: float = 60, secure: bool = False, group_commit: str = 'off_mode'):
+        if fmt not in STREAM_LOAD_FORMATS + FILE_FORMATS:
+            raise ValueError(f"Unsupported Stream Load format: {fmt}")
+        if group_commit not in GROUP_COMMIT_MODES:
+            raise ValueError(f"Unsupported group commit mode: {group_commit}")
+        self.host = host
+        self.port = port
+        self.database = database
+        self.fmt = fmt
+        self.label_prefix = label_prefix
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.secure = secure
+        self.group_commit = group_commit
+        token = base64.b64encode(f"{user}:{password}".encode()).decode()
+        self.auth_header = f"Basic {token}"
+        self.connections = {}
+        self.last_error = None
+        self.last_error_message = None
+
+    def _connection(self, host: str, port: int, secure: bool) -> http.client.HTTPConnection:
+        """Return a cached keep-alive connection for host:port."""
+        key = (host, port, secure)
+        conn = self.connections.get(key)
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if secure else http.client.HTTPConnection
+            conn = conn_cls(host, port, timeout=self.timeout)
+            self.connections[key] = conn
+        return conn
+
+    def _drop_connection(self, host: str, port: int, secure: bool):
+        conn = self.connections.pop((host, port, secure), None)
+        if conn:
+            conn.close()
+
+    def encode(self, table: str, rows: list) -> bytes:
+        """Encode rows (or a ColumnBlock) as a CSV or JSON-lines payload."""
+        if self.fmt == 'csv':
+            return csv_payload(rows)
+        if hasattr(rows, 'csv_lines'):
+            rows = rows.rows()
+        columns = TABLE_COLUMNS[table]
+        lines = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            for col in VARIANT_COLUMNS.intersection(record):
+                if isinstance(record[col], str):
+                    record[col] = json.loads(record[col])
+            lines.append(json.dumps(record, default=str))
+        return ("\n".join(lines) + "\n").encode('utf-8')
+
+    def _headers(self, table: str, label: str, body: bytes) -> dict:
+        headers = {
+            'Authorization': self.auth_header,
+            'columns': ",".join(TABLE_COLUMNS[table]),
+            'Content-Length': str(len(body)),
+            'Connection': 'keep-alive',
+        }
+        if self.group_commit != 'off_mode':
+            headers['group_commit'] = self.group_commit  # Labels are assigned by group commit
+        else:
+            headers['label'] = label
+        if self.fmt in ('csv', 'csv.gz'):
+            headers['format'] = 'csv'
+            headers['column_separator'] = '\\x01'
+            if self.fmt == 'csv.gz':
+                headers['compress_type'] = 'gz'
+        elif self.fmt == 'parquet':
+            headers['format'] = 'parquet'
+        else:
+            headers['format'] = 'json'
+            headers['read_json_by_line'] = 'true'
+        return headers
+
+    def _put(self, table: str, label: str, body: bytes) -> dict:
+        """PUT one batch, following the FE -> BE redirect, and return the JSON result."""
+        host, port, secure = self.host, self.port, self.secure
+        path = f"/api/{self.database}/{table}/_stream_load"
+        headers = self._headers(table, label, body)
+
+        for _ in range(3):  # FE may redirect to a BE
+            conn = self._connection(host, port, secure)
+            try:
+                conn.request('PUT', path, body=body, headers=headers)
+                resp = conn.getresponse()
+                payload = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                self._drop_connection(host, port, secure)
+                raise StreamLoadError(f"HTTP error talking to {host}:{port}: {e}")
+
+            if resp.status in (301, 302, 307, 308):
+                location = urlsplit(resp.getheader('Location'))
+                secure = location.scheme == 'https'
+                host = location.hostname
+                port = location.port or (443 if secure else 80)
+                path = location.path + (f"?{location.query}" if location.query else "")
+                continue
+            if resp.status != 200:
+                raise StreamLoadError(f"HTTP {resp.status}: {payload[:200]!r}")
+            try:
+                return json.loads(payload)
+            except ValueError:
+                raise StreamLoadError(f"Malformed Stream Load response: {payload[:200]!r}")
+
+        raise StreamLoadError("Too many redirects")
+
+    def write(self, table: str, rows: list, label: Optional[str] = None) -> bool:
+        """Load rows into table. Retries reuse the batch label so they are idempotent."""
+        if not rows:
+            return True
+        return self.send(table, self.encode(table, rows), label)
+
+    def send(self, table: str, body: bytes, label: Optional[str] = None) -> bool:
+        """Load an already encoded payload (e.g. an exported shard file) in the sink's format."""
+        label = label or f"{self.label_prefix}_{table}_{uuid.uuid4().hex}"
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                result = self._put(table, label, body)
+            except StreamLoadError as e:
+                print(f"[WARN] Stream Load {label} attempt {attempt}/{self.max_retries} failed: {e}")
+                time.sleep(min(2 ** attempt, 10))
+                continue
+
+            status = result.get('Status')
+            if status in ('Success', 'Publish Timeout'):
+                return True
+            if status == 'Label Already Exists':
+                existing = result.get('ExistingJobStatus')
+                if existing == 'FINISHED':
+                    return True
+                if existing == 'RUNNING':
+                    # A previous attempt is still in flight; wait for it to settle
+                    time.sleep(min(2 ** attempt, 10))
+                    continue
+            self.last_error = f"stream_load_{status}"
+            self.last_error_message = result.get('Message')
+            print(f"[ERROR] Stream Load {label} into {table} failed: {status} - "
+                  f"{result.get('Message')} {result.get('ErrorURL', '')}".rstrip())
+            return False
+
+        self.last_error = 'stream_load_http'
+        self.last_error_message = None
+        print(f"[ERROR] Stream Load {label} into {table} gave up after {self.max_retries} attempts")
+        return False
+
+    def close(self):
+        """Close all keep-alive connections."""
+        for conn in self.connections.values():
+            conn.close()
+        self.connections.clear()
+
+
+def make_sink(sink_type: str, conn, host: str, http_port: int, user: str, password: str,
+              database: str, fmt: str = 'csv', label_prefix: str = 'datagen', group_commit: str = 'off_mode',
+              owns_conn: bool = False):
+    """Build the sink selected on the command line."""
+    if sink_type == 'stream-load':
+        return StreamLoadSink(host, http_port, user, password, database, fmt=fmt, label_prefix=label_prefix,
+                              group_commit=group_commit)
+    return MySQLSink(conn, group_commit, owns_conn)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the VeloDB Stream Load HTTP endpoint.
+
+Implements just enough of the Stream Load response contract to exercise
+sinks.StreamLoadSink without a cluster:
+- PUT /api/{db}/{table}/_stream_load with a `label` header
+- FE -> BE style 307 redirect on the first hop (--redirect)
+- "Success" with NumberLoadedRows, and "Label Already Exists" with
+  ExistingJobStatus=FINISHED when a label is reused
+- `group_commit` header instead of a label, answered with a server-side
+  group_commit_* label
+- Optional random failures (--fail-rate) to exercise retries
+- Row counts for csv/json (one row per line), csv.gz (counted after
+  decompressing) and parquet (from the file footer; only when pyarrow is
+  installed, otherwise the row counts are left out of the response)
+
+Usage:
+    python stream_load_stub.py --port 8030
+    python datagen.py --sink stream-load --host 127.0.0.1 --http-port 8030 ...
+"""
+
+import argparse
+import gzip
+import io
+import json
+import random
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Optional parquet row counts
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+class StreamLoadState:
+    """Labels seen so far and rows loaded per table."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.labels = {}
+        self.rows = {}
+        self.uncounted_loads = 0  # Parquet loads without pyarrow
+
+
+def count_rows(headers, data: bytes) -> Optional[int]:
+    """Rows in a load body in the format its headers declare; None when it cannot be counted here.
+
+    Raises ValueError for a body that is not valid in that format.
+    """
+    if headers.get('format', 'csv').lower() == 'parquet':
+        if not PYARROW_AVAILABLE:
+            return None
+        try:
+            return pq.ParquetFile(io.BytesIO(data)).metadata.num_rows
+        except Exception as e:
+            raise ValueError(f"invalid parquet file: {e}")
+    if headers.get('compress_type', '').lower() == 'gz':
+        try:
+            data = gzip.decompress(data)
+        except (OSError, EOFError) as e:
+            raise ValueError(f"invalid gzip data: {e}")
+    # csv and json lines: one row per non-empty line, with or without a trailing newline
+    return sum(1 for line in data.split(b'\n') if line.strip())
+
+
+def make_handler(state: StreamLoadState, redirect: bool, fail_rate: float):
+    class StreamLoadHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def _reply(self, status: int, body: dict = None, headers: dict = None):
+            payload = json.dumps(body).encode() if body is not None else b''
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_PUT(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip('/').split('/')
+            length = int(self.headers.get('Content-Length', 0))
+            data = self.rfile.read(length)
+
+            if len(parts) != 4 or parts[0] != 'api' or parts[3] != '_stream_load':
+                self._reply(404, {'Status': 'Fail', 'Message': f'unknown path {self.path}'})
+                return
+            table = parts[2]
+
+            if redirect and 'be' not in parse_qs(url.query):
+                host, port = self.server.server_address[:2]
+                location = f"http://{host}:{port}{self.path}{'&' if url.query else '?'}be=1"
+                self._reply(307, headers={'Location': location})
+                return
+
+            label = self.headers.get('label')
+            group_commit = self.headers.get('group_commit', 'off_mode')
+            if group_commit != 'off_mode':
+                if label:
+                    self._reply(200, {'Status': 'Fail', 'Message': 'label and group_commit can not be set together'})
+                    return
+                label = f"group_commit_{uuid.uuid4().hex}"
+            if not label:
+                self._reply(200, {'Status': 'Fail', 'Message': 'label header is required'})
+                return
+            if random.random() < fail_rate:
+                # Drop the connection without a response, as a crashed BE would
+                self.close_connection = True
+                return
+
+            try:
+                num_rows = count_rows(self.headers, data)
+            except ValueError as e:
+                self._reply(200, {'Label': label, 'Status': 'Fail', 'Message': str(e)})
+                return
+            with state.lock:
+                if label in state.labels:
+                    self._reply(200, {
+                        'Label': label, 'Status': 'Label Already Exists',
+                        'ExistingJobStatus': 'FINISHED',
+                        'Message': f'Label [{label}] has already been used.',
+                    })
+                    return
+                state.labels[label] = num_rows
+                if num_rows is None:
+                    state.uncounted_loads += 1
+                else:
+                    state.rows[table] = state.rows.get(table, 0) + num_rows
+
+            result = {'TxnId': len(state.labels), 'Label': label, 'Status': 'Success', 'Message': 'OK',
+                      'LoadBytes': len(data)}
+            if num_rows is not None:
+                result.update({'NumberTotalRows': num_rows, 'NumberLoadedRows': num_rows, 'NumberFilteredRows': 0})
+            self._reply(200, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StreamLoadHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Stream Load stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8030)
+    parser.add_argument('--redirect', action='store_true', help='Redirect the first hop like an FE does')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests to drop')
+    args = parser.parse_args()
+
+    state = StreamLoadState()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state, args.redirect, args.fail_rate))
+    print(f"[INFO] Stream Load stub listening on {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[INFO] Rows loaded: {state.rows}, labels: {len(state.labels)}")
+        if state.uncounted_loads:
+            print(f"[WARN] {state.uncounted_loads} parquet load(s) not counted; install pyarrow to count them")
+
+
+if __name__ == '__main__':
+    main()
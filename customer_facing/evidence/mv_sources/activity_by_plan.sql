@@ -0,0 +1,8 @@
+-- Activity by Plan, from mv_activity_by_plan (fact_events + dim_users)
+SELECT
+    activity_date,
+    plan,
+    users
+FROM mv_activity_by_plan
+WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+ORDER BY activity_date
@@ -0,0 +1,13 @@
+-- Conversion Attribution, from mv_daily_conversions (fact_conversions + 3 dimensions)
+SELECT
+    channel,
+    source,
+    feature_name,
+    conversion_type,
+    SUM(conversions) AS conversions,
+    ROUND(SUM(revenue), 2) AS revenue
+FROM mv_daily_conversions
+WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+GROUP BY channel, source, feature_name, conversion_type
+ORDER BY revenue DESC
+LIMIT 30
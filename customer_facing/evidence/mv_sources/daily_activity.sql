@@ -0,0 +1,9 @@
+-- Daily Activity Trend, from mv_daily_activity (fact_events + dim_users + dim_campaigns)
+SELECT
+    activity_date,
+    users,
+    events,
+    sessions
+FROM mv_daily_activity
+WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+ORDER BY activity_date
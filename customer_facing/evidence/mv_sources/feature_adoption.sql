@@ -0,0 +1,12 @@
+-- Feature Adoption by Plan, from mv_feature_usage
+SELECT
+    plan,
+    feature_name,
+    BITMAP_UNION_COUNT(user_bitmap) AS users,
+    SUM(uses) AS uses
+FROM mv_feature_usage
+WHERE event_type = 'feature_use'
+  AND activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+GROUP BY plan, feature_name
+ORDER BY uses DESC
+LIMIT 50
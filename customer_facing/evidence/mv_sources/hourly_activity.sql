@@ -0,0 +1,9 @@
+-- Hourly activity for last 24 hours (real-time trend), from mv_hourly_activity
+SELECT
+    hour,
+    events,
+    users,
+    sessions
+FROM mv_hourly_activity
+WHERE hour >= DATE_FORMAT(DATE_SUB(NOW(), INTERVAL 24 HOUR), '%Y-%m-%d %H:00:00')
+ORDER BY hour
@@ -0,0 +1,7 @@
+-- Dashboard KPIs (Last 30 Days) from the daily rollups; sessions are an HLL estimate
+SELECT
+    (SELECT BITMAP_UNION_COUNT(user_bitmap) FROM mv_daily_activity WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS active_users,
+    (SELECT SUM(events) FROM mv_daily_activity WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_events,
+    (SELECT HLL_UNION_AGG(session_hll) FROM mv_daily_activity WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_sessions,
+    (SELECT SUM(conversions) FROM mv_daily_conversions WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_conversions,
+    (SELECT ROUND(SUM(revenue), 0) FROM mv_daily_conversions WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_revenue
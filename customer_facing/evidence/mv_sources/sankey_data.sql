@@ -0,0 +1,35 @@
+-- Sankey: Channel -> Top Feature -> Conversion, from mv_daily_conversions
+WITH conversion_data AS (
+    SELECT
+        channel,
+        feature_name,
+        conversion_type,
+        SUM(conversions) AS conversions
+    FROM mv_daily_conversions
+    WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+    GROUP BY channel, feature_name, conversion_type
+),
+top_features AS (
+    SELECT feature_name
+    FROM conversion_data
+    GROUP BY feature_name
+    ORDER BY SUM(conversions) DESC
+    LIMIT 5
+)
+SELECT
+    channel AS source,
+    feature_name AS target,
+    SUM(conversions) AS value
+FROM conversion_data
+WHERE feature_name IN (SELECT feature_name FROM top_features)
+GROUP BY channel, feature_name
+
+UNION ALL
+
+SELECT
+    feature_name AS source,
+    conversion_type AS target,
+    SUM(conversions) AS value
+FROM conversion_data
+WHERE feature_name IN (SELECT feature_name FROM top_features)
+GROUP BY feature_name, conversion_type
@@ -0,0 +1,11 @@
+-- Top 10 Features by Usage, from mv_feature_usage
+SELECT
+    feature_name,
+    SUM(uses) AS total_uses,
+    BITMAP_UNION_COUNT(user_bitmap) AS unique_users
+FROM mv_feature_usage
+WHERE event_type = 'feature_use'
+  AND activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+GROUP BY feature_name
+ORDER BY total_uses DESC
+LIMIT 10
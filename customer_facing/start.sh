@@ -26,6 +26,12 @@ options:
   database: ${VELODB_DATABASE}
 EOF
 
+# Point the dashboard queries at the rollup MVs (create them with setup_schema.py --materialized-views)
+if [ "${VELODB_USE_MVS}" = "true" ]; then
+    echo "[SETUP] Using materialized view query variants..."
+    cp /app/evidence/mv_sources/*.sql /app/evidence/sources/velodb/
+fi
+
 # Generate Evidence source data from SQL queries
 echo "[SETUP] Generating Evidence source data..."
 cd /app/evidence
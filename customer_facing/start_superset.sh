@@ -17,12 +17,18 @@ echo ""
 
 # Create database and schema in VeloDB
 echo "[SETUP] Creating database and schema in VeloDB..."
+SCHEMA_ARGS=()
+if [ "${VELODB_USE_MVS}" = "true" ]; then
+  SCHEMA_ARGS+=(--materialized-views)
+fi
 python3 /app/datagen/setup_schema.py \
   --host "${VELODB_HOST}" \
   --port "${VELODB_PORT}" \
   --user "${VELODB_USER}" \
   --password "${VELODB_PASSWORD}" \
-  --database "${VELODB_DATABASE}" || echo "[WARN] Schema setup had issues, continuing..."
+  --database "${VELODB_DATABASE}" \
+  --profile "${VELODB_SCHEMA_PROFILE:-default}" \
+  "${SCHEMA_ARGS[@]}" || echo "[WARN] Schema setup had issues, continuing..."
 
 # Setup dashboard using ORM (direct database access, no API needed)
 echo "[SETUP] Creating database connection, datasets, and dashboard..."
@@ -30,13 +36,21 @@ python3 /app/setup_via_orm.py || echo "[WARN] Dashboard setup had issues, contin
 
 # Seed 30 days of historical data for presentation-ready charts
 echo "[SETUP] Seeding 30 days of historical data for charts..."
-python3 /app/seed_history.py \
+# Run the copy in /app/datagen: Python puts the script's directory on sys.path,
+# so the seeder finds its sibling modules (sinks, idalloc, ...) there
+if ! python3 /app/datagen/seed_history.py \
   --host "${VELODB_HOST}" \
   --port "${VELODB_PORT}" \
   --user "${VELODB_USER}" \
   --password "${VELODB_PASSWORD}" \
   --database "${VELODB_DATABASE}" \
-  --days 30 || echo "[WARN] Historical data seeding had issues, continuing..."
+  --days 30; then
+  if [ "${VELODB_SEED_REQUIRED}" = "true" ]; then
+    echo "[ERROR] Historical data seeding failed (VELODB_SEED_REQUIRED=true)"
+    exit 1
+  fi
+  echo "[WARN] Historical data seeding had issues, continuing..."
+fi
 
 echo ""
 echo "[SETUP] Starting services..."
@@ -19,6 +19,8 @@ VELODB_PORT = os.environ.get("VELODB_PORT", "9030")
 VELODB_USER = os.environ.get("VELODB_USER", "root")
 VELODB_PASSWORD = os.environ.get("VELODB_PASSWORD", "")
 VELODB_DATABASE = os.environ.get("VELODB_DATABASE", "user_analytics")
+# Read the rollup MVs from datagen/materialized_views.py instead of raw fact tables
+VELODB_USE_MVS = os.environ.get("VELODB_USE_MVS", "false").lower() == "true"
 
 # Pre-defined schema matching the actual VeloDB tables
 TABLE_SCHEMAS = {
@@ -70,6 +72,112 @@ TABLE_SCHEMAS = {
 }
 
 
+# Virtual dataset SQL over the rollup MVs (created by setup_schema.py --materialized-views).
+# Windows are whole days, and sessions over 30 days are an HLL estimate.
+MV_DATASET_SQL = {
+    "vw_kpis": """SELECT
+(SELECT BITMAP_UNION_COUNT(user_bitmap) FROM mv_daily_activity WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS active_users,
+(SELECT SUM(events) FROM mv_daily_activity WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_events,
+(SELECT HLL_UNION_AGG(session_hll) FROM mv_daily_activity WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_sessions,
+(SELECT SUM(conversions) FROM mv_daily_conversions WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_conversions,
+(SELECT ROUND(SUM(revenue), 0) FROM mv_daily_conversions WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)) AS total_revenue""",
+    "vw_hourly_activity": """SELECT
+hour,
+events,
+users,
+sessions
+FROM mv_hourly_activity
+WHERE hour >= DATE_FORMAT(DATE_SUB(NOW(), INTERVAL 24 HOUR), '%Y-%m-%d %H:00:00')
+ORDER BY hour""",
+    "vw_daily_activity": """SELECT
+activity_date,
+users,
+events,
+sessions
+FROM mv_daily_activity
+WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+ORDER BY activity_date""",
+    "vw_activity_by_plan": """SELECT
+activity_date,
+plan,
+users
+FROM mv_activity_by_plan
+WHERE activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+ORDER BY activity_date""",
+    "vw_top_features": """SELECT
+feature_name,
+SUM(uses) AS total_uses,
+BITMAP_UNION_COUNT(user_bitmap) AS unique_users
+FROM mv_feature_usage
+WHERE event_type = 'feature_use'
+AND activity_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+GROUP BY feature_name
+ORDER BY total_uses DESC
+LIMIT 10""",
+    "vw_feature_heatmap": """SELECT
+feature_name,
+plan,
+SUM(uses) AS usage_count
+FROM mv_feature_usage
+WHERE feature_id IN (
+    SELECT feature_id FROM (
+        SELECT feature_id, SUM(uses) AS cnt
+        FROM mv_feature_usage
+        GROUP BY feature_id
+        ORDER BY cnt DESC
+        LIMIT 5
+    ) top_features
+)
+GROUP BY feature_name, plan""",
+    "vw_conversion_sankey": """WITH conversion_data AS (
+    SELECT
+        channel,
+        feature_name,
+        conversion_type,
+        SUM(conversions) AS conversions
+    FROM mv_daily_conversions
+    WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+    GROUP BY channel, feature_name, conversion_type
+),
+top_features AS (
+    SELECT feature_name
+    FROM conversion_data
+    GROUP BY feature_name
+    ORDER BY SUM(conversions) DESC
+    LIMIT 5
+)
+SELECT
+    channel AS source,
+    feature_name AS target,
+    SUM(conversions) AS value
+FROM conversion_data
+WHERE feature_name IN (SELECT feature_name FROM top_features)
+GROUP BY channel, feature_name
+
+UNION ALL
+
+SELECT
+    feature_name AS source,
+    conversion_type AS target,
+    SUM(conversions) AS value
+FROM conversion_data
+WHERE feature_name IN (SELECT feature_name FROM top_features)
+GROUP BY feature_name, conversion_type""",
+    "vw_attribution": """SELECT
+channel,
+source,
+feature_name,
+conversion_type,
+SUM(conversions) AS conversions,
+ROUND(SUM(revenue), 2) AS revenue
+FROM mv_daily_conversions
+WHERE conversion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+GROUP BY channel, source, feature_name, conversion_type
+ORDER BY revenue DESC
+LIMIT 30""",
+}
+
+
 def main():
     print("=" * 60)
     print("VeloDB Customer Analytics - Dashboard Setup")
@@ -355,12 +463,23 @@ LIMIT 30""",
             },
         }
 
+        if VELODB_USE_MVS:
+            print("       Using materialized view variants (VELODB_USE_MVS=true)")
+            for ds_name, sql in MV_DATASET_SQL.items():
+                VIRTUAL_DATASETS[ds_name]["sql"] = sql
+
         for ds_name, ds_config in VIRTUAL_DATASETS.items():
             existing = db.session.query(SqlaTable).filter_by(
                 table_name=ds_name, database_id=database.id
             ).first()
             if existing:
-                print(f"       {ds_name}: exists (ID: {existing.id})")
+                # Keep the SQL in step with VELODB_USE_MVS when it is toggled between runs
+                if existing.sql != ds_config["sql"].strip():
+                    existing.sql = ds_config["sql"].strip()
+                    db.session.commit()
+                    print(f"       {ds_name}: SQL updated (ID: {existing.id})")
+                else:
+                    print(f"       {ds_name}: exists (ID: {existing.id})")
                 tables[ds_name] = existing
                 continue
 
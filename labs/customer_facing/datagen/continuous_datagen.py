@@ -8,6 +8,7 @@ All 5 tables are synced to VeloDB via Flink CDC:
 - Fact tables: fact_events, fact_conversions
 
 Optional: Also streams to Kafka for demonstrating dual-path ingestion.
+Optional: Serves Prometheus metrics on METRICS_PORT (requires prometheus_client).
 """
 
 import os
@@ -31,6 +32,14 @@ except ImportError:
     KAFKA_AVAILABLE = False
     print("[INFO] kafka-python not installed, Kafka streaming disabled")
 
+# Optional Prometheus metrics
+try:
+    from prometheus_client import Counter, Gauge, Histogram, start_http_server
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    print("[INFO] prometheus_client not installed, metrics endpoint disabled")
+
 # Configuration from environment
 POSTGRES_CONFIG = {
     'host': os.getenv('POSTGRES_HOST', 'localhost'),
@@ -45,6 +54,8 @@ KAFKA_CONFIG = {
     'enabled': os.getenv('KAFKA_ENABLED', 'false').lower() == 'true',
 }
 
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # 0 disables the /metrics endpoint
+
 # Data generation rates
 EVENTS_PER_SECOND = float(os.getenv('EVENTS_PER_SECOND', 5))
 CONVERSION_INTERVAL = float(os.getenv('CONVERSION_INTERVAL', 5))  # seconds between conversions
@@ -66,12 +77,54 @@ LAST_NAMES = ['Chen', 'Smith', 'Garcia', 'Kim', 'Patel', 'Mueller', 'Santos', 'N
 EMAIL_DOMAINS = ['gmail.com', 'company.com', 'outlook.com', 'startup.io', 'tech.co']
 
 
+class Metrics:
+    """Prometheus metrics for the generator; every call is a no-op when disabled."""
+
+    def __init__(self, port: int):
+        self.enabled = bool(port) and PROMETHEUS_AVAILABLE
+        if not self.enabled:
+            return
+        self.generated = Counter('datagen_rows_generated_total', 'Rows generated', ['table'])
+        self.written = Counter('datagen_rows_written_total', 'Rows written successfully', ['table', 'sink'])
+        self.latency = Histogram('datagen_insert_latency_seconds', 'Latency of one insert', ['table'],
+                                 buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5))
+        self.batch_size = Histogram('datagen_batch_size_rows', 'Rows per insert', ['table'],
+                                    buckets=(1, 10, 100, 1000))
+        self.errors = Counter('datagen_errors_total', 'Failed writes by error type', ['type'])
+        self.achieved_rate = Gauge('datagen_achieved_rate', 'Events per second actually generated')
+        self.target_rate = Gauge('datagen_target_rate', 'Events per second requested')
+        self.target_rate.set(EVENTS_PER_SECOND)
+        start_http_server(port)
+        print(f"[Metrics] Serving Prometheus metrics on :{port}/metrics")
+
+    def insert(self, table: str, seconds: float):
+        if self.enabled:
+            self.generated.labels(table).inc()
+            self.written.labels(table, 'postgres').inc()
+            self.latency.labels(table).observe(seconds)
+            self.batch_size.labels(table).observe(1)
+
+    def kafka_sent(self, table: str):
+        if self.enabled:
+            self.written.labels(table, 'kafka').inc()
+
+    def error(self, table: str, e: Exception):
+        if self.enabled:
+            self.generated.labels(table).inc()
+            self.errors.labels(getattr(e, 'pgcode', None) or type(e).__name__).inc()
+
+    def set_achieved_rate(self, rate: float):
+        if self.enabled:
+            self.achieved_rate.set(rate)
+
+
 class DataGenerator:
     """Generates continuous data for PostgreSQL (and optionally Kafka)."""
 
     def __init__(self):
         self.conn: Optional[psycopg2.extensions.connection] = None
         self.kafka_producer = None
+        self.metrics = Metrics(METRICS_PORT)
         self.running = True
 
         # Track IDs
@@ -168,6 +221,7 @@ class DataGenerator:
         industry = random.choice(INDUSTRIES)
 
         try:
+            start = time.perf_counter()
             cursor = self.conn.cursor()
             cursor.execute(
                 """INSERT INTO dim_users (user_id, email, name, signup_date, plan, country, industry)
@@ -175,8 +229,10 @@ class DataGenerator:
                 (i, email, name, signup_date, plan, country, industry)
             )
             cursor.close()
+            self.metrics.insert('dim_users', time.perf_counter() - start)
             print(f"[NEW USER] {name} ({email}) joined with {plan} plan")
         except Error as e:
+            self.metrics.error('dim_users', e)
             print(f"[ERROR] Failed to add user: {e}")
             self.max_user_id -= 1
 
@@ -199,6 +255,7 @@ class DataGenerator:
         }
 
         try:
+            start = time.perf_counter()
             cursor = self.conn.cursor()
             cursor.execute(
                 """INSERT INTO fact_events
@@ -209,13 +266,16 @@ class DataGenerator:
                  event['search_query'], event['properties'])
             )
             cursor.close()
+            self.metrics.insert('fact_events', time.perf_counter() - start)
             self.events_generated += 1
 
             # Also send to Kafka if enabled
             if self.kafka_producer:
                 self.kafka_producer.send('fact_events', event)
+                self.metrics.kafka_sent('fact_events')
 
         except Error as e:
+            self.metrics.error('fact_events', e)
             print(f"[ERROR] Failed to insert event: {e}")
             self.max_event_id -= 1
 
@@ -262,6 +322,7 @@ class DataGenerator:
         }
 
         try:
+            start = time.perf_counter()
             cursor = self.conn.cursor()
             cursor.execute(
                 """INSERT INTO fact_conversions
@@ -272,14 +333,17 @@ class DataGenerator:
                  conversion['revenue'], conversion['properties'])
             )
             cursor.close()
+            self.metrics.insert('fact_conversions', time.perf_counter() - start)
             self.conversions_generated += 1
             print(f"[CONVERSION] {conv_type} - ${revenue:.2f}")
 
             # Also send to Kafka if enabled
             if self.kafka_producer:
                 self.kafka_producer.send('fact_conversions', conversion)
+                self.metrics.kafka_sent('fact_conversions')
 
         except Error as e:
+            self.metrics.error('fact_conversions', e)
             print(f"[ERROR] Failed to insert conversion: {e}")
             self.max_conversion_id -= 1
 
@@ -291,6 +355,8 @@ class DataGenerator:
         event_interval = 1.0 / EVENTS_PER_SECOND if EVENTS_PER_SECOND > 0 else 1
         last_conversion = time.time()
         last_new_user = time.time()
+        last_status = time.time()
+        last_status_events = 0
 
         while self.running:
             # Generate event
@@ -307,7 +373,10 @@ class DataGenerator:
                 last_new_user = time.time()
 
             # Status update every 100 events
-            if self.events_generated % 100 == 0:
+            if self.events_generated % 100 == 0 and self.events_generated != last_status_events:
+                now = time.time()
+                self.metrics.set_achieved_rate((self.events_generated - last_status_events) / (now - last_status))
+                last_status, last_status_events = now, self.events_generated
                 print(f"[STATUS] Events: {self.events_generated}, Conversions: {self.conversions_generated}, Users: {self.max_user_id}")
 
             time.sleep(event_interval)
@@ -331,6 +400,7 @@ def main():
     print(f"PostgreSQL: {POSTGRES_CONFIG['host']}:{POSTGRES_CONFIG['port']}/{POSTGRES_CONFIG['database']}")
     print(f"Kafka: {KAFKA_CONFIG['bootstrap_servers']} (enabled: {KAFKA_CONFIG['enabled']})")
     print(f"Rates: {EVENTS_PER_SECOND} events/sec")
+    print(f"Metrics: {f':{METRICS_PORT}/metrics' if METRICS_PORT else 'disabled'}")
     print("=" * 60)
 
     gen = DataGenerator()
@@ -20,16 +20,7 @@ def search_knowledge(query: str, top_k: int = 3) -> str:
         Formatted context from search results
     """
     try:
-        with search.db.conn.cursor() as cur:
-            cur.execute("SELECT COUNT(*) FROM rag_documents")
-            total_docs = cur.fetchone()[0]
-
-            safe_query = query.replace("'", "\\'")
-            try:
-                cur.execute(f"SELECT COUNT(*) FROM rag_documents WHERE content MATCH '{safe_query}'")
-                bm25_matches = cur.fetchone()[0]
-            except:
-                bm25_matches = 0
+        total_docs, bm25_matches = search.db.document_stats(query)
 
         results = search.search(query, top_k)
         if not results:
@@ -0,0 +1,88 @@
+"""Recall and latency of the ANN vector search against brute force.
+
+Uses stored document embeddings as query vectors, so no embedding API calls
+are made. For each search setting (HNSW ef_search or IVF nprobe) it reports
+recall@k of the approximate top-k against the exact top-k, and the latency
+of both.
+
+Usage:
+    uv run python -m src.ann_report --queries 50 --top-k 10 --search-params 16,32,64,128
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from .database import VeloDBClient
+
+SEARCH_VARIABLES = {"hnsw": "hnsw_ef_search", "ivf": "ivf_nprobe"}
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def top_ids(db: VeloDBClient, conn, embedding_str: str, top_k: int, exact: bool) -> tuple:
+    """Return (ids, seconds) of one top-k vector search."""
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute(db.vector_search_sql(embedding_str, top_k, exact=exact))
+        ids = [row[0] for row in cur.fetchall()]
+    return ids, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ANN vector search with brute force")
+    parser.add_argument("--queries", type=int, default=50, help="Stored embeddings to use as queries")
+    parser.add_argument("--top-k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--search-params", default="16,32,64,128",
+                        help="Comma-separated hnsw_ef_search (HNSW) or ivf_nprobe (IVF) values")
+    args = parser.parse_args()
+
+    db = VeloDBClient()
+    if db.vector_index == "none":
+        print("❌ rag_documents has no ANN index (VELODB_VECTOR_INDEX=none); nothing to compare")
+        return
+    # One connection throughout, since the search settings are session variables
+    with db.connection() as conn:
+        report(db, conn, args)
+    db.close()
+
+
+def report(db: VeloDBClient, conn, args):
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM rag_documents")
+        total = cur.fetchone()[0]
+        cur.execute(f"SELECT embedding FROM rag_documents ORDER BY RAND() LIMIT {args.queries}")
+        queries = ["[" + ",".join(str(x) for x in json.loads(row[0])) + "]" for row in cur.fetchall()]
+    if not queries:
+        print("❌ rag_documents is empty; ingest documents first")
+        return
+
+    print(f"📊 {total:,} documents, {len(queries)} queries, top-{args.top_k}, "
+          f"{db.vector_index} index ({db.vector_metric})\n")
+    exact, exact_latencies = [], []
+    for embedding_str in queries:
+        ids, seconds = top_ids(db, conn, embedding_str, args.top_k, exact=True)
+        exact.append(set(ids))
+        exact_latencies.append(seconds)
+
+    variable = SEARCH_VARIABLES[db.vector_index]
+    print(f"{'search':<22} {'recall@k':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    print(f"{'brute force':<22} {1.0:>9.3f} {percentile(exact_latencies, 0.5) * 1000:>9.1f} "
+          f"{percentile(exact_latencies, 0.95) * 1000:>9.1f}")
+    for value in [int(v) for v in args.search_params.split(",")]:
+        with conn.cursor() as cur:
+            cur.execute(f"SET {variable} = {value}")
+        recalls, latencies = [], []
+        for embedding_str, expected in zip(queries, exact):
+            ids, seconds = top_ids(db, conn, embedding_str, args.top_k, exact=False)
+            recalls.append(len(expected & set(ids)) / max(len(expected), 1))
+            latencies.append(seconds)
+        print(f"{f'{variable}={value}':<22} {sum(recalls) / len(recalls):>9.3f} "
+              f"{percentile(latencies, 0.5) * 1000:>9.1f} {percentile(latencies, 0.95) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,21 @@
 """VeloDB client with hybrid search capability."""
 import os
+import threading
 import pymysql
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
+from .pool import ConnectionPool, is_connection_error
 
 load_dotenv()
 
+# Vector index on rag_documents.embedding: hnsw, ivf, or none (brute-force cosine_distance)
+VECTOR_INDEX_TYPES = ["hnsw", "ivf", "none"]
+# ANN metrics; OpenAI embeddings have unit length, so inner_product ranks like cosine similarity
+VECTOR_METRICS = ["inner_product", "l2_distance"]
+
+# Upper bound on one multi-row INSERT; a 1536-dim embedding is ~30 KB of SQL text
+INSERT_STATEMENT_BYTES = 8 * 1024 * 1024
+
 
 class VeloDBClient:
     """Client for connecting to VeloDB and performing hybrid search."""
@@ -13,41 +23,143 @@ class VeloDBClient:
     def __init__(self):
         """Initialize connection to VeloDB using MySQL protocol."""
         self.database = os.getenv("VELODB_DATABASE", "rag_demo")
+        # Bumped by every insert so cached search results from older corpora are discarded
+        self.generation = 0
+        self.generation_lock = threading.Lock()
+        self.vector_index = os.getenv("VELODB_VECTOR_INDEX", "hnsw").lower()
+        self.vector_metric = os.getenv("VELODB_VECTOR_METRIC", "inner_product").lower()
+        if self.vector_index not in VECTOR_INDEX_TYPES:
+            raise ValueError(f"VELODB_VECTOR_INDEX must be one of {VECTOR_INDEX_TYPES}")
+        if self.vector_metric not in VECTOR_METRICS:
+            raise ValueError(f"VELODB_VECTOR_METRIC must be one of {VECTOR_METRICS}")
         # Connect without database first to create it if needed
-        self.conn = pymysql.connect(
+        conn = self._connect(database=None)
+        try:
+            self._setup_schema(conn)
+        finally:
+            conn.close()
+        # Requests check out their own connection, so concurrent chats do not share one
+        self.pool = ConnectionPool(
+            self._open_pooled,
+            max_size=int(os.getenv("VELODB_POOL_SIZE", "32")),
+            timeout=float(os.getenv("VELODB_POOL_TIMEOUT", "30")),
+            ping_interval=float(os.getenv("VELODB_POOL_PING_INTERVAL", "30")),
+        )
+
+    def _connect(self, database: Optional[str]) -> pymysql.connections.Connection:
+        return pymysql.connect(
             host=os.getenv("VELODB_HOST"),
             port=int(os.getenv("VELODB_MYSQL_PORT", "9030")),
             user=os.getenv("VELODB_USER"),
             password=os.getenv("VELODB_PASSWORD"),
+            database=database,
             autocommit=True,
         )
-        self._setup_schema()
 
-    def _setup_schema(self):
+    def _open_pooled(self) -> pymysql.connections.Connection:
+        conn = self._connect(self.database)
+        self._set_search_params(conn)
+        return conn
+
+    def connection(self):
+        """Check out a pooled connection: `with db.connection() as conn: ...`."""
+        return self.pool.connection()
+
+    def _vector_index_clause(self) -> str:
+        """ANN index definition from the VELODB_VECTOR_* / HNSW_* / IVF_* settings."""
+        properties = {
+            "index_type": self.vector_index,
+            "metric_type": self.vector_metric,
+            "dim": os.getenv("EMBEDDING_DIM", "1536"),
+        }
+        if self.vector_index == "hnsw":
+            properties["max_degree"] = os.getenv("HNSW_MAX_DEGREE", "32")
+            properties["ef_construction"] = os.getenv("HNSW_EF_CONSTRUCTION", "40")
+        else:
+            properties["nlist"] = os.getenv("IVF_NLIST", "1024")
+        rendered = ", ".join(f'"{key}"="{value}"' for key, value in properties.items())
+        return f"INDEX idx_embedding(embedding) USING ANN PROPERTIES({rendered}),"
+
+    def _setup_schema(self, conn):
         """Create the documents table with vector and inverted indexes."""
-        with self.conn.cursor() as cur:
+        with conn.cursor() as cur:
             cur.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
             cur.execute(f"USE {self.database}")
-            cur.execute("""
+            # ANN indexes require a NOT NULL embedding column
+            ann = self.vector_index != "none"
+            cur.execute(f"""
                 CREATE TABLE IF NOT EXISTS rag_documents (
                     id BIGINT NOT NULL AUTO_INCREMENT,
                     content TEXT,
-                    embedding ARRAY<FLOAT>,
-                    INDEX idx_embedding(embedding) USING INVERTED,
+                    embedding ARRAY<FLOAT>{" NOT NULL" if ann else ""},
+                    {self._vector_index_clause() if ann else ""}
                     INDEX idx_content(content) USING INVERTED PROPERTIES("parser"="english")
                 ) DUPLICATE KEY(id)
                 DISTRIBUTED BY HASH(id) BUCKETS 1
                 PROPERTIES ("replication_num" = "1")
             """)
+            if ann:
+                cur.execute("SHOW CREATE TABLE rag_documents")
+                if "USING ANN" not in cur.fetchone()[1]:
+                    print("⚠️  rag_documents has no ANN index (created by an older version); "
+                          "drop it and re-ingest to use approximate vector search")
+                    self.vector_index = "none"
+
+    def _set_search_params(self, conn):
+        """Apply the query-time ANN settings (HNSW_EF_SEARCH / IVF_NPROBE) to a connection."""
+        settings = {"hnsw": ("hnsw_ef_search", "HNSW_EF_SEARCH"), "ivf": ("ivf_nprobe", "IVF_NPROBE")}
+        if self.vector_index not in settings:
+            return
+        variable, env = settings[self.vector_index]
+        if os.getenv(env):
+            with conn.cursor() as cur:
+                cur.execute(f"SET {variable} = {int(os.getenv(env))}")
+
+    def vector_search_sql(self, embedding_str: str, limit: int, exact: bool = False) -> str:
+        """
+        Top-limit nearest documents as (id, content, vector_score), best first.
+
+        With an ANN index the ORDER BY ... LIMIT on the *_approximate distance
+        is answered from the index; exact=True ranks every row instead.
+        """
+        if self.vector_index == "none":
+            distance, order = f"cosine_distance(embedding, {embedding_str})", "ASC"
+            score = f"1 - {distance}"
+        elif self.vector_metric == "inner_product":
+            function = "inner_product" if exact else "inner_product_approximate"
+            distance, order = f"{function}(embedding, {embedding_str})", "DESC"
+            score = distance
+        else:
+            function = "l2_distance" if exact else "l2_distance_approximate"
+            distance, order = f"{function}(embedding, {embedding_str})", "ASC"
+            # Cosine similarity of unit vectors from their euclidean distance
+            score = f"1 - POW({distance}, 2) / 2"
+        return f"""
+            SELECT id, content, {score} as vector_score
+            FROM rag_documents
+            ORDER BY {distance} {order}
+            LIMIT {limit}
+        """
 
     def insert(self, content: str, embedding: List[float]):
         """Insert a document with its embedding."""
-        with self.conn.cursor() as cur:
-            embedding_str = "[" + ",".join(str(x) for x in embedding) + "]"
-            cur.execute(
+        self.insert_many([(content, embedding)])
+
+    def insert_many(self, rows: List[Tuple[str, List[float]]]):
+        """Insert (content, embedding) rows as multi-row INSERT statements."""
+        if not rows:
+            return
+        params = [(content, "[" + ",".join(str(x) for x in embedding) + "]") for content, embedding in rows]
+        with self.connection() as conn, conn.cursor() as cur:
+            # pymysql turns executemany of an INSERT ... VALUES into multi-row
+            # statements of up to max_stmt_length bytes
+            cur.max_stmt_length = INSERT_STATEMENT_BYTES
+            cur.executemany(
                 "INSERT INTO rag_documents (content, embedding) VALUES (%s, %s)",
-                (content, embedding_str),
+                params,
             )
+        with self.generation_lock:
+            self.generation += 1
 
     def hybrid_search(
         self, query: str, query_embedding: List[float], top_k: int = 5
@@ -57,51 +169,72 @@ class VeloDBClient:
 
         Returns: List of (id, content, vector_score, text_score, hybrid_score)
         """
-        with self.conn.cursor() as cur:
-            embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-            safe_query = query.replace("'", "\\'")
-
-            sql = f"""
-                WITH vector_results AS (
-                    SELECT
-                        id, content,
-                        1 - cosine_distance(embedding, {embedding_str}) as vector_score,
-                        ROW_NUMBER() OVER (ORDER BY cosine_distance(embedding, {embedding_str}) ASC) as vector_rank
-                    FROM rag_documents
-                    ORDER BY cosine_distance(embedding, {embedding_str}) ASC
-                    LIMIT {top_k * 3}
-                ),
-                text_results AS (
-                    SELECT
-                        id, content,
-                        1.0 as text_score,
-                        ROW_NUMBER() OVER (ORDER BY id) as text_rank
-                    FROM rag_documents
-                    WHERE content MATCH '{safe_query}'
-                    LIMIT {top_k * 3}
-                ),
-                combined AS (
-                    SELECT
-                        COALESCE(v.id, t.id) as id,
-                        COALESCE(v.content, t.content) as content,
-                        COALESCE(v.vector_score, 0) as vector_score,
-                        COALESCE(t.text_score, 0) as text_score,
-                        COALESCE(v.vector_rank, 999) as vector_rank,
-                        COALESCE(t.text_rank, 999) as text_rank
-                    FROM vector_results v
-                    FULL OUTER JOIN text_results t ON v.id = t.id
-                )
+        embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
+        safe_query = query.replace("'", "\\'")
+
+        # The vector leg is a plain ORDER BY ... LIMIT so an ANN index can answer it;
+        # ranks are numbered afterwards over just those candidates
+        sql = f"""
+            WITH vector_candidates AS ({self.vector_search_sql(embedding_str, top_k * 3)}),
+            vector_results AS (
                 SELECT
-                    id, content, vector_score, text_score,
-                    (0.5 / (60 + vector_rank) + 0.5 / (60 + text_rank)) as hybrid_score
-                FROM combined
-                ORDER BY hybrid_score DESC
-                LIMIT {top_k}
-            """
-            cur.execute(sql)
-            return cur.fetchall()
+                    id, content, vector_score,
+                    ROW_NUMBER() OVER (ORDER BY vector_score DESC) as vector_rank
+                FROM vector_candidates
+            ),
+            text_results AS (
+                SELECT
+                    id, content,
+                    1.0 as text_score,
+                    ROW_NUMBER() OVER (ORDER BY id) as text_rank
+                FROM rag_documents
+                WHERE content MATCH '{safe_query}'
+                LIMIT {top_k * 3}
+            ),
+            combined AS (
+                SELECT
+                    COALESCE(v.id, t.id) as id,
+                    COALESCE(v.content, t.content) as content,
+                    COALESCE(v.vector_score, 0) as vector_score,
+                    COALESCE(t.text_score, 0) as text_score,
+                    COALESCE(v.vector_rank, 999) as vector_rank,
+                    COALESCE(t.text_rank, 999) as text_rank
+                FROM vector_results v
+                FULL OUTER JOIN text_results t ON v.id = t.id
+            )
+            SELECT
+                id, content, vector_score, text_score,
+                (0.5 / (60 + vector_rank) + 0.5 / (60 + text_rank)) as hybrid_score
+            FROM combined
+            ORDER BY hybrid_score DESC
+            LIMIT {top_k}
+        """
+        return self._read(sql)
+
+    def document_stats(self, query: str) -> Tuple[int, int]:
+        """Return (total documents, documents matching query by BM25)."""
+        total = self._read("SELECT COUNT(*) FROM rag_documents")[0][0]
+        safe_query = query.replace("'", "\\'")
+        try:
+            matches = self._read(f"SELECT COUNT(*) FROM rag_documents WHERE content MATCH '{safe_query}'")[0][0]
+        except pymysql.Error:
+            matches = 0
+        return total, matches
+
+    def _read(self, sql: str) -> List[Tuple]:
+        """Run a read-only query, retrying once on a fresh connection if the connection failed.
+
+        Query errors from the server are raised right away.
+        """
+        for attempt in range(2):
+            try:
+                with self.connection() as conn, conn.cursor() as cur:
+                    cur.execute(sql)
+                    return cur.fetchall()
+            except pymysql.Error as e:
+                if attempt or not is_connection_error(e):
+                    raise
 
     def close(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
+        """Close the pooled database connections."""
+        self.pool.close()
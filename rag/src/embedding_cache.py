@@ -0,0 +1,84 @@
+"""Persistent content-addressed cache of embedding vectors."""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class EmbeddingCache:
+    """SQLite cache of vectors keyed by a hash of (model, text), bounded by LRU eviction."""
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        """Open (or create) the cache file at path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Return {text: vector} for the texts that are cached."""
+        keys = {self.key(model, text): text for text in texts}
+        found = {}
+        with self.lock:
+            key_list = list(keys)
+            # Stay below SQLite's limit on bound parameters
+            for start in range(0, len(key_list), 500):
+                part = key_list[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[keys[key]] = array("d", blob).tolist()
+                if rows:
+                    self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                          [(time.time(), key) for key, _ in rows])
+            self.conn.commit()
+        return found
+
+    def put_many(self, model: str, items: List[Tuple[str, List[float]]]):
+        """Store (text, vector) pairs and evict the least recently used beyond max_entries."""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(self.key(model, text), model, array("d", vector).tobytes(), now) for text, vector in items],
+            )
+            excess = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+                )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def open_cache() -> Optional[EmbeddingCache]:
+    """Cache configured by EMBEDDING_CACHE_PATH / EMBEDDING_CACHE_MAX_ENTRIES; an empty path disables it."""
+    path = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite")
+    if not path:
+        return None
+    return EmbeddingCache(path, int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000")))
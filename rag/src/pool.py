@@ -0,0 +1,123 @@
+"""Bounded, thread-safe pool of pymysql connections."""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import pymysql
+
+# Client-side errnos after which a connection cannot be trusted and is replaced:
+# can't connect, server gone away, lost connection, out of sync, lost during handshake.
+# Server-side query errors (VeloDB reports them as 1105, which pymysql also maps to
+# OperationalError) leave the connection usable.
+CONNECTION_ERRNOS = {2003, 2006, 2013, 2014, 2055}
+
+
+def is_connection_error(error: Exception) -> bool:
+    """Whether error means the connection itself failed, rather than the query."""
+    if isinstance(error, pymysql.InterfaceError):
+        return True
+    return (isinstance(error, pymysql.OperationalError) and bool(error.args)
+            and error.args[0] in CONNECTION_ERRNOS)
+
+
+class ConnectionPool:
+    """
+    Hand out one connection per request, creating up to max_size lazily.
+
+    Connections idle for longer than ping_interval are pinged on checkout and
+    replaced if the server dropped them; connections that fail with a
+    connection error (see is_connection_error) are closed instead of
+    returned. Checkout waits up to timeout seconds when all max_size
+    connections are in use.
+    """
+
+    def __init__(self, connect: Callable[[], pymysql.connections.Connection], max_size: int = 32,
+                 timeout: float = 30.0, ping_interval: float = 30.0):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.idle = []  # (connection, returned_at); used LIFO so spare connections age out
+        self.size = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def acquire(self) -> pymysql.connections.Connection:
+        """Check out a healthy connection."""
+        deadline = time.monotonic() + self.timeout
+        with self.cond:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self.idle:
+                    conn, returned_at = self.idle.pop()
+                    break
+                if self.size < self.max_size:
+                    self.size += 1
+                    conn, returned_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No VeloDB connection free within {self.timeout:g}s "
+                                       f"({self.max_size} in use)")
+                self.cond.wait(remaining)
+
+        if conn is not None and time.monotonic() - returned_at > self.ping_interval:
+            try:
+                conn.ping(reconnect=False)
+            except pymysql.Error:
+                self._close_quietly(conn)
+                conn = None
+        if conn is None:
+            try:
+                conn = self.connect()
+            except Exception:
+                self._forget()
+                raise
+        return conn
+
+    def release(self, conn: pymysql.connections.Connection, broken: bool = False):
+        """Return a connection; broken ones are closed and their slot freed."""
+        if broken or self.closed:
+            self._close_quietly(conn)
+            self._forget()
+            return
+        with self.cond:
+            self.idle.append((conn, time.monotonic()))
+            self.cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[pymysql.connections.Connection]:
+        """Check out a connection for the duration of the with block."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except pymysql.Error as e:
+            broken = is_connection_error(e)
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def _forget(self):
+        with self.cond:
+            self.size -= 1
+            self.cond.notify()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close idle connections; connections in use are closed when returned."""
+        with self.cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+            self.cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
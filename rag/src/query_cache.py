@@ -0,0 +1,51 @@
+"""In-memory TTL/LRU cache for repeated searches."""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, so near-identical searches share entries."""
+    return " ".join(query.lower().split())
+
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire after ttl_seconds or when the corpus generation changes."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, generation: int = 0) -> Optional[Any]:
+        """Return the cached value, or None when missing, expired or from an older generation."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != generation or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, value: Any, generation: int = 0):
+        with self.lock:
+            self.entries[key] = (generation, time.monotonic() + self.ttl_seconds, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def open_query_cache() -> Optional[QueryCache]:
+    """Cache configured by SEARCH_CACHE_MAX_ENTRIES / SEARCH_CACHE_TTL_SECONDS; 0 entries disables it."""
+    max_entries = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024"))
+    if max_entries <= 0:
+        return None
+    return QueryCache(max_entries, float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300")))
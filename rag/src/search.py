@@ -3,6 +3,35 @@ import os
 from openai import OpenAI
 from typing import List, Tuple
 from .database import VeloDBClient
+from .embedding_cache import open_cache
+from .query_cache import normalize_query, open_query_cache
+
+EMBEDDING_MODEL = "openai/text-embedding-3-small"
+# Per-request limits of the embeddings API (300k tokens, 2048 inputs), with headroom
+MAX_BATCH_TOKENS = 200_000
+MAX_BATCH_INPUTS = 2048
+# Chunks embedded and inserted per round, so large documents are not held in memory twice
+INGEST_BATCH_CHUNKS = 1000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def token_batches(texts: List[str]) -> List[List[str]]:
+    """Split texts into request-sized batches by token budget and input count."""
+    batches, batch, tokens = [], [], 0
+    for text in texts:
+        cost = estimate_tokens(text)
+        if batch and (tokens + cost > MAX_BATCH_TOKENS or len(batch) >= MAX_BATCH_INPUTS):
+            batches.append(batch)
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += cost
+    if batch:
+        batches.append(batch)
+    return batches
 
 
 class HybridSearch:
@@ -15,28 +44,62 @@ class HybridSearch:
             api_key=os.getenv("OPENROUTER_API_KEY"),
             base_url="https://openrouter.ai/api/v1"
         )
+        self.cache = open_cache()
+        self.query_cache = open_query_cache()
 
     def embed(self, text: str) -> List[float]:
         """Generate embeddings using OpenRouter."""
-        response = self.client.embeddings.create(
-            model="openai/text-embedding-3-small",
-            input=text
-        )
-        return response.data[0].embedding
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed many texts, with as many inputs per request as the token budget allows.
+
+        Texts already in the embedding cache are not sent to the API.
+        """
+        known = self.cache.get_many(EMBEDDING_MODEL, texts) if self.cache else {}
+        missing = list(dict.fromkeys(text for text in texts if text not in known))
+        for batch in token_batches(missing):
+            response = self.client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=batch
+            )
+            vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            known.update(zip(batch, vectors))
+            if self.cache:
+                self.cache.put_many(EMBEDDING_MODEL, list(zip(batch, vectors)))
+        return [known[text] for text in texts]
 
     def search(self, query: str, top_k: int = 5) -> List[Tuple]:
-        """Search using hybrid search."""
-        embedding = self.embed(query)
-        return self.db.hybrid_search(query, embedding, top_k)
+        """Search using hybrid search.
+
+        Results are cached per (normalized query, top_k) until they expire or
+        an insert changes the corpus; query embeddings are cached alongside.
+        """
+        if not self.query_cache:
+            return self.db.hybrid_search(query, self.embed(query), top_k)
+        normalized = normalize_query(query)
+        generation = self.db.generation
+        results = self.query_cache.get(("results", normalized, top_k), generation)
+        if results is None:
+            # Embeddings do not depend on the corpus, so they survive inserts
+            embedding = self.query_cache.get(("embedding", normalized))
+            if embedding is None:
+                embedding = self.embed(query)
+                self.query_cache.put(("embedding", normalized), embedding)
+            results = self.db.hybrid_search(query, embedding, top_k)
+            self.query_cache.put(("results", normalized, top_k), results, generation)
+        return list(results)
 
     def ingest(self, content: str, chunk_size: int = 512):
-        """Ingest a document by chunking and embedding."""
+        """Ingest a document by chunking, embedding in batches and bulk inserting."""
         chunks = [content[i:i+chunk_size] for i in range(0, len(content), chunk_size)]
-        for chunk in chunks:
-            if chunk.strip():
-                embedding = self.embed(chunk)
-                self.db.insert(chunk, embedding)
+        chunks = [chunk for chunk in chunks if chunk.strip()]
+        for start in range(0, len(chunks), INGEST_BATCH_CHUNKS):
+            batch = chunks[start:start + INGEST_BATCH_CHUNKS]
+            self.db.insert_many(list(zip(batch, self.embed_batch(batch))))
 
     def close(self):
-        """Close database connection."""
+        """Close database connection and embedding cache."""
         self.db.close()
+        if self.cache:
+            self.cache.close()